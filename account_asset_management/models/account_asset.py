@@ -4,6 +4,7 @@
 
 import calendar
 import logging
+from collections import defaultdict
 from datetime import date
 from functools import reduce
 from sys import exc_info
@@ -30,6 +31,10 @@ class AccountAsset(models.Model):
     _order = "date_start desc, code, name"
     _check_company_auto = True
     _rec_names_search = ["code", "name"]
+    # Number of depreciation lines created at once by compute_depreciation_board
+    _depreciation_line_batch_size = 1000
+    # Number of depreciation entries created and posted at once by _compute_entries
+    _depreciation_move_batch_size = 100
 
     account_move_line_ids = fields.One2many(
         comodel_name="account.move.line",
@@ -558,7 +563,7 @@ class AccountAsset(models.Model):
             lines1[0]["depreciated_value"] = 0.0
         table[0]["lines"] = lines1 + lines2
 
-    def _compute_depreciation_line(
+    def _get_depreciation_line_vals(
         self,
         depreciated_value_posted,
         table_i_start,
@@ -567,6 +572,9 @@ class AccountAsset(models.Model):
         last_line,
         posted_lines,
     ):
+        """Return the values of the depreciation lines to create from the
+        table. Only the first line has a previous_id, the last posted line:
+        each of the next ones follows the line before it in the list."""
         company = self.company_id
         currency = company.currency_id
         fiscalyear_lock_date = company.fiscalyear_lock_date or fields.Date.to_date(
@@ -574,10 +582,10 @@ class AccountAsset(models.Model):
         )
 
         seq = len(posted_lines)
-        depr_line = last_line
         last_date = table[-1]["lines"][-1]["date"]
         depreciated_value = depreciated_value_posted
         amount_to_allocate = 0.0
+        vals_list = []
         for entry in table[table_i_start:]:
             for line in entry["lines"][line_i_start:]:
                 seq += 1
@@ -598,7 +606,6 @@ class AccountAsset(models.Model):
                         amount -= self.salvage_value
                 if amount or self.carry_forward_missed_depreciations:
                     vals = {
-                        "previous_id": depr_line.id,
                         "amount": currency.round(amount),
                         "asset_id": self.id,
                         "name": name,
@@ -606,129 +613,203 @@ class AccountAsset(models.Model):
                         "line_days": line["days"],
                         "init_entry": fiscalyear_lock_date >= line["date"],
                     }
+                    if not vals_list:
+                        vals["previous_id"] = last_line.id
                     depreciated_value += currency.round(amount)
-                    depr_line = self.env["account.asset.line"].create(vals)
+                    vals_list.append(vals)
                 else:
                     seq -= 1
             line_i_start = 0
+        return vals_list
 
-    def compute_depreciation_board(self):
-        line_obj = self.env["account.asset.line"]
+    def _compute_depreciation_line(
+        self,
+        depreciated_value_posted,
+        table_i_start,
+        line_i_start,
+        table,
+        last_line,
+        posted_lines,
+    ):
+        vals_list = self._get_depreciation_line_vals(
+            depreciated_value_posted,
+            table_i_start,
+            line_i_start,
+            table,
+            last_line,
+            posted_lines,
+        )
+        return self._create_depreciation_lines([vals_list])
 
-        for asset in self:
-            currency = asset.company_id.currency_id
-            if currency.is_zero(asset.value_residual):
-                continue
-            domain = [
-                ("asset_id", "=", asset.id),
+    @api.model
+    def _create_depreciation_lines(self, vals_lists):
+        """Create the depreciation lines of vals_lists, the list of the
+        depreciation lines values of each asset, by batches of
+        _depreciation_line_batch_size lines. Each line but the first one of
+        an asset is chained to the line created before it."""
+        line_obj = self.env["account.asset.line"]
+        todo = [
+            (vals, bool(i))
+            for vals_list in vals_lists
+            for i, vals in enumerate(vals_list)
+        ]
+        line_ids = []
+        previous_id = False
+        for i in range(0, len(todo), self._depreciation_line_batch_size):
+            batch = todo[i : i + self._depreciation_line_batch_size]
+            lines = line_obj.create([vals for vals, _chained in batch])
+            previous_ids = {}
+            for line, (_vals, chained) in zip(lines, batch):
+                if chained:
+                    previous_ids[line.id] = previous_id
+                previous_id = line.id
+            line_obj._set_previous_lines(previous_ids)
+            line_ids += lines.ids
+        return line_obj.browse(line_ids)
+
+    def _get_posted_depreciation_lines(self):
+        """Return the {asset id: posted lines} of the assets, the posted lines
+        of an asset being its depreciation lines either posted or initial
+        balance entries, most recent first."""
+        posted_lines = self.env["account.asset.line"].search(
+            [
+                ("asset_id", "in", self.ids),
                 ("type", "=", "depreciate"),
                 "|",
                 ("move_check", "=", True),
                 ("init_entry", "=", True),
-            ]
-            posted_lines = line_obj.search(domain, order="line_date desc")
-            if posted_lines:
-                last_line = posted_lines[0]
-            else:
-                last_line = line_obj
-            domain = [
-                ("asset_id", "=", asset.id),
-                ("type", "=", "depreciate"),
-                ("move_id", "=", False),
-                ("init_entry", "=", False),
-            ]
-            old_lines = line_obj.search(domain)
-            if old_lines:
-                old_lines.unlink()
-
-            table = asset._compute_depreciation_table()
-            if not table:
-                continue
+            ],
+            order="asset_id, line_date desc",
+        )
+        line_ids = defaultdict(list)
+        for line in posted_lines:
+            line_ids[line.asset_id.id].append(line.id)
+        return {
+            asset_id: posted_lines.browse(ids) for asset_id, ids in line_ids.items()
+        }
 
-            asset._group_lines(table)
-
-            # check table with posted entries and
-            # recompute in case of deviation
-            depreciated_value_posted = depreciated_value = 0.0
-            if posted_lines:
-                total_table_lines = sum(len(entry["lines"]) for entry in table)
-                move_check_lines = asset.depreciation_line_ids.filtered("move_check")
-                last_depreciation_date = last_line.line_date
-                last_date_in_table = table[-1]["lines"][-1]["date"]
-                # If the number of lines in the table is the same as the depreciation
-                # lines, we will not show an error even if the dates are the same.
-                if (last_date_in_table < last_depreciation_date) or (
-                    last_date_in_table == last_depreciation_date
-                    and total_table_lines != len(move_check_lines)
-                ):
-                    raise UserError(
-                        _(
-                            "The duration of the asset conflicts with the "
-                            "posted depreciation table entry dates."
-                        )
+    def _get_depreciation_board_vals(self, posted_lines):
+        """Return the values of the depreciation lines to add to the
+        depreciation board of the asset, after its posted lines."""
+        self.ensure_one()
+        currency = self.company_id.currency_id
+        last_line = posted_lines[:1]
+        table = self._compute_depreciation_table()
+        if not table:
+            return []
+
+        self._group_lines(table)
+
+        # check table with posted entries and
+        # recompute in case of deviation
+        depreciated_value_posted = depreciated_value = 0.0
+        if posted_lines:
+            total_table_lines = sum(len(entry["lines"]) for entry in table)
+            move_check_lines = self.depreciation_line_ids.filtered("move_check")
+            last_depreciation_date = last_line.line_date
+            last_date_in_table = table[-1]["lines"][-1]["date"]
+            # If the number of lines in the table is the same as the depreciation
+            # lines, we will not show an error even if the dates are the same.
+            if (last_date_in_table < last_depreciation_date) or (
+                last_date_in_table == last_depreciation_date
+                and total_table_lines != len(move_check_lines)
+            ):
+                raise UserError(
+                    _(
+                        "The duration of the asset conflicts with the "
+                        "posted depreciation table entry dates."
                     )
+                )
 
-                for _table_i, entry in enumerate(table):
-                    residual_amount_table = entry["lines"][-1]["remaining_value"]
-                    if (
-                        entry["date_start"]
-                        <= last_depreciation_date
-                        <= entry["date_stop"]
-                    ):
-                        break
+            for _table_i, entry in enumerate(table):
+                residual_amount_table = entry["lines"][-1]["remaining_value"]
+                if entry["date_start"] <= last_depreciation_date <= entry["date_stop"]:
+                    break
 
-                if entry["date_stop"] == last_depreciation_date:
-                    _table_i += 1
-                    _line_i = 0
-                else:
-                    entry = table[_table_i]
-                    date_min = entry["date_start"]
-                    for _line_i, line in enumerate(entry["lines"]):
-                        residual_amount_table = line["remaining_value"]
-                        if date_min <= last_depreciation_date <= line["date"]:
-                            break
-                        date_min = line["date"]
-                    if line["date"] == last_depreciation_date:
-                        _line_i += 1
-                table_i_start = _table_i
-                line_i_start = _line_i
-
-                # check if residual value corresponds with table
-                # and adjust table when needed
-                depreciated_value_posted = depreciated_value = sum(
-                    posted_line.amount for posted_line in posted_lines
-                )
-                residual_amount = asset.depreciation_base - depreciated_value
-                amount_diff = currency.round(residual_amount_table - residual_amount)
-                if amount_diff:
-                    # We will auto-create a new line because the number of lines in
-                    # the tables are the same as the posted depreciations and there
-                    # is still a residual value. Only in this case we will need to
-                    # add a new line to the table with the amount of the difference.
-                    if len(move_check_lines) == total_table_lines:
-                        table[table_i_start]["lines"].append(
-                            table[table_i_start]["lines"][line_i_start - 1]
-                        )
-                        line = table[table_i_start]["lines"][line_i_start]
-                        line["days"] = 0
-                        line["amount"] = amount_diff
-                    # compensate in first depreciation entry
-                    # after last posting
+            if entry["date_stop"] == last_depreciation_date:
+                _table_i += 1
+                _line_i = 0
+            else:
+                entry = table[_table_i]
+                date_min = entry["date_start"]
+                for _line_i, line in enumerate(entry["lines"]):
+                    residual_amount_table = line["remaining_value"]
+                    if date_min <= last_depreciation_date <= line["date"]:
+                        break
+                    date_min = line["date"]
+                if line["date"] == last_depreciation_date:
+                    _line_i += 1
+            table_i_start = _table_i
+            line_i_start = _line_i
+
+            # check if residual value corresponds with table
+            # and adjust table when needed
+            depreciated_value_posted = depreciated_value = sum(
+                posted_line.amount for posted_line in posted_lines
+            )
+            residual_amount = self.depreciation_base - depreciated_value
+            amount_diff = currency.round(residual_amount_table - residual_amount)
+            if amount_diff:
+                # We will auto-create a new line because the number of lines in
+                # the tables are the same as the posted depreciations and there
+                # is still a residual value. Only in this case we will need to
+                # add a new line to the table with the amount of the difference.
+                if len(move_check_lines) == total_table_lines:
+                    table[table_i_start]["lines"].append(
+                        table[table_i_start]["lines"][line_i_start - 1]
+                    )
                     line = table[table_i_start]["lines"][line_i_start]
-                    line["amount"] -= amount_diff
-
-            else:  # no posted lines
-                table_i_start = 0
-                line_i_start = 0
-
-            asset._compute_depreciation_line(
-                depreciated_value_posted,
-                table_i_start,
-                line_i_start,
-                table,
-                last_line,
-                posted_lines,
+                    line["days"] = 0
+                    line["amount"] = amount_diff
+                # compensate in first depreciation entry
+                # after last posting
+                line = table[table_i_start]["lines"][line_i_start]
+                line["amount"] -= amount_diff
+
+        else:  # no posted lines
+            table_i_start = 0
+            line_i_start = 0
+
+        return self._get_depreciation_line_vals(
+            depreciated_value_posted,
+            table_i_start,
+            line_i_start,
+            table,
+            last_line,
+            posted_lines,
+        )
+
+    def compute_depreciation_board(self):
+        """Recompute the depreciation boards of the assets at once: the posted
+        lines of all the assets are read with one search, the draft lines
+        removed with one unlink and the new lines created by batches."""
+        line_obj = self.env["account.asset.line"]
+        assets = self.filtered(
+            lambda asset: not asset.company_id.currency_id.is_zero(
+                asset.value_residual
+            )
+        )
+        if not assets:
+            return True
+        posted_lines = assets._get_posted_depreciation_lines()
+        old_lines = line_obj.search(
+            [
+                ("asset_id", "in", assets.ids),
+                ("type", "=", "depreciate"),
+                ("move_id", "=", False),
+                ("init_entry", "=", False),
+            ]
+        )
+        if old_lines:
+            old_lines.unlink()
+        vals_lists = []
+        for asset in assets:
+            vals_list = asset._get_depreciation_board_vals(
+                posted_lines.get(asset.id, line_obj)
             )
+            if vals_list:
+                vals_lists.append(vals_list)
+        self._create_depreciation_lines(vals_lists)
         return True
 
     def _get_fy_duration(self, fy, option="days"):
@@ -1174,8 +1255,6 @@ class AccountAsset(models.Model):
     def _compute_entries(self, date_end, check_triggers=False):
         # TODO : add ir_cron job calling this method to
         # generate periodical accounting entries
-        result = []
-        error_log = ""
         if check_triggers:
             recompute_obj = self.env["account.asset.recompute.trigger"]
             recomputes = recompute_obj.sudo().search([("state", "=", "open")])
@@ -1195,23 +1274,7 @@ class AccountAsset(models.Model):
             ],
             order="line_date",
         )
-        for depreciation in depreciations:
-            try:
-                with self.env.cr.savepoint():
-                    result += depreciation.create_move()
-            except Exception:
-                e = exc_info()[0]
-                tb = "".join(format_exception(*exc_info()))
-                asset_ref = depreciation.asset_id.name
-                if depreciation.asset_id.code:
-                    asset_ref = f"[{depreciation.asset_id.code}] {asset_ref}"
-                error_log += _(
-                    "\nError while processing asset '{ref}': {exception}"
-                ).format(ref=asset_ref, exception=str(e))
-                error_msg = _("Error while processing asset '{ref}': \n\n{tb}").format(
-                    ref=asset_ref, tb=tb
-                )
-                _logger.error("%s, %s", self._name, error_msg)
+        result, error_log = self._create_depreciation_moves(depreciations)
 
         if check_triggers and recomputes:
             companies = recomputes.mapped("company_id")
@@ -1225,6 +1288,45 @@ class AccountAsset(models.Model):
 
         return (result, error_log)
 
+    @api.model
+    def _create_depreciation_moves(self, depreciations):
+        """Create and post the entries of the depreciation lines by batches
+        of _depreciation_move_batch_size lines. A failing batch is split in
+        two halves, retried separately, until the failing lines are isolated
+        and logged. Return the ids of the entries created and the error log.
+        """
+        result = []
+        error_log = ""
+        batch_size = self._depreciation_move_batch_size
+        todo = [
+            depreciations[i : i + batch_size]
+            for i in range(0, len(depreciations), batch_size)
+        ]
+        todo.reverse()
+        while todo:
+            lines = todo.pop()
+            try:
+                with self.env.cr.savepoint():
+                    result += lines.create_move()
+            except Exception:
+                if len(lines) > 1:
+                    half = len(lines) // 2
+                    todo += [lines[half:], lines[:half]]
+                    continue
+                e = exc_info()[0]
+                tb = "".join(format_exception(*exc_info()))
+                asset_ref = lines.asset_id.name
+                if lines.asset_id.code:
+                    asset_ref = f"[{lines.asset_id.code}] {asset_ref}"
+                error_log += _(
+                    "\nError while processing asset '{ref}': {exception}"
+                ).format(ref=asset_ref, exception=str(e))
+                error_msg = _("Error while processing asset '{ref}': \n\n{tb}").format(
+                    ref=asset_ref, tb=tb
+                )
+                _logger.error("%s, %s", self._name, error_msg)
+        return result, error_log
+
     @api.model
     def _xls_acquisition_fields(self):
         """
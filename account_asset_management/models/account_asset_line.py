@@ -2,7 +2,9 @@
 # Copyright 2021 Tecnativa - João Marques
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import _, api, fields, models
+from collections import defaultdict
+
+from odoo import Command, _, api, fields, models
 from odoo.exceptions import UserError
 
 
@@ -82,7 +84,7 @@ class AccountAssetLine(models.Model):
         dlines = self
         if self.env.context.get("no_compute_asset_line_ids"):
             # skip compute for lines in unlink
-            exclude_ids = self.env.context["no_compute_asset_line_ids"]
+            exclude_ids = set(self.env.context["no_compute_asset_line_ids"])
             dlines = self.filtered(lambda line: line.id not in exclude_ids)
         dlines = dlines.filtered(lambda line: line.type == "depreciate")
         dlines = dlines.sorted(key=lambda line: line.line_date)
@@ -92,12 +94,10 @@ class AccountAssetLine(models.Model):
         all_excluded_lines.depreciated_value = 0
         all_excluded_lines.remaining_value = 0
         # Group depreciation lines per asset
-        asset_ids = dlines.mapped("asset_id")
-        grouped_dlines = []
-        for asset in asset_ids:
-            grouped_dlines.append(
-                dlines.filtered(lambda line, asset=asset: line.asset_id.id == asset.id)
-            )
+        line_ids = defaultdict(list)
+        for line in dlines:
+            line_ids[line.asset_id.id].append(line.id)
+        grouped_dlines = [dlines.browse(ids) for ids in line_ids.values()]
         for dlines in grouped_dlines:
             for i, dl in enumerate(dlines):
                 if i == 0:
@@ -195,6 +195,7 @@ class AccountAssetLine(models.Model):
         return super().write(vals)
 
     def unlink(self):
+        unlink_ids = set(self.ids)
         for dl in self:
             if dl.type == "create" and dl.amount:
                 raise UserError(
@@ -209,7 +210,8 @@ class AccountAssetLine(models.Model):
                 )
             previous = dl.previous_id
             next_line = dl.asset_id.depreciation_line_ids.filtered(
-                lambda line, dl=dl: line.previous_id == dl and line not in self
+                lambda line, dl=dl: line.previous_id == dl
+                and line.id not in unlink_ids
             )
             if next_line:
                 next_line.previous_id = previous
@@ -217,6 +219,28 @@ class AccountAssetLine(models.Model):
             AccountAssetLine, self.with_context(no_compute_asset_line_ids=self.ids)
         ).unlink()
 
+    @api.model
+    def _set_previous_lines(self, previous_ids):
+        """Set the previous_id of lines just created, previous_ids being
+        their {line id: previous line id}, with a single query."""
+        if not previous_ids:
+            return
+        self.flush_model(["previous_id"])
+        query = """
+            UPDATE account_asset_line line
+            SET previous_id = previous.previous_id
+            FROM (VALUES {}) AS previous(id, previous_id)
+            WHERE line.id = previous.id
+        """.format(", ".join(["(%s, %s)"] * len(previous_ids)))
+        self.env.cr.execute(
+            query, [value for item in previous_ids.items() for value in item]
+        )
+        lines = self.browse(list(previous_ids))
+        self.env.cache.update(
+            lines, self._fields["previous_id"], list(previous_ids.values())
+        )
+        lines.modified(["previous_id"])
+
     def _setup_move_data(self, depreciation_date):
         asset = self.asset_id
         move_data = {
@@ -256,33 +280,40 @@ class AccountAssetLine(models.Model):
         return move_line_data
 
     def create_move(self):
-        created_move_ids = []
-        asset_ids = set()
+        """Create and post the entries of the depreciation lines at once."""
         ctx = dict(self.env.context, allow_asset=True, check_move_validity=False)
+        move_vals_list = []
+        empty_move = self.env["account.move"]
         for line in self:
             asset = line.asset_id
             depreciation_date = line.line_date
             am_vals = line._setup_move_data(depreciation_date)
-            move = self.env["account.move"].with_context(**ctx).create(am_vals)
             depr_acc = asset.profile_id.account_depreciation_id
             exp_acc = asset.profile_id.account_expense_depreciation_id
-            aml_d_vals = line._setup_move_line_data(
-                depreciation_date, depr_acc, "depreciation", move
-            )
-            self.env["account.move.line"].with_context(**ctx).create(aml_d_vals)
-            aml_e_vals = line._setup_move_line_data(
-                depreciation_date, exp_acc, "expense", move
-            )
-            self.env["account.move.line"].with_context(**ctx).create(aml_e_vals)
-            move.action_post()
+            aml_vals_list = [
+                line._setup_move_line_data(
+                    depreciation_date, depr_acc, "depreciation", empty_move
+                ),
+                line._setup_move_line_data(
+                    depreciation_date, exp_acc, "expense", empty_move
+                ),
+            ]
+            for aml_vals in aml_vals_list:
+                # set by the entry creation
+                aml_vals.pop("move_id", None)
+            am_vals["line_ids"] = [
+                Command.create(aml_vals) for aml_vals in aml_vals_list
+            ]
+            move_vals_list.append(am_vals)
+        moves = self.env["account.move"].with_context(**ctx).create(move_vals_list)
+        moves.action_post()
+        for line, move in zip(self, moves):
             line.with_context(allow_asset_line_update=True).write({"move_id": move.id})
-            created_move_ids.append(move.id)
-            asset_ids.add(asset.id)
         # we re-evaluate the assets to determine if we can close them
-        for asset in self.env["account.asset"].browse(list(asset_ids)):
+        for asset in self.mapped("asset_id"):
             if asset.currency_id.is_zero(asset.value_residual):
                 asset.state = "close"
-        return created_move_ids
+        return moves.ids
 
     def open_move(self):
         self.ensure_one()
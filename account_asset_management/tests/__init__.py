@@ -1,2 +1,3 @@
 from . import test_account_asset_management
 from . import test_asset_management_xls
+from . import test_account_asset_benchmark
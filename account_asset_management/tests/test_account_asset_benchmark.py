@@ -0,0 +1,85 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+import time
+from unittest.mock import patch
+
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+_logger = logging.getLogger(__name__)
+
+NB_ASSETS = 2000
+
+
+@tagged("-standard", "account_asset_management_benchmark")
+class TestAssetBenchmark(AccountTestInvoicingCommon):
+    """Compare the depreciation boards computed asset by asset with the bulk
+    computation. The asset by asset run goes through the current code with
+    batches of one line, it is not a measure of the previous implementation.
+
+    Not run by default, use ``--test-tags account_asset_management_benchmark``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.asset_model = cls.env["account.asset"]
+        cls.profile = cls.env["account.asset.profile"].create(
+            {
+                "account_expense_depreciation_id": cls.company_data[
+                    "default_account_expense"
+                ].id,
+                "account_asset_id": cls.company_data["default_account_assets"].id,
+                "account_depreciation_id": cls.company_data[
+                    "default_account_assets"
+                ].id,
+                "journal_id": cls.company_data["default_journal_purchase"].id,
+                "name": "Benchmark - 5 Years",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "month",
+            }
+        )
+        cls.assets = cls.asset_model.create(
+            [
+                {
+                    "name": "Asset %s" % i,
+                    "profile_id": cls.profile.id,
+                    "purchase_value": 1000 + i,
+                    "date_start": time.strftime("%Y-01-01"),
+                }
+                for i in range(NB_ASSETS)
+            ]
+        )
+
+    def _count_lines(self):
+        return self.env["account.asset.line"].search_count(
+            [("asset_id", "in", self.assets.ids), ("type", "=", "depreciate")]
+        )
+
+    def test_benchmark(self):
+        start = time.perf_counter()
+        with patch.object(type(self.asset_model), "_depreciation_line_batch_size", 1):
+            for asset in self.assets:
+                asset.compute_depreciation_board()
+        self.env.flush_all()
+        asset_by_asset = time.perf_counter() - start
+        nb_lines = self._count_lines()
+        self.env.invalidate_all()
+
+        start = time.perf_counter()
+        self.assets.compute_depreciation_board()
+        self.env.flush_all()
+        bulk = time.perf_counter() - start
+        self.assertEqual(self._count_lines(), nb_lines)
+        _logger.info(
+            "Depreciation boards of %s assets (%s lines): "
+            "asset by asset %.2fs, bulk %.2fs (x%.1f)",
+            NB_ASSETS,
+            nb_lines,
+            asset_by_asset,
+            bulk,
+            asset_by_asset / bulk,
+        )
@@ -6,8 +6,10 @@
 import calendar
 import time
 from datetime import date, datetime
+from unittest.mock import patch
 
 from odoo import Command, fields
+from odoo.exceptions import UserError
 from odoo.tests import tagged
 from odoo.tests.common import Form
 
@@ -979,3 +981,95 @@ class TestAssetManagement(AccountTestInvoicingCommon):
             }
         )
         self.assertEqual(asset.salvage_value, 5)
+
+    def test_22_compute_depreciation_board_bulk(self):
+        """The boards computed at once are the ones computed asset by asset."""
+        vals_list = [
+            {
+                "name": "test asset %s" % i,
+                "profile_id": self.car5y.id,
+                "purchase_value": 1000 * (i + 1),
+                "date_start": time.strftime("%Y-01-01"),
+                "method_time": "year",
+                "method_number": 2,
+                "method_period": "month",
+                "prorata": bool(i % 2),
+            }
+            for i in range(4)
+        ]
+        bulk_assets = self.asset_model.create(vals_list)
+        assets = self.asset_model.create(vals_list)
+        bulk_assets[0].compute_depreciation_board()
+        bulk_assets[0].validate()
+        bulk_assets[0].depreciation_line_ids[1].create_move()
+        assets[0].compute_depreciation_board()
+        assets[0].validate()
+        assets[0].depreciation_line_ids[1].create_move()
+        # Lines of an asset are split over several batches
+        with patch.object(type(self.asset_model), "_depreciation_line_batch_size", 5):
+            bulk_assets.compute_depreciation_board()
+        for asset in assets:
+            asset.compute_depreciation_board()
+        self.env.invalidate_all()
+
+        def board(asset):
+            lines = asset.depreciation_line_ids.filtered(
+                lambda line: line.type == "depreciate"
+            )
+            for previous, line in zip(lines, lines[1:]):
+                self.assertEqual(line.previous_id, previous)
+            return [
+                (
+                    line.line_date,
+                    line.amount,
+                    line.depreciated_value,
+                    line.remaining_value,
+                )
+                for line in lines
+            ]
+
+        for bulk_asset, asset in zip(bulk_assets, assets):
+            self.assertEqual(board(bulk_asset), board(asset))
+            self.assertEqual(bulk_asset.value_residual, asset.value_residual)
+
+    def test_23_compute_entries_batch_errors(self):
+        """A failing depreciation line does not prevent the other ones of its
+        batch from being posted."""
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test asset %s" % i,
+                    "code": "BATCH%s" % i,
+                    "profile_id": self.car5y.id,
+                    "purchase_value": 1200,
+                    "date_start": time.strftime("%Y-01-01"),
+                    "method_time": "year",
+                    "method_number": 1,
+                    "method_period": "month",
+                }
+                for i in range(3)
+            ]
+        )
+        assets.compute_depreciation_board()
+        assets.validate()
+        failing_asset = assets[1]
+        line_model = type(self.dl_model)
+        setup_move_data = line_model._setup_move_data
+
+        def _setup_move_data(line, depreciation_date):
+            if line.asset_id == failing_asset:
+                raise UserError("Depreciation failure")
+            return setup_move_data(line, depreciation_date)
+
+        with patch.object(
+            type(self.asset_model), "_depreciation_move_batch_size", 4
+        ), patch.object(line_model, "_setup_move_data", _setup_move_data):
+            move_ids, error_log = assets._compute_entries(
+                date(date.today().year, 12, 31)
+            )
+        self.assertEqual(len(move_ids), 24)
+        self.assertEqual(error_log.count("[BATCH1] test asset 1"), 12)
+        self.assertNotIn("BATCH0", error_log)
+        for asset in assets - failing_asset:
+            self.assertEqual(asset.state, "close")
+        self.assertFalse(failing_asset.depreciation_line_ids.move_id)
@@ -3,6 +3,8 @@
 # Copyright 2016-2022 Tecnativa - Pedro M. Baeza
 # License AGPL-3 - See https://www.gnu.org/licenses/agpl-3.0.html
 
+from unittest.mock import patch
+
 from dateutil.relativedelta import relativedelta
 
 from odoo import fields
@@ -532,3 +534,93 @@ class TestAccountCommission(TestCommissionBase):
             ]
         )
         self.assertEqual(2, len(settlements))
+
+    def test_settle_multi_agents(self):
+        """Several agents with several periods are settled at once."""
+        commission = self.commission_net_invoice
+        agents = self.agent_monthly + self.agent_biweekly
+        for agent in agents:
+            for date in ("2022-01-03", "2022-01-20", "2022-02-10"):
+                self._create_invoice(agent, commission, date=date).action_post()
+        wizard = self.make_settle_model.create(
+            {
+                "date_to": "2022-03-01",
+                "agent_ids": [(6, 0, agents.ids)],
+                "settlement_type": "sale_invoice",
+            }
+        )
+        action = wizard.action_settle()
+        settlements = self.settle_model.search([("agent_id", "in", agents.ids)])
+        self.assertEqual(set(action["domain"][0][2]), set(settlements.ids))
+        monthly = settlements.filtered(lambda s: s.agent_id == self.agent_monthly)
+        self.assertEqual(len(monthly), 2)
+        self.assertEqual(
+            sorted(monthly.mapped("date_from")),
+            [fields.Date.to_date("2022-01-01"), fields.Date.to_date("2022-02-01")],
+        )
+        self.assertEqual(len(settlements - monthly), 3)
+        self.assertEqual(len(settlements.line_ids), 6)
+        # Nothing left to settle
+        self.assertFalse(wizard.action_settle())
+        self.assertEqual(
+            self.settle_model.search([("agent_id", "in", agents.ids)]), settlements
+        )
+
+    def test_settle_hooks(self):
+        """The grouping and settlement hooks can still be overridden."""
+        commission = self.commission_net_invoice
+        for date in ("2022-01-03", "2022-01-20"):
+            invoice = self._create_invoice(self.agent_monthly, commission, date=date)
+            invoice.action_post()
+        wizard = self.make_settle_model.create(
+            {
+                "date_to": "2022-03-01",
+                "agent_ids": [(6, 0, self.agent_monthly.ids)],
+                "settlement_type": "sale_invoice",
+            }
+        )
+        wizard_class = type(wizard)
+
+        def groupby(self, agent_line):
+            # One settlement per invoice
+            return (
+                agent_line.company_id,
+                agent_line.currency_id,
+                agent_line.invoice_id,
+            )
+
+        get_settlement_key = wizard_class._get_settlement_key
+
+        def settlement_key(self, agent, agent_lines, sett_from, sett_to):
+            key = get_settlement_key(self, agent, agent_lines, sett_from, sett_to)
+            return key + (agent_lines[0].invoice_id,)
+
+        with patch.object(
+            wizard_class, "_agent_lines_groupby", groupby
+        ), patch.object(wizard_class, "_get_settlement_key", settlement_key):
+            wizard.action_settle()
+        settlements = self.settle_model.search(
+            [("agent_id", "=", self.agent_monthly.id)]
+        )
+        self.assertEqual(len(settlements), 2)
+        for settlement in settlements:
+            self.assertEqual(len(settlement.line_ids), 1)
+        self.assertEqual(len(settlements.line_ids.invoice_agent_line_id.invoice_id), 2)
+        invoice = self._create_invoice(
+            self.agent_monthly, commission, date="2022-01-25"
+        )
+        invoice.action_post()
+
+        def get_settlements(self, settlement_keys):
+            # Never reuse a settlement
+            return {}
+
+        with patch.object(wizard_class, "_get_settlements", get_settlements):
+            wizard.action_settle()
+        new_settlement = (
+            self.settle_model.search([("agent_id", "=", self.agent_monthly.id)])
+            - settlements
+        )
+        self.assertEqual(
+            new_settlement.line_ids.invoice_agent_line_id.invoice_id, invoice
+        )
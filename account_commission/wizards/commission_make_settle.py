@@ -1,9 +1,10 @@
 # Copyright 2014-2022 Tecnativa - Pedro M. Baeza
 # Copyright 2022 Quartile
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
-
+from collections import defaultdict
 
 from odoo import fields, models
+from odoo.osv import expression
 
 
 class CommissionMakeSettle(models.TransientModel):
@@ -31,6 +32,31 @@ class CommissionMakeSettle(models.TransientModel):
             order="invoice_date",
         )
 
+    def _get_agents_lines(self, agents, date_to):
+        """Fetch the sales invoice agent lines of all the agents at once."""
+        if self.settlement_type != "sale_invoice":
+            return super()._get_agents_lines(agents, date_to)
+        agent_ids = defaultdict(list)
+        for agent in agents:
+            agent_ids[self._get_period_start(agent, date_to)].append(agent.id)
+        return self.env["account.invoice.line.agent"].search(
+            expression.OR(
+                [
+                    self._get_account_settle_agents_domain(ids, date_to_agent)
+                    for date_to_agent, ids in agent_ids.items()
+                ]
+            ),
+            order="invoice_date",
+        )
+
+    def _get_account_settle_agents_domain(self, agent_ids, date_to_agent):
+        return [
+            ("invoice_date", "<", date_to_agent),
+            ("agent_id", "in", agent_ids),
+            ("settled", "=", False),
+            ("object_id.display_type", "=", "product"),
+        ]
+
     def _prepare_settlement_line_vals(self, settlement, line):
         """Prepare extra settlement values when the source is a sales invoice agent
         line.
@@ -11,6 +11,42 @@ from odoo.tools.translate import _
 _logger = logging.getLogger(__name__)
 
 
+class UnionFind:
+    """Disjoint sets of move line ids, used to merge the reconcile groups.
+
+    Groups are returned in the order of their first line, so the
+    reconciliation order does not depend on the merges.
+    """
+
+    def __init__(self):
+        self.parents = {}
+
+    def find(self, item):
+        parents = self.parents
+        root = parents.setdefault(item, item)
+        while parents[root] != root:
+            root = parents[root]
+        # Path compression
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+        return root
+
+    def union(self, items):
+        items = iter(items)
+        root = self.find(next(items))
+        for item in items:
+            other = self.find(item)
+            if other != root:
+                self.parents[other] = root
+        return root
+
+    def groups(self):
+        groups = {}
+        for item in self.parents:
+            groups.setdefault(self.find(item), set()).add(item)
+        return list(groups.values())
+
+
 class MassReconcileAdvanced(models.AbstractModel):
     _name = "mass.reconcile.advanced"
     _inherit = "mass.reconcile.base"
@@ -204,6 +240,131 @@ class MassReconcileAdvanced(models.AbstractModel):
             if self._compare_opposite(move_line, op, matchers)
         ]
 
+    @staticmethod
+    def _matcher_values(value):
+        """Return the values of a matcher as a tuple"""
+        if not isinstance(value, list | tuple):
+            return (value,)
+        return tuple(value)
+
+    def _use_matching_index(self):
+        """Return True when the matching can use the hash index.
+
+        The index relies on the default comparison of the matchers, which is
+        an equality between non-empty values. When a method inherits one of
+        the comparison methods, the opposites are searched line by line.
+        """
+
+        def function(cls, method):
+            # class methods are bound to the class they are fetched from
+            attr = getattr(cls, method)
+            return getattr(attr, "__func__", attr)
+
+        return all(
+            function(type(self), method) is function(MassReconcileAdvanced, method)
+            for method in (
+                "_compare_values",
+                "_compare_matcher_values",
+                "_compare_matchers",
+                "_compare_opposite",
+                "_search_opposites",
+            )
+        )
+
+    def _index_key_values(self, matchers):
+        """Return all the index keys of a line, from its (opposite) matchers
+
+        As an OR is used between the values of a matcher, a line is indexed
+        under each combination of its values. Empty values never match, so
+        they are left out.
+        """
+        values = []
+        for _key, value in matchers:
+            matcher_values = [val for val in self._matcher_values(value) if val]
+            if not matcher_values:
+                return []
+            values.append(matcher_values)
+        return product(*values)
+
+    def _build_opposite_index(self, opposite_move_lines, matcher_keys):
+        """Index the opposite lines on the values of their opposite matchers
+
+        :param list opposite_move_lines: list of dict of move lines values
+        :param tuple matcher_keys: keys of the matchers of the searched lines
+        :return: dict {index key: list of positions in `opposite_move_lines`}
+        """
+        index = {}
+        for position, opposite_line in enumerate(opposite_move_lines):
+            opp_matchers = self._opposite_matchers(opposite_line)
+            matchers = []
+            for key in matcher_keys:
+                try:
+                    opp_matcher = next(opp_matchers)
+                except StopIteration as e:
+                    raise ValueError("Missing _opposite_matcher: %s" % key) from e
+                assert opp_matcher[0] == key, _(
+                    "A matcher %(mkey)s is compared with a matcher %(omkey)s, "
+                    "the _matchers and _opposite_matchers are probably wrong"
+                ) % {"mkey": key, "omkey": opp_matcher[0]}
+                matchers.append(opp_matcher)
+            for index_key in self._index_key_values(matchers):
+                positions = index.setdefault(index_key, [])
+                # A line can be indexed twice under the same key when
+                # several of its values are equal
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+        return index
+
+    def _search_opposites_indexed(self, move_line, opposite_move_lines, indexes):
+        """Search the opposite move lines for a move line using the index
+
+        Same result as `_search_opposites`, the opposite lines being returned
+        in the same order.
+
+        :param dict indexes: indexes of the opposite lines by matcher keys,
+          filled on the fly
+        """
+        matchers = self._matchers(move_line)
+        matcher_keys = tuple(key for key, _value in matchers)
+        if matcher_keys not in indexes:
+            indexes[matcher_keys] = self._build_opposite_index(
+                opposite_move_lines, matcher_keys
+            )
+        index = indexes[matcher_keys]
+        positions = set()
+        for index_key in self._index_key_values(matchers):
+            positions.update(index.get(index_key, ()))
+        return [opposite_move_lines[position] for position in sorted(positions)]
+
+    def _get_reconcile_groups(self, credit_lines, debit_lines):
+        """Match the credit lines with their opposite debit lines
+
+        :return: list of sets of move line ids to reconcile together
+        """
+        use_index = self._use_matching_index()
+        indexes = {}
+        groups = UnionFind()
+        _logger.info("%d credit lines to reconcile", len(credit_lines))
+        for idx, credit_line in enumerate(credit_lines, start=1):
+            if idx % 50 == 0:
+                _logger.info(
+                    "... %d/%d credit lines inspected ...", idx, len(credit_lines)
+                )
+            if self._skip_line(credit_line):
+                continue
+            if use_index:
+                opposite_lines = self._search_opposites_indexed(
+                    credit_line, debit_lines, indexes
+                )
+            else:
+                opposite_lines = self._search_opposites(credit_line, debit_lines)
+            if not opposite_lines:
+                continue
+            line_ids = [opp["id"] for opp in opposite_lines] + [credit_line["id"]]
+            _logger.debug("Lines matched %s", line_ids)
+            groups.union(line_ids)
+        return groups.groups()
+
     def _action_rec(self):
         self.env.flush_all()
         credit_lines = self._query_credit()
@@ -274,32 +435,7 @@ class MassReconcileAdvanced(models.AbstractModel):
         reconciled_ids = []
         for rec in self:
             commit_every = rec.account_id.company_id.reconciliation_commit_every
-            reconcile_groups = []
-            _logger.info("%d credit lines to reconcile", len(credit_lines))
-            for idx, credit_line in enumerate(credit_lines, start=1):
-                if idx % 50 == 0:
-                    _logger.info(
-                        "... %d/%d credit lines inspected ...", idx, len(credit_lines)
-                    )
-                if self._skip_line(credit_line):
-                    continue
-                opposite_lines = self._search_opposites(credit_line, debit_lines)
-                if not opposite_lines:
-                    continue
-                opposite_ids = [opp["id"] for opp in opposite_lines]
-                line_ids = opposite_ids + [credit_line["id"]]
-                for group in reconcile_groups:
-                    if any([lid in group for lid in opposite_ids]):
-                        _logger.debug(
-                            "New lines %s matched with an existing " "group %s",
-                            line_ids,
-                            group,
-                        )
-                        group.update(line_ids)
-                        break
-                else:
-                    _logger.debug("New group of lines matched %s", line_ids)
-                    reconcile_groups.append(set(line_ids))
+            reconcile_groups = self._get_reconcile_groups(credit_lines, debit_lines)
             lines_by_id = {line["id"]: line for line in credit_lines + debit_lines}
             _logger.info("Found %d groups to reconcile", len(reconcile_groups))
             if commit_every:
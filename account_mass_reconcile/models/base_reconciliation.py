@@ -19,6 +19,7 @@ class MassReconcileBase(models.AbstractModel):
     partner_ids = fields.Many2many(
         comodel_name="res.partner", string="Restrict on partners"
     )
+    without_partner = fields.Boolean(string="Restrict on lines without partner")
     # other fields are inherited from mass.reconcile.options
 
     def automatic_reconcile(self):
@@ -82,6 +83,8 @@ class MassReconcileBase(models.AbstractModel):
         if self.partner_ids:
             where += " AND account_move_line.partner_id IN %s"
             params.append(tuple(line.id for line in self.partner_ids))
+        if self.without_partner:
+            where += " AND account_move_line.partner_id IS NULL"
         return where, params
 
     def _get_filter(self):
@@ -3,12 +3,14 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import psycopg2
 from psycopg2.extensions import AsIs
 
-from odoo import _, api, exceptions, fields, models, sql_db
+from odoo import _, api, exceptions, fields, models, registry, sql_db
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
@@ -144,38 +146,139 @@ class AccountMassReconcile(models.Model):
             "_filter": rec_method._filter,
         }
 
-    def _run_reconcile_method(self, reconcile_method):
+    def _run_reconcile_method(self, reconcile_method, shard_vals=None):
         rec_model = self.env[reconcile_method.name]
-        auto_rec_id = rec_model.create(self._prepare_run_transient(reconcile_method))
+        vals = self._prepare_run_transient(reconcile_method)
+        vals.update(shard_vals or {})
+        auto_rec_id = rec_model.create(vals)
         return auto_rec_id.automatic_reconcile()
 
-    def run_reconcile(self):
-        def find_reconcile_ids(fieldname, move_line_ids):
-            if not move_line_ids:
-                return []
-            self.env.flush_all()
-            sql = """
-                SELECT DISTINCT %s FROM account_move_line
-                WHERE %s IS NOT NULL AND id in %s
+    def _find_reconcile_ids(self, fieldname, move_line_ids):
+        if not move_line_ids:
+            return []
+        self.env.flush_all()
+        sql = """
+            SELECT DISTINCT %s FROM account_move_line
+            WHERE %s IS NOT NULL AND id in %s
+        """
+        params = [AsIs(fieldname), AsIs(fieldname), tuple(move_line_ids)]
+        self.env.cr.execute(sql, params)
+        res = self.env.cr.fetchall()
+        return [row[0] for row in res]
+
+    def _get_partner_shards(self, nb_shards):
+        """Split the partners of the lines to reconcile in ``nb_shards``
+        shards, by hash of the partner.
+
+        :return: list of values restricting the reconciliation methods to a
+          shard, the lines without partner being in a shard of their own
+        """
+        self.ensure_one()
+        self.env.flush_all()
+        self.env.cr.execute(
             """
-            params = [AsIs(fieldname), AsIs(fieldname), tuple(move_line_ids)]
-            self.env.cr.execute(sql, params)
-            res = self.env.cr.fetchall()
-            return [row[0] for row in res]
+            SELECT DISTINCT partner_id FROM account_move_line
+            WHERE account_id = %s AND NOT reconciled AND parent_state = 'posted'
+            AND partner_id IS NOT NULL
+            """,
+            (self.account.id,),
+        )
+        partner_ids_by_shard = [[] for __ in range(nb_shards)]
+        for (partner_id,) in self.env.cr.fetchall():
+            partner_ids_by_shard[partner_id % nb_shards].append(partner_id)
+        shards = [
+            {"partner_ids": [(6, 0, partner_ids)]}
+            for partner_ids in partner_ids_by_shard
+            if partner_ids
+        ]
+        shards.append({"without_partner": True})
+        return shards
+
+    def _run_reconcile_shard(self, shard_vals):
+        """Run all the methods of the profile on the lines of one shard, in a
+        dedicated cursor committed at the end.
+
+        :return: list of reconciled move line ids
+        """
+        threading.current_thread().dbname = self.env.cr.dbname
+        with registry(self.env.cr.dbname).cursor() as new_cr:
+            new_env = api.Environment(new_cr, self.env.uid, self.env.context)
+            rec = self.with_env(new_env)
+            ml_rec_ids = []
+            for method in rec.reconcile_method:
+                ml_rec_ids += rec._run_reconcile_method(method, shard_vals)
+        return ml_rec_ids
+
+    def _run_reconcile_parallel(self, nb_workers):
+        """Reconcile the lines of the profile, split by partner between
+        ``nb_workers`` workers having each their own cursor.
+
+        As the workers commit their work, the history is created in a new
+        cursor as well, so it sees their reconciliations.
+        """
+        self.ensure_one()
+        shards = self._get_partner_shards(nb_workers)
+        _logger.info(
+            "Reconcile task %s: %d shards on %d workers",
+            self.name,
+            len(shards),
+            nb_workers,
+        )
+        all_ml_rec_ids = []
+        errors = []
+        with ThreadPoolExecutor(max_workers=nb_workers) as executor:
+            futures = [
+                executor.submit(self._run_reconcile_shard, shard_vals)
+                for shard_vals in shards
+            ]
+            for future in futures:
+                try:
+                    all_ml_rec_ids += future.result()
+                except Exception as e:
+                    _logger.exception(
+                        "A shard of the reconcile task %s had an exception: %s",
+                        self.name,
+                        str(e),
+                    )
+                    errors.append(str(e))
+        with registry(self.env.cr.dbname).cursor() as new_cr:
+            new_env = api.Environment(new_cr, self.env.uid, self.env.context)
+            rec = self.with_env(new_env)
+            reconcile_ids = rec._find_reconcile_ids(
+                "full_reconcile_id", all_ml_rec_ids
+            )
+            new_env["mass.reconcile.history"].create(
+                {
+                    "mass_reconcile_id": rec.id,
+                    "date": fields.Datetime.now(),
+                    "reconcile_ids": [(4, rid) for rid in reconcile_ids],
+                }
+            )
+        self.invalidate_recordset(["history_ids", "last_history"])
+        for error in errors:
+            message = _("There was an error during reconciliation : %s") % error
+            self.message_post(body=message)
 
+    def run_reconcile(self):
         # we use a new cursor to be able to commit the reconciliation
         # often. We have to create it here and not later to avoid problems
         # where the new cursor sees the lines as reconciles but the old one
         # does not.
 
         for rec in self:
+            nb_workers = rec.account.company_id.reconciliation_parallel_workers
             # SELECT FOR UPDATE the mass reconcile row ; this is done in order
             # to avoid 2 processes on the same mass reconcile method.
+            # With parallel workers, the history is created in another cursor:
+            # a NO KEY UPDATE lock still excludes the other processes but not
+            # the foreign key check of the history.
             try:
                 self.env.cr.execute(
                     "SELECT id FROM account_mass_reconcile"
                     " WHERE id = %s"
-                    " FOR UPDATE NOWAIT",
+                    " FOR {} NOWAIT".format(
+                        "NO KEY UPDATE" if nb_workers > 1 else "UPDATE"
+                    ),
                     (rec.id,),
                 )
             except psycopg2.OperationalError as e:
@@ -187,6 +290,9 @@ class AccountMassReconcile(models.Model):
                 ) from e
             ctx = self.env.context.copy()
             ctx["commit_every"] = rec.account.company_id.reconciliation_commit_every
+            if nb_workers > 1:
+                rec.with_context(**ctx)._run_reconcile_parallel(nb_workers)
+                continue
             if ctx["commit_every"]:
                 new_cr = sql_db.db_connect(self.env.cr.dbname).cursor()
                 new_env = api.Environment(new_cr, self.env.uid, ctx)
@@ -202,7 +308,9 @@ class AccountMassReconcile(models.Model):
 
                     all_ml_rec_ids += ml_rec_ids
 
-                reconcile_ids = find_reconcile_ids("full_reconcile_id", all_ml_rec_ids)
+                reconcile_ids = self._find_reconcile_ids(
+                    "full_reconcile_id", all_ml_rec_ids
+                )
                 self.env["mass.reconcile.history"].create(
                     {
                         "mass_reconcile_id": rec.id,
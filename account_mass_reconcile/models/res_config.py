@@ -13,6 +13,13 @@ class AccountConfigSettings(models.TransientModel):
         help="Leave zero to commit only at the end of the process.",
         readonly=False,
     )
+    reconciliation_parallel_workers = fields.Integer(
+        related="company_id.reconciliation_parallel_workers",
+        string="Number of parallel workers for automatic reconciliation.",
+        help="The lines to reconcile are split by partner between the workers. "
+        "Leave zero to reconcile all the lines in a single worker.",
+        readonly=False,
+    )
 
 
 class Company(models.Model):
@@ -22,3 +29,8 @@ class Company(models.Model):
         string="How often to commit when performing automatic reconciliation.",
         help="Leave zero to commit only at the end of the process.",
     )
+    reconciliation_parallel_workers = fields.Integer(
+        string="Number of parallel workers for automatic reconciliation.",
+        help="The lines to reconcile are split by partner between the workers. "
+        "Leave zero to reconcile all the lines in a single worker.",
+    )
@@ -4,3 +4,4 @@
 from . import test_onchange_company
 from . import test_reconcile
 from . import test_scenario_reconcile
+from . import test_advanced_matching
@@ -0,0 +1,94 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+import time
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+
+def _synthetic_lines(nb_pairs, nb_partners=500):
+    """Return credit and debit lines values, matching by pairs on partner
+    and reference, plus a few lines without counterpart."""
+    credit_lines, debit_lines = [], []
+    for i in range(nb_pairs):
+        partner_id = i % nb_partners + 1
+        credit_lines.append(
+            {
+                "id": 2 * i + 1,
+                "partner_id": partner_id,
+                "ref": "INV/%s " % i,
+                "name": "/",
+            }
+        )
+        debit_lines.append(
+            {
+                "id": 2 * i + 2,
+                "partner_id": partner_id,
+                "ref": False,
+                "name": ("inv/%s" if i % 10 else "other/%s") % i,
+            }
+        )
+    return credit_lines, debit_lines
+
+
+class TestAdvancedMatching(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.rec_model = cls.env["mass.reconcile.advanced.ref"]
+
+    def _get_groups(self, credit_lines, debit_lines, use_index):
+        with patch.object(
+            type(self.rec_model), "_use_matching_index", return_value=use_index
+        ):
+            groups = self.rec_model._get_reconcile_groups(credit_lines, debit_lines)
+        return sorted(sorted(group) for group in groups)
+
+    def test_use_matching_index(self):
+        self.assertTrue(self.rec_model._use_matching_index())
+
+    def test_indexed_matching(self):
+        credit_lines, debit_lines = _synthetic_lines(200, nb_partners=7)
+        # Two credit lines matching the same debit line end up in one group
+        credit_lines.append({"id": 1001, "partner_id": 2, "ref": "inv/1", "name": "/"})
+        # Empty values never match
+        credit_lines.append({"id": 1003, "partner_id": 2, "ref": False, "name": "/"})
+        debit_lines.append({"id": 1004, "partner_id": 2, "ref": False, "name": False})
+        groups = self._get_groups(credit_lines, debit_lines, True)
+        self.assertEqual(groups, self._get_groups(credit_lines, debit_lines, False))
+        self.assertIn([3, 4, 1001], groups)
+        matched_ids = {line_id for group in groups for line_id in group}
+        self.assertNotIn(1, matched_ids)
+        self.assertNotIn(1004, matched_ids)
+
+
+@tagged("-standard", "mass_reconcile_benchmark")
+class TestAdvancedMatchingBenchmark(TestAdvancedMatching):
+    """Not run by default, use ``--test-tags mass_reconcile_benchmark``."""
+
+    def test_benchmark(self):
+        # The line by line search is quadratic, compare it on a subset only
+        credit_lines, debit_lines = _synthetic_lines(2000)
+        start = time.perf_counter()
+        linear_groups = self._get_groups(credit_lines, debit_lines, False)
+        linear = time.perf_counter() - start
+        start = time.perf_counter()
+        indexed_groups = self._get_groups(credit_lines, debit_lines, True)
+        indexed = time.perf_counter() - start
+        self.assertEqual(linear_groups, indexed_groups)
+        _logger.info(
+            "Advanced matching of 2000 pairs: line by line %.2fs, indexed %.2fs",
+            linear,
+            indexed,
+        )
+        credit_lines, debit_lines = _synthetic_lines(100000)
+        start = time.perf_counter()
+        groups = self._get_groups(credit_lines, debit_lines, True)
+        _logger.info(
+            "Advanced matching of 100000 pairs: indexed %.2fs, %d groups",
+            time.perf_counter() - start,
+            len(groups),
+        )
@@ -72,6 +72,41 @@ class TestScenarioReconcile(AccountTestInvoicingCommon):
         mass_rec.run_reconcile()
         self.assertEqual("paid", invoice.payment_state)
 
+    def test_scenario_reconcile_parallel(self):
+        self.company.reconciliation_parallel_workers = 2
+        invoice = self.init_invoice(
+            move_type="out_invoice",
+            amounts=[50],
+            post=True,
+        )
+        receivalble_account_id = invoice.partner_id.property_account_receivable_id.id
+        payment = self.env["account.payment"].create(
+            {
+                "partner_type": "customer",
+                "payment_type": "inbound",
+                "partner_id": invoice.partner_id.id,
+                "destination_account_id": receivalble_account_id,
+                "amount": 50.0,
+                "journal_id": self.bank_journal.id,
+            }
+        )
+        payment.action_post()
+        mass_rec = self.mass_rec_obj.create(
+            {
+                "name": "mass_reconcile_parallel",
+                "account": receivalble_account_id,
+                "reconcile_method": [(0, 0, {"name": "mass.reconcile.simple.partner"})],
+            }
+        )
+        mass_rec.run_reconcile()
+        # The shards are reconciled in their own environment
+        self.env.invalidate_all()
+        self.assertEqual("paid", invoice.payment_state)
+        self.assertEqual(len(mass_rec.history_ids), 1)
+        self.assertEqual(
+            mass_rec.last_history.reconcile_ids, invoice.line_ids.full_reconcile_id
+        )
+
     def test_scenario_reconcile_newest(self):
         invoice = self.init_invoice(
             move_type="out_invoice",
@@ -3,32 +3,46 @@
 # Copyright 2017 Open Net Sàrl
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 import re
+import threading
+from io import BytesIO
 
 from lxml import etree
 
 from odoo import _, models
 
+# Compiled xpath expressions, by thread
+_xpaths = threading.local()
+
 
 class AccountStatementImportCamtParser(models.AbstractModel):
     _name = "account.statement.import.camt.parser"
     _description = "Account Bank Statement Import CAMT parser"
 
+    def xpath(self, ns, node, path):
+        """Evaluate ``path`` on ``node``, the expression being compiled once."""
+        try:
+            xpaths = _xpaths.cache
+        except AttributeError:
+            xpaths = _xpaths.cache = {}
+        xpath = xpaths.get((ns, path))
+        if xpath is None:
+            xpath = xpaths[ns, path] = etree.XPath(path, namespaces={"ns": ns})
+        return xpath(node)
+
     def parse_amount(self, ns, node):
         """Parse element that contains Amount and CreditDebitIndicator."""
         if node is None:
             return 0.0
         sign = 1
         amount = 0.0
-        sign_node = node.xpath("ns:CdtDbtInd", namespaces={"ns": ns})
+        sign_node = self.xpath(ns, node, "ns:CdtDbtInd")
         if not sign_node:
-            sign_node = node.xpath("../../ns:CdtDbtInd", namespaces={"ns": ns})
+            sign_node = self.xpath(ns, node, "../../ns:CdtDbtInd")
         if sign_node and sign_node[0].text == "DBIT":
             sign = -1
-        amount_node = node.xpath("ns:Amt", namespaces={"ns": ns})
+        amount_node = self.xpath(ns, node, "ns:Amt")
         if not amount_node:
-            amount_node = node.xpath(
-                "./ns:AmtDtls/ns:TxAmt/ns:Amt", namespaces={"ns": ns}
-            )
+            amount_node = self.xpath(ns, node, "./ns:AmtDtls/ns:TxAmt/ns:Amt")
         if amount_node:
             amount = sign * float(amount_node[0].text)
         return amount
@@ -42,7 +56,7 @@ class AccountStatementImportCamtParser(models.AbstractModel):
         if not isinstance(xpath_str, list | tuple):
             xpath_str = [xpath_str]
         for search_str in xpath_str:
-            found_node = node.xpath(search_str, namespaces={"ns": ns})
+            found_node = self.xpath(ns, node, search_str)
             if found_node:
                 if isinstance(found_node[0], str):
                     attr_value = found_node[0]
@@ -185,17 +199,16 @@ class AccountStatementImportCamtParser(models.AbstractModel):
             transaction["amount"] = amount
         # remote party values
         party_type = "Dbtr"
-        party_type_node = node.xpath("../../ns:CdtDbtInd", namespaces={"ns": ns})
+        party_type_node = self.xpath(ns, node, "../../ns:CdtDbtInd")
         if party_type_node and party_type_node[0].text != "CRDT":
             party_type = "Cdtr"
-        party_node = node.xpath(
-            "./ns:RltdPties/ns:%s" % party_type, namespaces={"ns": ns}
-        )
+        party_node = self.xpath(ns, node, "./ns:RltdPties/ns:%s" % party_type)
         if party_node:
-            name_node = node.xpath(
+            name_node = self.xpath(
+                ns,
+                node,
                 f"./ns:RltdPties/ns:{party_type}/ns:Nm |"
                 f"./ns:RltdPties/ns:{party_type}/ns:Pty/ns:Nm",
-                namespaces={"ns": ns},
             )
             if name_node:
                 transaction["partner_name"] = name_node[0].text
@@ -226,11 +239,11 @@ class AccountStatementImportCamtParser(models.AbstractModel):
                 join_str=" | ",
             )
         # Get remote_account from iban or from domestic account:
-        account_node = node.xpath(
-            "./ns:RltdPties/ns:%sAcct/ns:Id" % party_type, namespaces={"ns": ns}
+        account_node = self.xpath(
+            ns, node, "./ns:RltdPties/ns:%sAcct/ns:Id" % party_type
         )
         if account_node:
-            iban_node = account_node[0].xpath("./ns:IBAN", namespaces={"ns": ns})
+            iban_node = self.xpath(ns, account_node[0], "./ns:IBAN")
             if iban_node:
                 transaction["account_number"] = iban_node[0].text
             else:
@@ -329,7 +342,7 @@ class AccountStatementImportCamtParser(models.AbstractModel):
             "-".join(transaction["transaction_type"].values()) or ""
         )
 
-        details_nodes = node.xpath("./ns:NtryDtls/ns:TxDtls", namespaces={"ns": ns})
+        details_nodes = self.xpath(ns, node, "./ns:NtryDtls/ns:TxDtls")
         if len(details_nodes) == 0:
             self.generate_narration(transaction)
             yield transaction
@@ -357,7 +370,7 @@ class AccountStatementImportCamtParser(models.AbstractModel):
             code_expr = (
                 './ns:Bal/ns:Tp/ns:CdOrPrtry/ns:Cd[text()="%s"]/../../..' % node_name
             )
-            balance_node = node.xpath(code_expr, namespaces={"ns": ns})
+            balance_node = self.xpath(ns, node, code_expr)
             if balance_node:
                 if node_name in ["OPBD", "PRCD"]:
                     start_balance_node = balance_node[0]
@@ -373,8 +386,8 @@ class AccountStatementImportCamtParser(models.AbstractModel):
             self.parse_amount(ns, end_balance_node),
         )
 
-    def parse_statement(self, ns, node):
-        """Parse a single Stmt node."""
+    def parse_statement_header(self, ns, node):
+        """Parse the values of a Stmt node, its Ntry nodes excepted."""
         result = {}
         self.add_value_from_node(
             ns,
@@ -398,20 +411,29 @@ class AccountStatementImportCamtParser(models.AbstractModel):
         result["balance_start"], result["balance_end_real"] = self.get_balance_amounts(
             ns, node
         )
-        entry_nodes = node.xpath("./ns:Ntry", namespaces={"ns": ns})
-        transactions = []
-        for entry_node in entry_nodes:
-            transactions.extend(self.parse_entry(ns, entry_node))
-        result["transactions"] = transactions
-        result["date"] = None
+        return result
+
+    def set_statement_transactions(self, statement, transactions):
+        """Set the transactions of a parsed statement, and its date."""
+        statement["transactions"] = transactions
+        statement["date"] = None
         if transactions:
-            result["date"] = sorted(
+            statement["date"] = sorted(
                 transactions, key=lambda x: x["date"], reverse=True
             )[0]["date"]
+
+    def parse_statement(self, ns, node):
+        """Parse a single Stmt node."""
+        result = self.parse_statement_header(ns, node)
+        entry_nodes = self.xpath(ns, node, "./ns:Ntry")
+        transactions = []
+        for entry_node in entry_nodes:
+            transactions.extend(self.parse_entry(ns, entry_node))
+        self.set_statement_transactions(result, transactions)
         return result
 
-    def check_version(self, ns, root):
-        """Validate validity of camt file."""
+    def check_namespace(self, ns):
+        """Validate the namespace of a camt file."""
         # Check whether it is camt at all:
         re_camt = re.compile(r"(^urn:iso:std:iso:20022:tech:xsd:camt." r"|^ISO:camt.)")
         if not re_camt.search(ns):
@@ -427,34 +449,91 @@ class AccountStatementImportCamtParser(models.AbstractModel):
         )
         if not re_camt_version.search(ns):
             raise ValueError("no camt 052 or 053 or 054: " + ns)
+
+    def check_header(self, ns, node):
+        """Validate the first node of the camt message."""
+        tag = node.tag[len(ns) + 2 :]  # strip namespace
+        if tag != "GrpHdr":
+            raise ValueError("expected GrpHdr, got: " + tag)
+
+    def check_version(self, ns, root):
+        """Validate validity of camt file."""
+        self.check_namespace(ns)
         # Check GrpHdr element:
-        root_0_0 = root[0][0].tag[len(ns) + 2 :]  # strip namespace
-        if root_0_0 != "GrpHdr":
-            raise ValueError("expected GrpHdr, got: " + root_0_0)
+        self.check_header(ns, root[0][0])
+
+    def _free_node(self, node):
+        """Free a parsed node, and its previous siblings of the same tag."""
+        node.clear()
+        previous = node.getprevious()
+        while previous is not None and previous.tag == node.tag:
+            node.getparent().remove(previous)
+            previous = node.getprevious()
+
+    def parse_stream(self, source, recover=True):
+        """Parse a camt.052 or camt.053 or camt.054 file incrementally.
+
+        Ntry nodes are parsed as soon as they are read, then freed, so the
+        memory used does not grow with the number of entries.
+
+        :param source: file name or binary file object
+        """
+        ns = entry_tag = None
+        depth = 0
+        statements = []
+        currency = None
+        account_number = None
+        transactions = []
+        entry_currency = None
+        events = etree.iterparse(source, events=("start", "end"), recover=recover)
+        for event, node in events:
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    if not node.tag.startswith("{"):
+                        raise ValueError("no camt: " + node.tag)
+                    ns = node.tag[1 : node.tag.index("}")]
+                    self.check_namespace(ns)
+                    entry_tag = "{%s}Ntry" % ns
+                elif depth == 3 and node.getprevious() is None:
+                    self.check_header(ns, node)
+                continue
+            depth -= 1
+            if depth == 3 and node.tag == entry_tag:
+                if entry_currency is None:
+                    amount_node = node.find("{%s}Amt" % ns)
+                    if amount_node is not None:
+                        entry_currency = amount_node.get("Ccy")
+                transactions.extend(self.parse_entry(ns, node))
+                self._free_node(node)
+            elif depth == 2 and node.getprevious() is not None:
+                statement = self.parse_statement_header(ns, node)
+                if "currency" not in statement and entry_currency:
+                    statement["currency"] = entry_currency
+                self.set_statement_transactions(statement, transactions)
+                transactions, entry_currency = [], None
+                if len(statement["transactions"]):
+                    if "currency" in statement:
+                        currency = statement.pop("currency")
+                    if "account_number" in statement:
+                        account_number = statement.pop("account_number")
+                    statements.append(statement)
+                self._free_node(node)
+        if ns is None:
+            raise ValueError("Not a valid xml file, or not an xml file at all.")
+        return currency, account_number, statements
 
     def parse(self, data):
         """Parse a camt.052 or camt.053 or camt.054 file."""
         try:
-            root = etree.fromstring(data, parser=etree.XMLParser(recover=True))
+            return self.parse_stream(BytesIO(data))
         except etree.XMLSyntaxError:
             try:
                 # ABNAmro is known to mix up encodings
-                root = etree.fromstring(data.decode("iso-8859-15").encode("utf-8"))
+                return self.parse_stream(
+                    BytesIO(data.decode("iso-8859-15").encode("utf-8")),
+                    recover=False,
+                )
             except etree.XMLSyntaxError:
-                root = None
-        if root is None:
-            raise ValueError("Not a valid xml file, or not an xml file at all.")
-        ns = root.tag[1 : root.tag.index("}")]
-        self.check_version(ns, root)
-        statements = []
-        currency = None
-        account_number = None
-        for node in root[0][1:]:
-            statement = self.parse_statement(ns, node)
-            if len(statement["transactions"]):
-                if "currency" in statement:
-                    currency = statement.pop("currency")
-                if "account_number" in statement:
-                    account_number = statement.pop("account_number")
-                statements.append(statement)
-        return currency, account_number, statements
+                pass
+        raise ValueError("Not a valid xml file, or not an xml file at all.")
@@ -0,0 +1,127 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
+import base64
+import copy
+import logging
+import time
+
+from lxml import etree
+
+from odoo.tests import tagged
+
+from .test_import_bank_statement import TestImport
+
+_logger = logging.getLogger(__name__)
+
+NB_ENTRIES = 100000
+
+ENTRY = """
+      <Ntry>
+        <Amt Ccy="EUR">{amount}</Amt>
+        <CdtDbtInd>{sign}</CdtDbtInd>
+        <BookgDt><Dt>2014-01-{day:02d}</Dt></BookgDt>
+        <AcctSvcrRef>BENCH/{index}</AcctSvcrRef>
+        <BkTxCd><Domn><Cd>PMNT</Cd><Fmly><Cd>RCDT</Cd><SubFmlyCd>ESCT</SubFmlyCd>
+        </Fmly></Domn></BkTxCd>
+        <NtryDtls>
+          <TxDtls>
+            <Refs><EndToEndId>E2E/{index}</EndToEndId></Refs>
+            <AmtDtls><TxAmt><Amt Ccy="EUR">{amount}</Amt></TxAmt></AmtDtls>
+            <RltdPties>
+              <Dbtr><Nm>Partner {partner}</Nm></Dbtr>
+              <DbtrAcct><Id><IBAN>NL46ABNA0499998748</IBAN></Id></DbtrAcct>
+            </RltdPties>
+            <RmtInf><Ustrd>Invoice {index}</Ustrd></RmtInf>
+          </TxDtls>
+        </NtryDtls>
+      </Ntry>"""
+
+
+def synthetic_camt(nb_entries):
+    """Return a camt.053 file holding a single statement of ``nb_entries``."""
+    entries = "".join(
+        ENTRY.format(
+            index=index,
+            amount="%.2f" % (index % 1000 + 1),
+            sign="CRDT" if index % 3 else "DBIT",
+            day=index % 28 + 1,
+            partner=index % 500,
+        )
+        for index in range(nb_entries)
+    )
+    return (
+        """<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02">
+  <BkToCstmrStmt>
+    <GrpHdr><MsgId>BENCH</MsgId><CreDtTm>2014-01-31T00:00:00</CreDtTm></GrpHdr>
+    <Stmt>
+      <Id>BENCH/1</Id>
+      <Acct><Id><IBAN>NL77ABNA0574908765</IBAN></Id><Ccy>EUR</Ccy></Acct>
+      <Bal>
+        <Tp><CdOrPrtry><Cd>OPBD</Cd></CdOrPrtry></Tp>
+        <Amt Ccy="EUR">0.00</Amt><CdtDbtInd>CRDT</CdtDbtInd>
+      </Bal>%s
+    </Stmt>
+  </BkToCstmrStmt>
+</Document>"""
+        % entries
+    ).encode()
+
+
+@tagged("-standard", "account_statement_import_camt_benchmark")
+class TestCamtBenchmark(TestImport):
+    """Not run by default, use
+    ``--test-tags account_statement_import_camt_benchmark``."""
+
+    def _parse_tree(self, data):
+        """Parse ``data`` the former way, loading the whole tree."""
+        parser = self.env["account.statement.import.camt.parser"]
+        root = etree.fromstring(data, parser=etree.XMLParser(recover=True))
+        ns = root.tag[1 : root.tag.index("}")]
+        return [parser.parse_statement(ns, node) for node in root[0][1:]]
+
+    def test_benchmark(self):
+        data = synthetic_camt(NB_ENTRIES)
+        start = time.perf_counter()
+        statements = self._parse_tree(data)
+        tree = time.perf_counter() - start
+        start = time.perf_counter()
+        currency, account_number, streamed_statements = self.env[
+            "account.statement.import.camt.parser"
+        ].parse(data)
+        stream = time.perf_counter() - start
+        self.assertEqual((currency, account_number), ("EUR", "NL77ABNA0574908765"))
+        for statement in statements:
+            del statement["currency"], statement["account_number"]
+        self.assertEqual(statements, streamed_statements)
+        _logger.info(
+            "Parsing %s camt entries: tree %.2fs, streamed %.2fs",
+            NB_ENTRIES,
+            tree,
+            stream,
+        )
+
+        # Camt transactions have no unique import id, give them one to
+        # benchmark the detection of already imported transactions
+        for transaction in streamed_statements[0]["transactions"]:
+            transaction["unique_import_id"] = transaction["ref"]
+        parsed = (currency, account_number, streamed_statements)
+        wizard = self.env["account.statement.import"].create(
+            {"statement_filename": "benchmark", "statement_file": base64.b64encode(data)}
+        )
+        result = {"statement_ids": [], "notifications": []}
+        start = time.perf_counter()
+        wizard.import_single_statement(copy.deepcopy(parsed), result)
+        first = time.perf_counter() - start
+        statement = self.env["account.bank.statement"].browse(result["statement_ids"])
+        self.assertEqual(len(statement.line_ids), NB_ENTRIES)
+        # Every transaction is a duplicate on the second import
+        start = time.perf_counter()
+        wizard.import_single_statement(copy.deepcopy(parsed), result)
+        second = time.perf_counter() - start
+        self.assertEqual(len(result["statement_ids"]), 1)
+        _logger.info(
+            "Importing %s camt entries: %.2fs, again as duplicates: %.2fs",
+            NB_ENTRIES,
+            first,
+            second,
+        )
@@ -9,6 +9,8 @@ import tempfile
 from datetime import date
 from pathlib import Path
 
+from lxml import etree
+
 from odoo.tests.common import TransactionCase
 from odoo.tools.misc import file_path
 
@@ -95,6 +97,26 @@ class TestParser(TestParserCommon):
     def test_parse_no_ntry(self):
         self._do_parse_test("test-camt053-no-ntry", "golden-camt053-no-ntry.pydata")
 
+    def test_parse_stream_as_tree(self):
+        """Streamed parsing gives the statements of the whole tree parsing"""
+        for filename in ("test-camt053", "test-camt053-txdtls", "test-camt054"):
+            with open(file_path(self._to_filepath(filename)), "rb") as camt_file:
+                data = camt_file.read()
+            root = etree.fromstring(data)
+            ns = root.tag[1 : root.tag.index("}")]
+            statements = []
+            for node in root[0][1:]:
+                statement = self.parser.parse_statement(ns, node)
+                statement.pop("currency", None)
+                statement.pop("account_number", None)
+                statements.append(statement)
+            self.assertEqual(self.parser.parse(data)[2], statements)
+
+    def test_parse_not_camt(self):
+        for data in (b"", b"<Document>No camt</Document>", b"PK\x03\x04"):
+            with self.assertRaises(ValueError):
+                self.parser.parse(data)
+
 
 class TestImport(TransactionCase):
     """Run test to import camt import."""
@@ -146,3 +146,33 @@ class TestAccountStatementImportFile(common.TransactionCase):
         )
         with self.assertRaises(UserError):
             import_wizard.import_single_statement(vals, result)
+
+    def test_import_duplicates(self):
+        import_wizard = self.import_wizard
+        transactions = [
+            {"payment_ref": "PAYMENT %s" % i, "amount": i, "unique_import_id": str(i)}
+            for i in range(1, 4)
+        ]
+        vals = (
+            self.env.company.currency_id.name,
+            "1111111111",
+            [{"name": "Statement 1", "transactions": transactions[:2]}],
+        )
+        result = {"statement_ids": [], "notifications": []}
+        import_wizard.import_single_statement(vals, result)
+        self.assertEqual(len(result["statement_ids"]), 1)
+        vals = (
+            self.env.company.currency_id.name,
+            "1111111111",
+            [{"name": "Statement 2", "transactions": transactions[1:]}],
+        )
+        import_wizard.import_single_statement(vals, result)
+        self.assertEqual(len(result["statement_ids"]), 2)
+        statement = self.env["account.bank.statement"].browse(
+            result["statement_ids"][1]
+        )
+        self.assertEqual(statement.line_ids.mapped("payment_ref"), ["PAYMENT 3"])
+        self.assertEqual(
+            result["notifications"],
+            ["1 transaction had already been imported and was ignored."],
+        )
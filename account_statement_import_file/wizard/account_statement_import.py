@@ -306,30 +306,47 @@ class AccountStatementImport(models.TransientModel):
                     raise UserError(_("Missing payment_ref on a transaction."))
         return stmts_vals
 
+    def _get_existing_statement_lines(self, unique_import_ids):
+        """Return the ids of the statement lines already imported with one of
+        ``unique_import_ids``, by unique import id."""
+        if not unique_import_ids:
+            return {}
+        # we can only have 1 line per id anyhow because we have a unicity SQL
+        # constraint
+        lines = (
+            self.env["account.bank.statement.line"]
+            .sudo()
+            .search_fetch(
+                [("unique_import_id", "in", list(unique_import_ids))],
+                ["unique_import_id"],
+            )
+        )
+        return {line.unique_import_id: line.id for line in lines}
+
     def _create_bank_statements(self, stmts_vals, result):
         """Create new bank statements from imported values,
         filtering out already imported transactions,
         and return data used by the reconciliation widget"""
         abs_obj = self.env["account.bank.statement"]
-        absl_obj = self.env["account.bank.statement.line"]
 
         # Filter out already imported transactions and create statements
         statement_ids = []
         existing_st_line_ids = {}
         for st_vals in stmts_vals:
             st_lines_to_create = []
+            existing_lines = self._get_existing_statement_lines(
+                {
+                    lvals["unique_import_id"]
+                    for lvals in st_vals["transactions"]
+                    if lvals.get("unique_import_id")
+                }
+            )
             for lvals in st_vals["transactions"]:
-                existing_line = False
+                existing_line_id = False
                 if lvals.get("unique_import_id"):
-                    existing_line = absl_obj.sudo().search(
-                        [
-                            ("unique_import_id", "=", lvals["unique_import_id"]),
-                        ],
-                        limit=1,
-                    )
-                    # we can only have 1 anyhow because we have a unicity SQL constraint
-                if existing_line:
-                    existing_st_line_ids[existing_line.id] = True
+                    existing_line_id = existing_lines.get(lvals["unique_import_id"])
+                if existing_line_id:
+                    existing_st_line_ids[existing_line_id] = True
                     if "balance_start" in st_vals:
                         st_vals["balance_start"] += float(lvals["amount"])
                 else:
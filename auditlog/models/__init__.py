@@ -6,3 +6,4 @@ from . import http_request
 from . import log
 from . import auditlog_log_line_view
 from . import autovacuum
+from . import partition
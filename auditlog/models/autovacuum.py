@@ -7,6 +7,9 @@ from odoo import api, fields, models
 
 _logger = logging.getLogger(__name__)
 
+# Number of logs deleted per query from the partitioned storage
+PARTITIONED_VACUUM_CHUNK_SIZE = 10000
+
 
 class AuditlogAutovacuum(models.TransientModel):
     _name = "auditlog.autovacuum"
@@ -19,11 +22,21 @@ class AuditlogAutovacuum(models.TransientModel):
             - HTTP requests
             - HTTP user sessions
 
+        With the partitioned storage, the monthly partitions of the logs older
+        than ``days`` are dropped as a whole.
+
         Called from a cron.
         """
         days = (days > 0) and int(days) or 0
         deadline = datetime.now() - timedelta(days=days)
         data_models = ("auditlog.log", "auditlog.http.request", "auditlog.http.session")
+        partition_model = self.env["auditlog.partition"]
+        if partition_model._is_partitioned():
+            nb_partitions = partition_model._drop_partitions(deadline)
+            _logger.info("AUTOVACUUM - %s audit log partitions dropped", nb_partitions)
+            nb_records = self._vacuum_partitioned_logs(deadline, chunk_size)
+            _logger.info("AUTOVACUUM - %s 'auditlog.log' records deleted", nb_records)
+            data_models = data_models[1:]
         for data_model in data_models:
             records = self.env[data_model].search(
                 [("create_date", "<=", fields.Datetime.to_string(deadline))],
@@ -34,3 +47,47 @@ class AuditlogAutovacuum(models.TransientModel):
             records.unlink()
             _logger.info("AUTOVACUUM - %s '%s' records deleted", nb_records, data_model)
         return True
+
+    @api.model
+    def _vacuum_partitioned_logs(self, deadline, chunk_size=None):
+        """Delete the logs older than ``deadline`` remaining in the partition
+        of the deadline month, and their lines. Only ``chunk_size`` logs are
+        deleted if given, all of them by chunks otherwise."""
+        if chunk_size:
+            return self._vacuum_partitioned_logs_chunk(deadline, chunk_size)
+        nb_records = 0
+        while True:
+            nb_chunk_records = self._vacuum_partitioned_logs_chunk(
+                deadline, PARTITIONED_VACUUM_CHUNK_SIZE
+            )
+            nb_records += nb_chunk_records
+            if nb_chunk_records < PARTITIONED_VACUUM_CHUNK_SIZE:
+                return nb_records
+
+    @api.model
+    def _vacuum_partitioned_logs_chunk(self, deadline, chunk_size):
+        self.env.flush_all()
+        cr = self.env.cr
+        cr.execute(
+            """
+            DELETE FROM auditlog_log WHERE id IN (
+                SELECT id FROM auditlog_log WHERE create_date <= %s
+                ORDER BY create_date LIMIT %s
+            ) RETURNING id
+            """,
+            (deadline, chunk_size),
+        )
+        log_ids = tuple(row[0] for row in cr.fetchall())
+        if log_ids:
+            # Lines share the `create_date` of their log, use it to only scan
+            # the partitions involved
+            cr.execute(
+                """
+                DELETE FROM auditlog_log_line
+                WHERE create_date <= %s AND log_id IN %s
+                """,
+                (deadline, log_ids),
+            )
+        self.env["auditlog.log"].invalidate_model()
+        self.env["auditlog.log.line"].invalidate_model()
+        return len(log_ids)
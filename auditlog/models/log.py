@@ -49,6 +49,13 @@ class AuditlogLog(models.Model):
             vals.update({"model_name": model.name, "model_model": model.model})
         return super().write(vals)
 
+    def unlink(self):
+        """Remove the lines explicitly with the partitioned storage, which has
+        no foreign key to cascade the deletion."""
+        if self.env["auditlog.partition"]._is_partitioned():
+            self.sudo().line_ids.unlink()
+        return super().unlink()
+
 
 class AuditlogLogLine(models.Model):
     _name = "auditlog.log.line"
@@ -67,6 +74,14 @@ class AuditlogLogLine(models.Model):
     field_name = fields.Char("Technical name", readonly=True)
     field_description = fields.Char("Description", readonly=True)
 
+    def _auto_init(self):
+        res = super()._auto_init()
+        # The partitioned logs can't be referenced by their id alone, don't let
+        # the registry create the foreign key of the lines to them
+        if self.env["auditlog.partition"]._is_partitioned():
+            self.pool._foreign_keys.pop((self._table, "log_id"), None)
+        return res
+
     @api.model_create_multi
     def create(self, vals_list):
         """Ensure field_id is not empty on creation and store field_name and
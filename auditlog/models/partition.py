@@ -0,0 +1,266 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+import logging
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from psycopg2 import sql
+
+from odoo import api, models
+from odoo.tools.sql import make_index_name
+
+_logger = logging.getLogger(__name__)
+
+# Tables which can be stored as monthly range partitions on `create_date`.
+# Log lines share the `create_date` of their log (same transaction), so the
+# partitions of both tables always cover the same logs.
+PARTITIONED_TABLES = ("auditlog_log", "auditlog_log_line")
+# Indexed columns to recreate on the partitioned tables
+PARTITIONED_INDEXES = {
+    "auditlog_log": ("model_id", "http_session_id", "http_request_id"),
+    "auditlog_log_line": ("log_id", "field_id"),
+}
+PARTITION_SUFFIX_FORMAT = "%Y%m"
+DEFAULT_PARTITION_SUFFIX = "default"
+
+
+class AuditlogPartition(models.AbstractModel):
+    _name = "auditlog.partition"
+    _description = "Auditlog - Partitioned storage"
+
+    @api.model
+    def _is_partitioned(self, table="auditlog_log"):
+        """Return whether ``table`` is a partitioned table."""
+        self.env.cr.execute(
+            """
+            SELECT 1 FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relname = %s AND c.relkind = 'p'
+            AND n.nspname = current_schema
+            """,
+            (table,),
+        )
+        return bool(self.env.cr.fetchone())
+
+    @api.model
+    def _month_start(self, date):
+        return date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @api.model
+    def _partition_name(self, table, month):
+        return "{}_p{}".format(table, month.strftime(PARTITION_SUFFIX_FORMAT))
+
+    @api.model
+    def _get_partitions(self, table):
+        """Return the ``{month: partition name}`` of the monthly partitions
+        of ``table``, the default partition being excluded."""
+        self.env.cr.execute(
+            """
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s
+            """,
+            (table,),
+        )
+        prefix = "%s_p" % table
+        partitions = {}
+        for (name,) in self.env.cr.fetchall():
+            suffix = name[len(prefix) :]
+            if not name.startswith(prefix) or suffix == DEFAULT_PARTITION_SUFFIX:
+                continue
+            month = datetime.strptime(suffix, PARTITION_SUFFIX_FORMAT)
+            partitions[month] = name
+        return partitions
+
+    @api.model
+    def _create_partition(self, table, month):
+        """Create the partition of ``table`` holding the rows of ``month``.
+
+        Rows of that month already stored in the default partition are moved
+        to the new partition, PostgreSQL would refuse the partition otherwise.
+        """
+        cr = self.env.cr
+        name = self._partition_name(table, month)
+        default_name = "{}_p{}".format(table, DEFAULT_PARTITION_SUFFIX)
+        date_from, date_to = month, month + relativedelta(months=1)
+        cr.execute(
+            sql.SQL(
+                "CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ).format(sql.Identifier(name), sql.Identifier(table))
+        )
+        cr.execute(
+            sql.SQL(
+                """
+                WITH moved AS (
+                    DELETE FROM {default} WHERE create_date >= %s
+                    AND create_date < %s RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """
+            ).format(default=sql.Identifier(default_name), name=sql.Identifier(name)),
+            (date_from, date_to),
+        )
+        cr.execute(
+            sql.SQL(
+                "ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (%s) TO (%s)"
+            ).format(sql.Identifier(table), sql.Identifier(name)),
+            (date_from, date_to),
+        )
+        _logger.info("Auditlog partition %s created", name)
+
+    @api.model
+    def _ensure_partitions(self, date_from=None, months_ahead=3):
+        """Create the missing monthly partitions from ``date_from`` (defaults
+        to the current month) up to ``months_ahead`` months ahead."""
+        if not self._is_partitioned():
+            return False
+        month = self._month_start(date_from or datetime.now())
+        last_month = self._month_start(datetime.now()) + relativedelta(
+            months=months_ahead
+        )
+        for table in PARTITIONED_TABLES:
+            existing = self._get_partitions(table)
+            current = month
+            while current <= last_month:
+                if current not in existing:
+                    self._create_partition(table, current)
+                current += relativedelta(months=1)
+        return True
+
+    @api.model
+    def _drop_partitions(self, deadline):
+        """Detach and drop the partitions only holding rows older than
+        ``deadline``. Return the number of partitions dropped."""
+        cr = self.env.cr
+        nb_dropped = 0
+        for table in PARTITIONED_TABLES:
+            for month, name in self._get_partitions(table).items():
+                if month + relativedelta(months=1) > deadline:
+                    continue
+                cr.execute(
+                    sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                        sql.Identifier(table), sql.Identifier(name)
+                    )
+                )
+                cr.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+                _logger.info("Auditlog partition %s dropped", name)
+                nb_dropped += 1
+        return nb_dropped
+
+    @api.model
+    def enable_partitioned_storage(self, months_ahead=3):
+        """Convert the log and log line tables to monthly range partitions on
+        `create_date` and move the existing rows into them.
+
+        This rewrites both tables, run it during a maintenance window.
+        The foreign key from the log lines to the logs is dropped, as
+        PostgreSQL requires the partition key in any referenced unique key:
+        deleting logs removes their lines explicitly instead.
+        """
+        if self._is_partitioned():
+            return False
+        cr = self.env.cr
+        cr.execute("SELECT min(create_date) FROM auditlog_log")
+        date_from = cr.fetchone()[0]
+        cr.execute(
+            """
+            ALTER TABLE auditlog_log_line
+            DROP CONSTRAINT IF EXISTS auditlog_log_line_log_id_fkey
+            """
+        )
+        for table in PARTITIONED_TABLES:
+            self._convert_table(table)
+        self._ensure_partitions(date_from=date_from, months_ahead=months_ahead)
+        for table in PARTITIONED_TABLES:
+            self._fill_table(table)
+        _logger.info("Auditlog partitioned storage enabled")
+        return True
+
+    @api.model
+    def _convert_table(self, table):
+        """Replace ``table`` by an empty partitioned table with the same
+        columns, the original rows being kept in a `_legacy` table."""
+        cr = self.env.cr
+        legacy = "%s_legacy" % table
+        sequence = "%s_id_seq" % table
+        # Keep the sequence alive when the legacy table is dropped
+        cr.execute(
+            sql.SQL("ALTER SEQUENCE {} OWNED BY NONE").format(
+                sql.Identifier(sequence)
+            )
+        )
+        cr.execute(
+            sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                sql.Identifier(table), sql.Identifier(legacy)
+            )
+        )
+        # Free the primary key name, it is shared with its index
+        cr.execute(
+            sql.SQL("ALTER TABLE {} RENAME CONSTRAINT {} TO {}").format(
+                sql.Identifier(legacy),
+                sql.Identifier("%s_pkey" % table),
+                sql.Identifier("%s_pkey" % legacy),
+            )
+        )
+        # The partition key must be part of the primary key
+        cr.execute(
+            sql.SQL(
+                """
+                CREATE TABLE {table} (
+                    LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+                    PRIMARY KEY (id, create_date)
+                ) PARTITION BY RANGE (create_date)
+                """
+            ).format(table=sql.Identifier(table), legacy=sql.Identifier(legacy))
+        )
+        # Catch the rows of the months without partition
+        cr.execute(
+            sql.SQL("CREATE TABLE {} PARTITION OF {} DEFAULT").format(
+                sql.Identifier("{}_p{}".format(table, DEFAULT_PARTITION_SUFFIX)),
+                sql.Identifier(table),
+            )
+        )
+        cr.execute(
+            sql.SQL("ALTER SEQUENCE {} OWNED BY {}.id").format(
+                sql.Identifier(sequence), sql.Identifier(table)
+            )
+        )
+
+    @api.model
+    def _fill_table(self, table):
+        """Move the rows of the `_legacy` table into the partitioned one, then
+        restore its foreign keys and indexes."""
+        cr = self.env.cr
+        legacy = "%s_legacy" % table
+        cr.execute(
+            sql.SQL(
+                """
+                INSERT INTO {table}
+                SELECT * FROM {legacy} WHERE create_date IS NOT NULL
+                """
+            ).format(table=sql.Identifier(table), legacy=sql.Identifier(legacy))
+        )
+        _logger.info("Auditlog: %s rows moved to partitioned %s", cr.rowcount, table)
+        cr.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+            """,
+            (legacy,),
+        )
+        foreign_keys = cr.fetchall()
+        cr.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(legacy)))
+        for name, definition in foreign_keys:
+            cr.execute(
+                sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}").format(
+                    sql.Identifier(table), sql.Identifier(name), sql.SQL(definition)
+                )
+            )
+        for column in PARTITIONED_INDEXES[table]:
+            cr.execute(
+                sql.SQL("CREATE INDEX {} ON {} ({})").format(
+                    sql.Identifier(make_index_name(table, column)),
+                    sql.Identifier(table),
+                    sql.Identifier(column),
+                )
+            )
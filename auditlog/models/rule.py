@@ -4,7 +4,7 @@
 import copy
 from collections import defaultdict
 
-from odoo import Command, _, api, fields, models
+from odoo import Command, _, api, fields, models, tools
 from odoo.exceptions import UserError
 from odoo.tools.misc import OrderedSet
 
@@ -278,6 +278,7 @@ class AuditlogRule(models.Model):
             model = self.env["ir.model"].sudo().browse(vals["model_id"])
             vals.update({"model_name": model.name, "model_model": model.model})
         new_records = super().create(vals_list)
+        self.env.registry.clear_cache()
         updated = [record._register_hook() for record in new_records]
         if any(updated):
             self._update_registry()
@@ -291,6 +292,7 @@ class AuditlogRule(models.Model):
             model = self.env["ir.model"].sudo().browse(vals["model_id"])
             vals.update({"model_name": model.name, "model_model": model.model})
         res = super().write(vals)
+        self.env.registry.clear_cache()
         if self._register_hook():
             self._update_registry()
         return res
@@ -298,6 +300,7 @@ class AuditlogRule(models.Model):
     def unlink(self):
         """Unsubscribe rules before removing them."""
         self.unsubscribe()
+        self.env.registry.clear_cache()
         return super().unlink()
 
     @api.model
@@ -535,6 +538,20 @@ class AuditlogRule(models.Model):
 
         return unlink_full if self.log_type == "full" else unlink_fast
 
+    @api.model
+    @tools.ormcache("model_id")
+    def _get_rule_data(self, model_id):
+        """Return the rule settings needed to log calls on ``model_id``.
+
+        Cached per registry to avoid searching the rule on every logged call,
+        the cache is cleared each time a rule is created, updated or removed.
+        """
+        rule = self.sudo().search([("model_id", "=", model_id)], limit=1)
+        return {
+            "fields_to_exclude": tuple(rule.fields_to_exclude_ids.mapped("name")),
+            "capture_record": rule.capture_record,
+        }
+
     def create_logs(
         self,
         uid,
@@ -547,30 +564,45 @@ class AuditlogRule(models.Model):
     ):
         """Create logs. `old_values` and `new_values` are dictionaries, e.g:
         {RES_ID: {'FIELD': VALUE, ...}}
+
+        Logs and log lines of all the records are built in memory, then
+        inserted with a single `create` call per table.
         """
         if old_values is None:
             old_values = EMPTY_DICT
         if new_values is None:
             new_values = EMPTY_DICT
+        if not res_ids:
+            return
         log_model = self.env["auditlog.log"]
         http_request_model = self.env["auditlog.http.request"]
         http_session_model = self.env["auditlog.http.session"]
         model_model = self.env[res_model]
         model_id = self.pool._auditlog_model_cache[res_model]
-        auditlog_rule = self.env["auditlog.rule"].search([("model_id", "=", model_id)])
-        fields_to_exclude = auditlog_rule.fields_to_exclude_ids.mapped("name")
+        rule_data = self._get_rule_data(model_id)
+        fields_to_exclude = list(rule_data["fields_to_exclude"])
+        # Fetch the metadata of all the logged fields at once
+        field_names = set()
+        for values in (old_values, new_values):
+            for res_id in res_ids:
+                field_names.update(values.get(res_id, EMPTY_DICT))
+        self._get_fields(model_id, field_names)
+        # Prefetch the display names of all the records at once
+        display_names = {
+            record.id: record.display_name for record in model_model.browse(res_ids)
+        }
+        common_vals = {
+            "model_id": model_id,
+            "method": method,
+            "user_id": uid,
+            "http_request_id": http_request_model.current_http_request(),
+            "http_session_id": http_session_model.current_http_session(),
+        }
+        common_vals.update(additional_log_values or {})
+        log_vals_list = []
+        log_line_vals_list = []
         for res_id in res_ids:
-            res = model_model.browse(res_id)
-            vals = {
-                "name": res.display_name,
-                "model_id": model_id,
-                "res_id": res_id,
-                "method": method,
-                "user_id": uid,
-                "http_request_id": http_request_model.current_http_request(),
-                "http_session_id": http_session_model.current_http_session(),
-            }
-            vals.update(additional_log_values or {})
+            vals = dict(common_vals, name=display_names[res_id], res_id=res_id)
             diff = DictDiffer(
                 new_values.get(res_id, EMPTY_DICT), old_values.get(res_id, EMPTY_DICT)
             )
@@ -589,7 +621,7 @@ class AuditlogRule(models.Model):
                 vals["line_ids"] = self._create_log_line_on_write(
                     vals, diff.changed(), old_values, new_values, fields_to_exclude
                 )
-            elif method == "unlink" and auditlog_rule.capture_record:
+            elif method == "unlink" and rule_data["capture_record"]:
                 vals["line_ids"] = self._create_log_line_on_read(
                     vals,
                     list(old_values.get(res_id, EMPTY_DICT).keys()),
@@ -597,30 +629,47 @@ class AuditlogRule(models.Model):
                     fields_to_exclude,
                 )
             if method == "unlink" or vals.get("line_ids", {}):
-                log_model.create(vals)
-
-    def _get_field(self, model_id, field_name):
+                # Lines are created afterwards in a single batch
+                log_line_vals_list.append(
+                    [command[2] for command in vals.pop("line_ids", [])]
+                )
+                log_vals_list.append(vals)
+        if not log_vals_list:
+            return
+        logs = log_model.create(log_vals_list)
+        all_line_vals = []
+        for log, line_vals_list in zip(logs, log_line_vals_list, strict=True):
+            for line_vals in line_vals_list:
+                line_vals["log_id"] = log.id
+                all_line_vals.append(line_vals)
+        if all_line_vals:
+            self.env["auditlog.log.line"].create(all_line_vals)
+
+    def _get_fields(self, model_id, field_names):
+        """Fill the field cache for all the ``field_names`` of the model in a
+        single query, and return their data as a dictionary."""
         model = self.env["ir.model"].sudo().browse(model_id)
-        cache = self.pool._auditlog_field_cache
-        if field_name not in cache.get(model.model, {}):
-            cache.setdefault(model.model, {})
-            # - we use 'search()' then 'read()' instead of the 'search_read()'
-            #   to take advantage of the 'classic_write' loading
-            # - search the field in the current model and those it inherits
+        cache = self.pool._auditlog_field_cache.setdefault(model.model, {})
+        missing = set(field_names) - set(cache)
+        if missing:
             field_model = self.env["ir.model.fields"].sudo()
             all_model_ids = [model.id]
             all_model_ids.extend(model.inherited_model_ids.ids)
-            field = field_model.search(
-                [("model_id", "in", all_model_ids), ("name", "=", field_name)]
-            )
-            # The field can be a dummy one, like 'in_group_X' on 'res.users'
-            # As such we can't log it (field_id is required to create a log)
-            if not field:
-                cache[model.model][field_name] = False
-            else:
-                field_data = field.read(load="_classic_write")[0]
-                cache[model.model][field_name] = field_data
-        return cache[model.model][field_name]
+            fields_data = field_model.search(
+                [("model_id", "in", all_model_ids), ("name", "in", list(missing))],
+                order="id",
+            ).read(load="_classic_write")
+            for field_data in fields_data:
+                # Keep the first match, like a search on the field name
+                if cache.get(field_data["name"]) is None:
+                    cache[field_data["name"]] = field_data
+            # Dummy fields, like 'in_group_X' on 'res.users', can't be logged
+            for field_name in missing:
+                cache.setdefault(field_name, False)
+        return {field_name: cache[field_name] for field_name in field_names}
+
+    def _get_field(self, model_id, field_name):
+        return self._get_fields(model_id, [field_name])[field_name]
 
     def _create_log_line_on_read(
         self, log_vals, fields_list, read_values, fields_to_exclude
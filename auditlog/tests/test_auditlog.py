@@ -255,6 +255,43 @@ class AuditlogCommon:
         )
         self.assertEqual(len(log3), 1)
 
+    def test_LogBatch(self):
+        """Create and write several records at once, each one gets its log
+        with its own lines."""
+        self.groups_rule.subscribe()
+        groups = self.env["res.groups"].create(
+            [{"name": "testgroup batch %s" % i} for i in range(3)]
+        )
+        name_field = self.env["ir.model.fields"]._get("res.groups", "name")
+        logs = self.env["auditlog.log"].search(
+            [
+                ("model_id", "=", self.groups_model_id),
+                ("method", "=", "create"),
+                ("res_id", "in", groups.ids),
+            ]
+        )
+        self.assertEqual(sorted(logs.mapped("res_id")), sorted(groups.ids))
+        for log in logs:
+            name_line = log.line_ids.filtered(lambda x: x.field_id == name_field)
+            self.assertEqual(name_line.new_value_text, groups.browse(log.res_id).name)
+        groups.write({"name": "testgroup batch renamed"})
+        logs = self.env["auditlog.log"].search(
+            [
+                ("model_id", "=", self.groups_model_id),
+                ("method", "=", "write"),
+                ("res_id", "in", groups.ids),
+            ]
+        )
+        self.assertEqual(sorted(logs.mapped("res_id")), sorted(groups.ids))
+        for log in logs:
+            name_line = log.line_ids.filtered(lambda x: x.field_id == name_field)
+            self.assertEqual(name_line.new_value_text, "testgroup batch renamed")
+            if self.groups_rule.log_type == "full":
+                self.assertEqual(
+                    name_line.old_value_text,
+                    "testgroup batch %s" % groups.ids.index(log.res_id),
+                )
+
     def test_LogDelete(self):
         """Tests unlink results"""
         self.groups_rule.subscribe()
@@ -0,0 +1,121 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+import logging
+import time
+
+from odoo.tests import tagged
+
+from ..models.rule import DictDiffer
+from .common import AuditLogRuleCommon
+
+_logger = logging.getLogger(__name__)
+
+NB_RECORDS = 10000
+
+
+@tagged("-standard", "auditlog_benchmark")
+class TestAuditlogBenchmark(AuditLogRuleCommon):
+    """Compare per-record and batched logging.
+
+    Not run by default, use ``--test-tags auditlog_benchmark`` to run it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partner_model_id = cls.env.ref("base.model_res_partner").id
+        cls.partners = cls.env["res.partner"].create(
+            [
+                {"name": "Partner %s" % i, "email": "partner%s@example.com" % i}
+                for i in range(NB_RECORDS)
+            ]
+        )
+        cls.old_values = {
+            partner.id: {"name": partner.name, "email": partner.email}
+            for partner in cls.partners
+        }
+        cls.new_values = {
+            partner.id: {"name": partner.name + " (new)", "email": partner.email}
+            for partner in cls.partners
+        }
+        cls.partner_rule = cls.create_rule(
+            {
+                "name": "benchmark rule for partners",
+                "model_id": cls.partner_model_id,
+                "log_type": "full",
+            }
+        )
+        cls.partner_rule.subscribe()
+
+    def _count_logs(self, method):
+        logs = self.env["auditlog.log"].search(
+            [("model_id", "=", self.partner_model_id), ("method", "=", method)]
+        )
+        return len(logs), len(logs.line_ids)
+
+    def _create_logs_per_record(self, method, old_values, new_values):
+        """Log like ``create_logs`` did before batching: one rule search per
+        call, then one log created with its lines for each record."""
+        rule_model = self.env["auditlog.rule"].sudo()
+        log_model = self.env["auditlog.log"].sudo()
+        old_values = old_values or {}
+        new_values = new_values or {}
+        rule = rule_model.search([("model_id", "=", self.partner_model_id)])
+        fields_to_exclude = rule.fields_to_exclude_ids.mapped("name")
+        for res_id in self.partners.ids:
+            vals = {
+                "name": self.env["res.partner"].browse(res_id).display_name,
+                "model_id": self.partner_model_id,
+                "res_id": res_id,
+                "method": method,
+                "user_id": self.env.uid,
+                "log_type": "full",
+            }
+            diff = DictDiffer(new_values.get(res_id, {}), old_values.get(res_id, {}))
+            if method == "create":
+                vals["line_ids"] = rule_model._create_log_line_on_create(
+                    vals, diff.added(), new_values, fields_to_exclude
+                )
+            else:
+                vals["line_ids"] = rule_model._create_log_line_on_write(
+                    vals, diff.changed(), old_values, new_values, fields_to_exclude
+                )
+            log_model.create(vals)
+
+    def _benchmark(self, method, old_values, new_values):
+        rule_model = self.env["auditlog.rule"].sudo()
+        start = time.perf_counter()
+        self._create_logs_per_record(method, old_values, new_values)
+        self.env.flush_all()
+        per_record = time.perf_counter() - start
+        per_record_counts = self._count_logs(method)
+        self.env["auditlog.log"].search(
+            [("model_id", "=", self.partner_model_id)]
+        ).unlink()
+
+        start = time.perf_counter()
+        rule_model.create_logs(
+            self.env.uid,
+            "res.partner",
+            self.partners.ids,
+            method,
+            old_values,
+            new_values,
+            {"log_type": "full"},
+        )
+        self.env.flush_all()
+        batched = time.perf_counter() - start
+        self.assertEqual(self._count_logs(method), per_record_counts)
+        _logger.info(
+            "Auditlog %s of %s records: per-record %.2fs, batched %.2fs (x%.1f)",
+            method,
+            NB_RECORDS,
+            per_record,
+            batched,
+            per_record / batched,
+        )
+
+    def test_benchmark_create(self):
+        self._benchmark("create", None, self.new_values)
+
+    def test_benchmark_write(self):
+        self._benchmark("write", self.old_values, self.new_values)
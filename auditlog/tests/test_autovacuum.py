@@ -42,3 +42,54 @@ class TestAuditlogAutovacuum(AuditLogRuleCommon):
             [("model_id", "=", self.groups_model_id), ("res_id", "=", group.id)]
         )
         self.assertEqual(nb_logs, 0)
+
+    def test_autovacuum_partitioned(self):
+        log_model = self.env["auditlog.log"]
+        partition_model = self.env["auditlog.partition"]
+        group = self.env["res.groups"].create({"name": "testgroup1"})
+        self.env.flush_all()
+        self.assertTrue(partition_model.enable_partitioned_storage())
+        self.assertTrue(partition_model._is_partitioned("auditlog_log_line"))
+        # Existing logs are kept and new ones go to the partitions
+        group.write({"name": "testgroup2"})
+        logs = log_model.search(
+            [("model_id", "=", self.groups_model_id), ("res_id", "=", group.id)]
+        )
+        self.assertEqual(len(logs), 2)
+        self.assertTrue(logs.line_ids)
+        time.sleep(1)
+        self.env["auditlog.autovacuum"].autovacuum(days=0)
+        nb_logs = log_model.search_count(
+            [("model_id", "=", self.groups_model_id), ("res_id", "=", group.id)]
+        )
+        self.assertEqual(nb_logs, 0)
+
+    def test_upgrade_partitioned(self):
+        partition_model = self.env["auditlog.partition"]
+        self.env.flush_all()
+        self.assertTrue(partition_model.enable_partitioned_storage())
+        # Initialize the models like a module upgrade does
+        self.registry.init_models(
+            self.env.cr,
+            ["auditlog.log", "auditlog.log.line"],
+            {"module": "auditlog", "update_custom_fields": True},
+        )
+        self.env.cr.execute(
+            """
+            SELECT 1 FROM pg_constraint
+            WHERE conrelid = 'auditlog_log_line'::regclass AND contype = 'f'
+            AND conkey = ARRAY[(
+                SELECT attnum FROM pg_attribute
+                WHERE attrelid = 'auditlog_log_line'::regclass
+                AND attname = 'log_id'
+            )]
+            """
+        )
+        self.assertFalse(self.env.cr.fetchone())
+        group = self.env["res.groups"].create({"name": "testgroup1"})
+        group.write({"name": "testgroup2"})
+        logs = self.env["auditlog.log"].search(
+            [("model_id", "=", self.groups_model_id), ("res_id", "=", group.id)]
+        )
+        self.assertEqual(len(logs), 2)
+        self.assertTrue(logs.line_ids)
@@ -3,10 +3,13 @@
 # Copyright 2016 Grupo ESOC Ingenieria de Servicios, S.L.U. - Jairo Llopis
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import json
 import logging
 import os
 import shutil
+import tempfile
 import traceback
+from collections import Counter
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 from glob import iglob
@@ -19,6 +22,36 @@ from odoo.service import db
 
 _logger = logging.getLogger(__name__)
 
+# Folder of the incremental backups holding the attachment contents
+BLOBS_FOLDER = "blobs"
+MANIFEST_EXT = "incremental.json"
+
+
+class LocalFolder:
+    """Local counterpart of the :class:`pysftp.Connection` methods used by
+    incremental backups."""
+
+    def makedirs(self, path):
+        os.makedirs(path, exist_ok=True)
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def open(self, path, mode="r"):
+        return open(path, mode)
+
+    def put(self, localpath, path):
+        shutil.copyfile(localpath, path)
+
+    def rename(self, src, dst):
+        os.replace(src, dst)
+
+    def unlink(self, path):
+        os.unlink(path)
+
 
 class DbBackup(models.Model):
     _description = "Database Backup"
@@ -89,6 +122,7 @@ class DbBackup(models.Model):
         [
             ("zip", "zip (includes filestore)"),
             ("dump", "pg_dump custom format (without filestore)"),
+            ("incremental", "incremental (pg_dump and new attachments)"),
         ],
         default="zip",
         help="Choose the format for this backup.",
@@ -142,63 +176,185 @@ class DbBackup(models.Model):
             raise UserError(_("Connection Test Failed!")) from exc
 
     def action_backup(self):
-        """Run selected backups."""
-        backup = None
-        successful = self.browse()
+        """Run selected backups.
 
-        # Start with local storage
-        for rec in self.filtered(lambda r: r.method == "local"):
-            filename = self.filename(datetime.now(), ext=rec.backup_format)
-            with rec.backup_log():
-                # Directory must exist
-                try:
-                    os.makedirs(rec.folder)
-                except OSError as exc:
-                    _logger.exception("Action backup - OSError: %s" % exc)
+        The database is dumped once per format, the dump being reused for
+        all the backups of the run.
+        """
+        dumps = {}
+        successful = self.browse()
+        try:
+            # Start with local storage
+            for rec in self.filtered(lambda r: r.method == "local"):
+                filename = self.filename(datetime.now(), ext=rec.backup_format)
+                with rec.backup_log():
+                    # Directory must exist
+                    try:
+                        os.makedirs(rec.folder)
+                    except OSError as exc:
+                        _logger.exception("Action backup - OSError: %s" % exc)
 
-                with open(os.path.join(rec.folder, filename), "wb") as destiny:
+                    path = os.path.join(rec.folder, filename)
+                    if rec.backup_format == "incremental":
+                        rec._backup_incremental(LocalFolder(), rec._get_dump(dumps))
                     # Copy the cached backup
-                    if backup:
-                        with open(backup) as cached:
-                            shutil.copyfileobj(cached, destiny)
+                    elif rec._get_dump_format() in dumps:
+                        with open(path, "wb") as destiny:
+                            shutil.copyfileobj(rec._get_dump(dumps), destiny)
                     # Generate new backup
                     else:
-                        db.dump_db(
-                            self.env.cr.dbname, destiny, backup_format=rec.backup_format
-                        )
-                        backup = backup or destiny.name
-                successful |= rec
+                        rec._get_dump(dumps, path)
+                    successful |= rec
 
-        # Ensure a local backup exists if we are going to write it remotely
-        sftp = self.filtered(lambda r: r.method == "sftp")
-        if sftp:
+            sftp = self.filtered(lambda r: r.method == "sftp")
             for rec in sftp:
                 filename = self.filename(datetime.now(), ext=rec.backup_format)
                 with rec.backup_log():
-                    cached = db.dump_db(
-                        self.env.cr.dbname, None, backup_format=rec.backup_format
-                    )
+                    cached = rec._get_dump(dumps)
+                    with rec.sftp_connection() as remote:
+                        # Directory must exist
+                        try:
+                            remote.makedirs(rec.folder)
+                        except pysftp.ConnectionException as exc:
+                            _logger.exception("pysftp ConnectionException: %s" % exc)
 
-                    with cached:
-                        with rec.sftp_connection() as remote:
-                            # Directory must exist
-                            try:
-                                remote.makedirs(rec.folder)
-                            except pysftp.ConnectionException as exc:
-                                _logger.exception(
-                                    "pysftp ConnectionException: %s" % exc
-                                )
-
-                            # Copy cached backup to remote server
+                        if rec.backup_format == "incremental":
+                            rec._backup_incremental(remote, cached)
+                        # Copy cached backup to remote server
+                        else:
                             with remote.open(
                                 os.path.join(rec.folder, filename), "wb"
                             ) as destiny:
                                 shutil.copyfileobj(cached, destiny)
-                        successful |= rec
+                    successful |= rec
+        finally:
+            for dump in dumps.values():
+                dump.close()
 
         # Remove old files for successful backups
         successful.cleanup()
 
+    def _get_dump_format(self):
+        """Return the format of the database dump needed by this backup."""
+        self.ensure_one()
+        if self.backup_format == "incremental":
+            return "dump"
+        return self.backup_format
+
+    def _get_dump(self, dumps, path=None):
+        """Return a readable file holding the database dump needed by this
+        backup, the database being dumped only once per format and run.
+
+        :param dict dumps: Open dumps of the current run, by format.
+        :param str path: Dump the database to this file instead of a
+            temporary one, when it has not been dumped yet.
+        """
+        dump_format = self._get_dump_format()
+        if dump_format not in dumps:
+            if path:
+                with open(path, "wb") as destiny:
+                    db.dump_db(self.env.cr.dbname, destiny, backup_format=dump_format)
+                dump = open(path, "rb")
+            else:
+                dump = tempfile.TemporaryFile()
+                try:
+                    db.dump_db(self.env.cr.dbname, dump, backup_format=dump_format)
+                except Exception:
+                    dump.close()
+                    raise
+            dumps[dump_format] = dump
+        dump = dumps[dump_format]
+        dump.seek(0)
+        return dump
+
+    @api.model
+    def _get_attachment_blobs(self):
+        """Return the blob name of the attachments stored in the filestore,
+        by file name in the filestore.
+
+        Blobs are named after the checksum of the attachment contents, so
+        identical contents are only stored once.
+        """
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT store_fname, checksum FROM ir_attachment
+            WHERE store_fname IS NOT NULL
+            """
+        )
+        return {
+            store_fname: checksum or os.path.basename(store_fname)
+            for store_fname, checksum in self.env.cr.fetchall()
+        }
+
+    @staticmethod
+    def _blob_path(folder, blob):
+        return os.path.join(folder, BLOBS_FOLDER, blob[:2], blob)
+
+    def _read_manifests(self, storage):
+        """Return the manifests of the incremental backups of this folder,
+        by file name."""
+        self.ensure_one()
+        manifests = {}
+        for name in storage.listdir(self.folder):
+            if name.endswith(".%s" % MANIFEST_EXT):
+                with storage.open(os.path.join(self.folder, name)) as manifest:
+                    manifests[name] = json.load(manifest)
+        return manifests
+
+    def _backup_incremental(self, storage, dump):
+        """Store an incremental backup of the database.
+
+        The ``dump`` is stored along with the attachments which are not in
+        any previous backup yet, then a manifest listing the attachments of
+        the backup is written. Blobs referenced by a manifest are therefore
+        always stored completely.
+
+        :param storage: :class:`LocalFolder` or :class:`pysftp.Connection`.
+        :param dump: Readable file holding the database dump.
+        """
+        self.ensure_one()
+        manifest_name = self.filename(datetime.now(), "incremental")
+        dump_name = "%s.dump" % manifest_name[: -len(".json")]
+        storage.makedirs(os.path.join(self.folder, BLOBS_FOLDER))
+        stored_blobs = set()
+        for manifest in self._read_manifests(storage).values():
+            stored_blobs.update(manifest["attachments"].values())
+
+        with storage.open(os.path.join(self.folder, dump_name), "wb") as destiny:
+            shutil.copyfileobj(dump, destiny)
+
+        filestore = tools.config.filestore(self.env.cr.dbname)
+        attachments = {}
+        nb_copied = 0
+        for store_fname, blob in self._get_attachment_blobs().items():
+            full_path = os.path.join(filestore, store_fname)
+            if not os.path.isfile(full_path):
+                _logger.warning("Attachment file %s not found, skipped", full_path)
+                continue
+            attachments[store_fname] = blob
+            if blob not in stored_blobs:
+                blob_path = self._blob_path(self.folder, blob)
+                storage.makedirs(os.path.dirname(blob_path))
+                storage.put(full_path, blob_path)
+                stored_blobs.add(blob)
+                nb_copied += 1
+
+        manifest = {
+            "database": self.env.cr.dbname,
+            "dump": dump_name,
+            "attachments": attachments,
+        }
+        tmp_path = os.path.join(self.folder, "%s.tmp" % manifest_name)
+        with storage.open(tmp_path, "w") as destiny:
+            destiny.write(json.dumps(manifest))
+        storage.rename(tmp_path, os.path.join(self.folder, manifest_name))
+        _logger.info(
+            "Incremental backup %s: %d attachments, %d new",
+            manifest_name,
+            len(attachments),
+            nb_copied,
+        )
+
     @api.model
     def action_backup_all(self):
         """Run all scheduled backups."""
@@ -226,6 +382,13 @@ class DbBackup(models.Model):
         now = datetime.now()
         for rec in self.filtered("days_to_keep"):
             with rec.cleanup_log():
+                if rec.backup_format == "incremental":
+                    with rec.storage() as storage:
+                        rec._cleanup_incremental(
+                            storage, now - timedelta(days=rec.days_to_keep)
+                        )
+                    continue
+
                 bu_format = rec.backup_format
                 file_extension = bu_format == "zip" and "dump.zip" or bu_format
                 oldest = self.filename(
@@ -248,6 +411,33 @@ class DbBackup(models.Model):
                             ):
                                 remote.unlink(f"{rec.folder}/{name}")
 
+    def _cleanup_incremental(self, storage, deadline):
+        """Remove the incremental backups older than ``deadline``, then the
+        blobs no remaining manifest refers to.
+
+        Manifests are removed first, so an interrupted cleanup may leave
+        unreferenced blobs behind but never a manifest with missing blobs.
+        """
+        self.ensure_one()
+        oldest = self.filename(deadline, "incremental")
+        manifests = self._read_manifests(storage)
+        references = Counter()
+        for manifest in manifests.values():
+            references.update(set(manifest["attachments"].values()))
+        for name, manifest in sorted(manifests.items()):
+            if name >= oldest:
+                continue
+            storage.unlink(os.path.join(self.folder, name))
+            dump_path = os.path.join(self.folder, manifest["dump"])
+            if storage.exists(dump_path):
+                storage.unlink(dump_path)
+            references.subtract(set(manifest["attachments"].values()))
+        for blob, count in references.items():
+            if count <= 0:
+                blob_path = self._blob_path(self.folder, blob)
+                if storage.exists(blob_path):
+                    storage.unlink(blob_path)
+
     @contextmanager
     def cleanup_log(self):
         """Log a possible cleanup failure."""
@@ -277,9 +467,19 @@ class DbBackup(models.Model):
         :param str ext: Extension of the file. Default: dump.zip
         """
         return "{:%Y_%m_%d_%H_%M_%S}.{ext}".format(
-            when, ext="dump.zip" if ext == "zip" else ext
+            when, ext={"zip": "dump.zip", "incremental": MANIFEST_EXT}.get(ext, ext)
         )
 
+    @contextmanager
+    def storage(self):
+        """Return the storage of the incremental backups."""
+        self.ensure_one()
+        if self.method == "sftp":
+            with self.sftp_connection() as remote:
+                yield remote
+        else:
+            yield LocalFolder()
+
     def sftp_connection(self):
         """Return a new SFTP connection with found parameters."""
         self.ensure_one()
@@ -6,6 +6,8 @@
 
 import logging
 import os
+import shutil
+import tempfile
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 from unittest.mock import PropertyMock, patch
@@ -15,6 +17,7 @@ import pysftp
 from odoo import tools
 from odoo.exceptions import UserError
 
+from odoo.addons.auto_backup.models.db_backup import LocalFolder
 from odoo.addons.base.tests.common import BaseCommon
 
 _logger = logging.getLogger(__name__)
@@ -137,6 +140,64 @@ class TestDbBackup(BaseCommon):
         generated_backup = [f for f in os.listdir(rec_id.folder) if f >= filename]
         self.assertEqual(1, len(generated_backup))
 
+    def test_action_backup_incremental(self):
+        """It should only copy new attachments and remove unused ones"""
+        rec_id = self.new_record("local")
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        rec_id.write({"folder": folder, "backup_format": "incremental"})
+        Attachment = self.env["ir.attachment"]
+        old_attachment = Attachment.create({"name": "old.txt", "raw": b"old"})
+        old_blob = rec_id._blob_path(folder, old_attachment.checksum)
+        with patch("%s.datetime" % model) as mock_date:
+            mock_date.now.return_value = datetime.now() - timedelta(days=3)
+            rec_id.action_backup()
+        self.assertTrue(os.path.isfile(old_blob))
+
+        old_store_fname = old_attachment.store_fname
+        old_attachment.unlink()
+        new_attachment = Attachment.create({"name": "new.txt", "raw": b"new"})
+        new_blob = rec_id._blob_path(folder, new_attachment.checksum)
+        with patch.object(
+            LocalFolder, "put", autospec=True, side_effect=LocalFolder.put
+        ) as put:
+            rec_id.action_backup()
+        put.assert_called_once()
+        self.assertTrue(os.path.isfile(new_blob))
+        # The old backup and the blobs only it referred to are removed
+        self.assertFalse(os.path.exists(old_blob))
+        manifests = rec_id._read_manifests(LocalFolder())
+        self.assertEqual(len(manifests), 1)
+        manifest = list(manifests.values())[0]
+        self.assertEqual(
+            manifest["attachments"][new_attachment.store_fname],
+            new_attachment.checksum,
+        )
+        self.assertNotIn(old_store_fname, manifest["attachments"])
+        self.assertEqual(
+            sorted(f for f in os.listdir(folder) if f.endswith(".dump")),
+            [manifest["dump"]],
+        )
+
+    def test_action_backup_dump_once(self):
+        """It should dump the database once for all the backups of a run"""
+        rec_id = self.new_record("local")
+        folders = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for folder in folders:
+            self.addCleanup(shutil.rmtree, folder)
+        rec_id.folder = folders[0]
+        other = rec_id.copy({"folder": folders[1]})
+        with patch("%s.db.dump_db" % model) as dump_db:
+            dump_db.side_effect = lambda dbname, stream, backup_format: stream.write(
+                b"dump"
+            )
+            (rec_id | other).action_backup()
+        dump_db.assert_called_once()
+        for folder in folders:
+            (filename,) = os.listdir(folder)
+            with open(os.path.join(folder, filename), "rb") as backup:
+                self.assertEqual(backup.read(), b"dump")
+
     def test_action_backup_sftp_mkdirs(self):
         """It should create remote dirs"""
         rec_id = self.new_record()
@@ -231,6 +292,12 @@ class TestDbBackup(BaseCommon):
         res = self.Model.filename(now, ext="zip")
         self.assertTrue(res.endswith(".dump.zip"))
 
+    def test_filename_incremental(self):
+        """It should return a manifest filename"""
+        now = datetime.now()
+        res = self.Model.filename(now, ext="incremental")
+        self.assertTrue(res.endswith(".incremental.json"))
+
     def test_filename_dump(self):
         """It should return a dump filenam"""
         now = datetime.now()
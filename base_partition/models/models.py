@@ -3,6 +3,7 @@
 
 from odoo import _, models
 from odoo.exceptions import UserError
+from odoo.tools import first
 
 
 class Base(models.AbstractModel):
@@ -12,37 +13,91 @@ class Base(models.AbstractModel):
         """Returns a dictionary forming a partition of self into a dictionary
         value/recordset for each value obtained from the accessor.
         The accessor itself can be either a string that can be passed to mapped,
-        or an arbitrary function.
-        Note that it is always at least as fast to pass a function,
-        hence the current implementation.
+        an arbitrary function, or a list/tuple of those, in which case the keys
+        are the tuples of their values.
+        Field accessors are read column-wise from the cache, prefetching the
+        whole recordset, and each recordset of the result is built once.
         If we have a 'field.subfield' accessor such that subfield is not a relational
         then the result is a list (not hashable). Then the str(key) are used.
         In the general case a value could both not be hashable nor stringifiable,
         in a which case this function would crash.
         """
-        partition = {}
+        return {
+            key: self._browse(self.env, tuple(ids), self._prefetch_ids)
+            for key, ids in self._partition_ids(accessor).items()
+        }
+
+    def partition_batch(self, accessor, batch_size=None):
+        """Yield the (key, recordset) pairs of the partition of self, each
+        recordset of the partition being split in batches of batch_size.
+        The recordsets are only built when they are consumed.
+        """
+        batch_size = self._get_batch_size(batch_size)
+        for key, ids in self._partition_ids(accessor).items():
+            for i in range(0, len(ids), batch_size):
+                yield key, self._browse(
+                    self.env, tuple(ids[i : i + batch_size]), self._prefetch_ids
+                )
 
-        if isinstance(accessor, str):
-            if "." not in accessor:
-                func = lambda r: r[accessor]  # noqa: E731
-            else:
-                func = lambda r: r.mapped(accessor)  # noqa: E731
+    def _partition_ids(self, accessor):
+        """Return the ``{key: [ids]}`` partition of self by accessor."""
+        if isinstance(accessor, (list, tuple)):
+            keys = zip(*(self._partition_keys(item) for item in accessor))
         else:
-            func = accessor
+            keys = self._partition_keys(accessor)
+        partition = {}
+        for record_id, key in zip(self._ids, keys):
+            partition.setdefault(key, []).append(record_id)
+        return partition
 
-        for record in self:
-            key = func(record)
-            if not key.__hash__:
-                key = str(key)
-            if key not in partition:
-                partition[key] = record
-            else:
-                partition[key] += record
+    def _partition_keys(self, accessor):
+        """Return the hashable keys of the records of self by accessor, in
+        the order of self."""
+        if not isinstance(accessor, str):
+            keys = [accessor(record) for record in self]
+        elif "." not in accessor:
+            keys = self._partition_field_values(accessor)
+        else:
+            # record.mapped("a.b") is record.a.mapped("b"): only map the
+            # rest of the path once per distinct value of the first field
+            fname, path = accessor.split(".", 1)
+            mapped = {}
+            keys = []
+            for value in self._partition_field_values(fname):
+                if value._ids not in mapped:
+                    mapped[value._ids] = value.mapped(path)
+                keys.append(mapped[value._ids])
+        return [key if key.__hash__ else str(key) for key in keys]
 
-        return partition
+    def _partition_field_values(self, fname):
+        """Return the values of field fname of the records of self, in the
+        order of self. Like Field.mapped, the values are read from the cache
+        in bulk, the missing ones being fetched by batches of prefetched
+        records, but each distinct value is only converted once."""
+        field = self._fields[fname]
+        if field.compute and field.store:
+            field.recompute(self)
+        cache = self.env.cache
+        raw_values = cache.get_until_miss(self, field)
+        while len(raw_values) < len(self):
+            remaining = self._browse(
+                self.env, self._ids[len(raw_values) :], self._prefetch_ids
+            )
+            first(remaining)[fname]
+            raw_values += cache.get_until_miss(remaining, field)
+        converted = {}
+        values = []
+        for value in raw_values:
+            try:
+                if value not in converted:
+                    converted[value] = field.convert_to_record(value, self)
+                values.append(converted[value])
+            except TypeError:
+                # unhashable cache value, e.g. a json field
+                values.append(field.convert_to_record(value, self))
+        return values
 
-    def batch(self, batch_size=None):
-        """Yield successive batches of size batch_size, or ."""
+    def _get_batch_size(self, batch_size=None):
         if not (batch_size or "_default_batch_size" in dir(self)):
             raise UserError(
                 _(
@@ -50,7 +105,11 @@ class Base(models.AbstractModel):
                     " or provide a batch_size parameter."
                 )
             )
-        batch_size = batch_size or self._default_batch_size
+        return batch_size or self._default_batch_size
+
+    def batch(self, batch_size=None):
+        """Yield successive batches of size batch_size, or ."""
+        batch_size = self._get_batch_size(batch_size)
         for i in range(0, len(self), batch_size):
             yield self[i : i + batch_size]
 
@@ -95,6 +95,39 @@ class TestPartition(TransactionCase):
         partition = (self.c1 | self.c2).partition(lambda c: "2" in c.name)
         self.assertEqual(set(partition.keys()), {True, False})
 
+    def test_partition_multi_key(self):
+        partition = self.xyz.partition(["employee", "parent_id"])
+        self.assertEqual(
+            partition,
+            {
+                (True, self.parent1): self.x,
+                (False, self.parent2): self.y | self.z,
+            },
+        )
+        partition = self.xyz.partition(("parent_id.name", lambda p: p.name > "x"))
+        self.assertEqual(
+            set(partition.keys()),
+            {(str(["parent1"]), False), (str(["parent2"]), True)},
+        )
+
+    def test_partition_same_as_per_record(self):
+        """The column-wise partition gives the keys of the per-record one."""
+        partners = self.Partner.search([])
+        for accessor in ("parent_id", "category_id", "parent_id.category_id"):
+            expected = {}
+            for partner in partners:
+                expected.setdefault(partner.mapped(accessor), partners.browse())
+                expected[partner.mapped(accessor)] |= partner
+            self.assertEqual(partners.partition(accessor), expected)
+
+    def test_partition_batch(self):
+        batches = list(self.xyz.partition_batch("parent_id", batch_size=1))
+        self.assertEqual(
+            batches,
+            [(self.parent1, self.x), (self.parent2, self.y), (self.parent2, self.z)],
+        )
+        self.assertEqual(list(self.xyz.browse().partition_batch("parent_id", 1)), [])
+
     def test_batch(self):
         """The sum of all batches should be the original recordset;
         an empty recordset should return no batch;
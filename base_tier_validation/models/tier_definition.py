@@ -1,7 +1,7 @@
 # Copyright 2017 ForgeFlow S.L. (https://www.forgeflow.com)
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 
 
 class TierDefinition(models.Model):
@@ -113,6 +113,47 @@ class TierDefinition(models.Model):
         "by same reviewer",
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache("model_name", "company_ids")
+    def _get_tier_definition_ids(self, model_name, company_ids):
+        return tuple(
+            self.sudo()
+            .with_context(active_test=True)
+            .search(
+                [
+                    ("model", "=", model_name),
+                    ("company_id", "in", [False] + list(company_ids)),
+                ],
+                order="sequence desc, id",
+            )
+            .ids
+        )
+
+    @api.model
+    def _get_tier_definitions(self, model_name, company):
+        """Return the active tier definitions of ``model_name`` applying to
+        ``company``, by descending sequence. Cached until a tier definition
+        is modified."""
+        return self.browse(
+            self._get_tier_definition_ids(model_name, tuple(company.ids))
+        )
+
     @api.onchange("review_type")
     def onchange_review_type(self):
         self.reviewer_id = None
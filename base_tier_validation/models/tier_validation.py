@@ -26,6 +26,9 @@ class TierValidation(models.AbstractModel):
     _tier_validation_manual_config = True
     _tier_validation_state_field_is_computed = False
     _tier_validation_company_field = "company_id"
+    # Evaluate the "can_review" search in SQL, disable it on models
+    # overriding _get_sequences_to_approve
+    _tier_validation_can_review_sql = True
 
     _state_field = "state"
     _state_from = ["draft"]
@@ -113,6 +116,10 @@ class TierValidation(models.AbstractModel):
 
     @api.model
     def _search_can_review(self, operator, value):
+        if self._tier_validation_can_review_sql:
+            res_ids = self._search_can_review_ids(self.env.user)
+            positive = (operator == "=") == bool(value)
+            return [("id", "in" if positive else "not in", res_ids)]
         domain = [
             ("review_ids.reviewer_ids", "=", self.env.user.id),
             ("review_ids.status", "in", ["pending", "waiting"]),
@@ -124,6 +131,51 @@ class TierValidation(models.AbstractModel):
         res_ids = self.search(domain).filtered("can_review").ids
         return [("id", "in", res_ids)]
 
+    @api.model
+    def _search_can_review_ids(self, user):
+        """Return the ids of the records ``user`` can review, evaluating
+        ``_get_sequences_to_approve`` in SQL over their open reviews."""
+        self.env["tier.review"].flush_model()
+        self.flush_model(["validation_status"])
+        reviewer_field = self.env["tier.review"]._fields["reviewer_ids"]
+        self.env.cr.execute(
+            """
+            WITH open_review AS (
+                SELECT r.res_id, r.sequence, r.can_review,
+                    COALESCE(d.approve_sequence, FALSE) AS approve_sequence,
+                    EXISTS (
+                        SELECT 1 FROM %(relation)s rel
+                        WHERE rel.%(column1)s = r.id AND rel.%(column2)s = %(uid)s
+                    ) AS mine
+                FROM tier_review r
+                LEFT JOIN tier_definition d ON d.id = r.definition_id
+                WHERE r.model = %(model)s AND r.status IN ('waiting', 'pending')
+            )
+            SELECT rev.res_id FROM open_review rev
+            JOIN %(table)s rec ON rec.id = rev.res_id
+            WHERE rec.validation_status IS DISTINCT FROM 'rejected'
+            AND EXISTS (
+                SELECT 1 FROM tier_review cr
+                WHERE cr.model = %(model)s AND cr.res_id = rev.res_id
+                AND cr.can_review
+            )
+            GROUP BY rev.res_id
+            HAVING bool_or(rev.mine AND NOT rev.approve_sequence)
+            OR min(rev.sequence) FILTER (
+                WHERE rev.mine AND rev.approve_sequence
+            ) <= min(rev.sequence)
+            """,
+            {
+                "relation": AsIs(reviewer_field.relation),
+                "column1": AsIs(reviewer_field.column1),
+                "column2": AsIs(reviewer_field.column2),
+                "table": AsIs(self._table),
+                "uid": user.id,
+                "model": self._name,
+            },
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
+
     @api.depends("review_ids")
     def _compute_reviewer_ids(self):
         for rec in self:
@@ -252,15 +304,8 @@ class TierValidation(models.AbstractModel):
             if isinstance(rec.id, models.NewId):
                 rec.need_validation = False
                 continue
-            tiers = (
-                self.env["tier.definition"]
-                .with_context(active_test=True)
-                .search(
-                    [
-                        ("model", "=", self._name),
-                        ("company_id", "in", [False] + rec._get_company().ids),
-                    ]
-                )
+            tiers = self.env["tier.definition"]._get_tier_definitions(
+                self._name, rec._get_company()
             )
             valid_tiers = any([rec.evaluate_tier(tier) for tier in tiers])
             rec.need_validation = (
@@ -769,12 +814,8 @@ class TierValidation(models.AbstractModel):
         vals_list = []
         for rec in self:
             if rec._check_state_from_condition() and rec.need_validation:
-                tier_definitions = td_obj.search(
-                    [
-                        ("model", "=", self._name),
-                        ("company_id", "in", [False] + rec._get_company().ids),
-                    ],
-                    order="sequence desc",
+                tier_definitions = td_obj._get_tier_definitions(
+                    self._name, rec._get_company()
                 )
                 sequence = 0
                 for td in tier_definitions:
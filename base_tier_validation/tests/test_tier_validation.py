@@ -1232,3 +1232,60 @@ class TierTierValidationView(CommonTierValidation):
         self.assertIn("need_validation", view["models"][model])
         self.assertIn("next_review", view["models"][model])
         self.assertIn("review_ids", view["models"][model])
+
+    def test_search_can_review_sql(self):
+        """The SQL search of can_review matches the computed field."""
+        test_record = self.test_model.create({"test_field": 2.5})
+        self.tier_def_obj.create(
+            {
+                "model_id": self.tester_model.id,
+                "review_type": "individual",
+                "reviewer_id": self.test_user_1.id,
+                "definition_domain": "[('test_field', '>', 1.0)]",
+                "approve_sequence": True,
+                "sequence": 30,
+            }
+        )
+        self.tier_def_obj.create(
+            {
+                "model_id": self.tester_model.id,
+                "review_type": "individual",
+                "reviewer_id": self.test_user_2.id,
+                "definition_domain": "[('test_field', '>', 1.0)]",
+                "approve_sequence": True,
+                "sequence": 10,
+            }
+        )
+        test_record.with_user(self.test_user_2.id).request_validation()
+        self.test_record.with_user(self.test_user_2.id).request_validation()
+        records = test_record | self.test_record
+        for user in (self.test_user_1, self.test_user_2):
+            model = self.test_model.with_user(user)
+            expected = records.with_user(user).filtered("can_review")
+            self.assertEqual(model.search([("can_review", "=", True)]), expected)
+            self.assertEqual(
+                model.search([("can_review", "=", False), ("id", "in", records.ids)]),
+                records - expected,
+            )
+            with mock.patch.object(TV, "_tier_validation_can_review_sql", False):
+                self.assertEqual(
+                    model.search([("can_review", "=", True)]), expected
+                )
+
+    def test_tier_definitions_cache(self):
+        """Tier definitions are cached until they are modified."""
+        definitions = self.tier_def_obj._get_tier_definitions(
+            self.test_model._name, self.env.company
+        )
+        self.assertIn(self.tier_definition, definitions)
+        self.assertTrue(self.test_record.need_validation)
+        self.tier_def_obj.search([("model", "=", self.test_model._name)]).write(
+            {"active": False}
+        )
+        self.assertFalse(
+            self.tier_def_obj._get_tier_definitions(
+                self.test_model._name, self.env.company
+            )
+        )
+        self.test_record.invalidate_recordset(["need_validation"])
+        self.assertFalse(self.test_record.need_validation)
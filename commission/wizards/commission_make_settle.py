@@ -1,8 +1,8 @@
 # Copyright 2022 Quartile
 # Copyright 2014-2022 Tecnativa - Pedro M. Baeza
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+from collections import defaultdict
 from datetime import date, timedelta
-from itertools import groupby
 
 from dateutil.relativedelta import relativedelta
 
@@ -68,19 +68,11 @@ class CommissionMakeSettle(models.TransientModel):
             return current_date + relativedelta(years=1)
 
     def _get_settlement(self, agent, company, currency, sett_from, sett_to):
+        """Return the existing settlement of one key. Settling reads them all
+        at once with _get_settlements, which is the method to extend."""
         self.ensure_one()
-        return self.env["commission.settlement"].search(
-            [
-                ("agent_id", "=", agent.id),
-                ("date_from", "=", sett_from),
-                ("date_to", "=", sett_to),
-                ("company_id", "=", company.id),
-                ("currency_id", "=", currency.id),
-                ("state", "=", "settled"),
-                ("settlement_type", "=", self.settlement_type),
-            ],
-            limit=1,
-        )
+        key = (agent, company, currency, sett_from, sett_to)
+        return self._get_settlements([key]).get(key, self.env["commission.settlement"])
 
     def _prepare_settlement_vals(self, agent, company, sett_from, sett_to):
         return {
@@ -97,10 +89,32 @@ class CommissionMakeSettle(models.TransientModel):
             "settlement_id": settlement.id,
         }
 
-    def _get_agent_lines(self, date_to_agent):
+    def _get_agent_lines(self, agent, date_to_agent):
         """Need to be extended according to settlement_type."""
         raise NotImplementedError()
 
+    def _get_agents_lines(self, agents, date_to):
+        """Return the agent lines to settle of all the agents.
+
+        By default, _get_agent_lines is called for each agent: extend it
+        according to settlement_type to fetch the lines with a single query.
+        """
+        model_name = False
+        line_ids = []
+        for agent in agents:
+            date_to_agent = self._get_period_start(agent, date_to)
+            agent_lines = self._get_agent_lines(agent, date_to_agent)
+            model_name = agent_lines._name
+            line_ids += agent_lines.ids
+        if not model_name:
+            return self.env["commission.line.mixin"]
+        return self.env[model_name].browse(line_ids)
+
+    def _get_lines_to_settle(self, agent_lines):
+        """Return the agent lines which can be settled, calling the
+        _skip_settlement hook of each line by default."""
+        return agent_lines.filtered(lambda line: not line._skip_settlement())
+
     @api.model
     def _agent_lines_groupby(self, agent_line):
         return agent_line.company_id, agent_line.currency_id
@@ -109,64 +123,121 @@ class CommissionMakeSettle(models.TransientModel):
     def _agent_lines_sorted(self, agent_line):
         return agent_line.company_id.id, agent_line.currency_id.id
 
-    def action_settle(self):
+    def _get_settlement_periods(self, agent_lines):
+        """Return the {(agent, invoice date): (date from, date to)} of the
+        settlement periods of the agent lines."""
+        periods = {}
+        for line in agent_lines:
+            key = (line.agent_id, line.invoice_date)
+            if key not in periods:
+                sett_from = self._get_period_start(line.agent_id, line.invoice_date)
+                sett_to = self._get_next_period_date(line.agent_id, sett_from)
+                periods[key] = (sett_from, sett_to - timedelta(days=1))
+        return periods
+
+    def _get_settlement_key(self, agent, agent_lines, sett_from, sett_to):
+        """Return the (agent, company, currency, date from, date to) of the
+        settlement of a group of agent lines. Extra items can be appended to
+        the key to settle the groups in separate settlements."""
+        line = agent_lines[0]
+        return agent, line.company_id, line.currency_id, sett_from, sett_to
+
+    def _get_settlements(self, settlement_keys):
+        """Return the {key: settlement} of the existing settlements matching
+        the keys given by _get_settlement_key, read with a single search.
+
+        Hook to extend to change which settlements are reused: the keys
+        missing from the result get a new settlement.
+        """
+        self.ensure_one()
+        if not settlement_keys:
+            return {}
+        settlements = self.env["commission.settlement"].search(
+            [
+                ("agent_id", "in", list({key[0].id for key in settlement_keys})),
+                ("date_from", "in", list({key[3] for key in settlement_keys})),
+                ("state", "=", "settled"),
+                ("settlement_type", "=", self.settlement_type),
+            ]
+        )
+        settlement_keys = set(settlement_keys)
+        result = {}
+        for settlement in settlements:
+            key = (
+                settlement.agent_id,
+                settlement.company_id,
+                settlement.currency_id,
+                settlement.date_from,
+                settlement.date_to,
+            )
+            if key in settlement_keys:
+                result.setdefault(key, settlement)
+        return result
+
+    def _resolve_settlements(self, settlement_keys):
+        """Return the settlements of the keys, the existing ones read with
+        _get_settlements and the missing ones created in batch."""
+        settlement_obj = self.env["commission.settlement"]
+        existing = self._get_settlements(settlement_keys)
+        new_keys = list(
+            dict.fromkeys(key for key in settlement_keys if key not in existing)
+        )
+        vals_list = []
+        for key in new_keys:
+            agent, company, currency, sett_from, sett_to = key[:5]
+            vals = self._prepare_settlement_vals(agent, company, sett_from, sett_to)
+            vals["currency_id"] = currency.id
+            vals_list.append(vals)
+        existing.update(zip(new_keys, settlement_obj.create(vals_list)))
+        return [existing[key] for key in settlement_keys]
+
+    def _settle(self, agents):
+        """Settle the agent lines of the agents and return the settlements.
+
+        The lines of all the agents are fetched at once, sorted with
+        _agent_lines_sorted and grouped by agent, period and
+        _agent_lines_groupby in memory. The existing settlements are
+        resolved and the missing ones created in batch, then all the
+        settlement lines are created with one create.
+        """
         self.ensure_one()
         settlement_obj = self.env["commission.settlement"]
-        settlement_line_obj = self.env["commission.settlement.line"]
-        settlement_ids = []
+        agent_lines = self._get_agents_lines(agents, self.date_to)
+        if not agent_lines:
+            return settlement_obj
+        agent_lines = self._get_lines_to_settle(agent_lines)
+        periods = self._get_settlement_periods(agent_lines)
+        groups = defaultdict(list)
+        for line in sorted(agent_lines, key=self._agent_lines_sorted):
+            sett_from, sett_to = periods[(line.agent_id, line.invoice_date)]
+            key = (line.agent_id, sett_from, sett_to, self._agent_lines_groupby(line))
+            groups[key].append(line)
+        settlements = self._resolve_settlements(
+            [
+                self._get_settlement_key(agent, lines, sett_from, sett_to)
+                for (agent, sett_from, sett_to, _group), lines in groups.items()
+            ]
+        )
+        settlement_line_vals = [
+            self._prepare_settlement_line_vals(settlement, line)
+            for settlement, lines in zip(settlements, groups.values(), strict=True)
+            for line in lines
+        ]
+        self.env["commission.settlement.line"].create(settlement_line_vals)
+        return settlement_obj.browse(list(dict.fromkeys(s.id for s in settlements)))
+
+    def action_settle(self):
+        self.ensure_one()
         agents = self.agent_ids or self.env["res.partner"].search(
             [("agent", "=", True)]
         )
-        date_to = self.date_to
-        settlement_line_vals = []
-        for agent in agents:
-            date_to_agent = self._get_period_start(agent, date_to)
-            # Get non settled elements
-            grouped_agent_lines = groupby(
-                sorted(
-                    self._get_agent_lines(agent, date_to_agent),
-                    key=self._agent_lines_sorted,
-                ),
-                key=self._agent_lines_groupby,
-            )
-            for _k, grouper_agent_lines in grouped_agent_lines:
-                agent_lines = list(grouper_agent_lines)
-                pos = 0
-                sett_to = date(year=1900, month=1, day=1)
-                settlement_line_vals = []
-                while pos < len(agent_lines):
-                    line = agent_lines[pos]
-                    pos += 1
-                    if line._skip_settlement():
-                        continue
-                    if line.invoice_date > sett_to:
-                        sett_from = self._get_period_start(agent, line.invoice_date)
-                        sett_to = self._get_next_period_date(agent, sett_from)
-                        sett_to -= timedelta(days=1)
-                        settlement = self._get_settlement(
-                            agent, line.company_id, line.currency_id, sett_from, sett_to
-                        )
-                        if not settlement:
-                            settlement = settlement_obj.create(
-                                self._prepare_settlement_vals(
-                                    agent,
-                                    line.company_id,
-                                    sett_from,
-                                    sett_to,
-                                )
-                            )
-                            settlement.currency_id = line.currency_id
-                        settlement_ids.append(settlement.id)
-                    settlement_line_vals.append(
-                        self._prepare_settlement_line_vals(settlement, line)
-                    )
-                settlement_line_obj.create(settlement_line_vals)
+        settlements = self._settle(agents)
         # go to results
-        if len(settlement_ids):
+        if settlements:
             return {
                 "name": _("Created Settlements"),
                 "type": "ir.actions.act_window",
                 "views": [[False, "list"], [False, "form"]],
                 "res_model": "commission.settlement",
-                "domain": [["id", "in", settlement_ids]],
+                "domain": [["id", "in", settlements.ids]],
             }
@@ -64,7 +64,6 @@ class ProfitLossReport(models.TransientModel):
 
     @api.model
     def view_report(self, option, comparison, comparison_type):
-        datas = []
         account_types = {
             'income': 'income',
             'income_other': 'income_other',
@@ -85,204 +84,106 @@ class ProfitLossReport(models.TransientModel):
             'equity_unaffected': 'equity_unaffected',
         }
         financial_report_id = self.browse(option)
-        current_year = fields.Date.today().year
-        current_date = fields.Date.today()
-        if financial_report_id.target_move == 'draft':
-            target_move = ['posted', 'draft']
-        else:
-            target_move = ['posted']
-        if comparison:
-            for count in range(0, int(comparison) + 1):
-                if comparison_type == "month":
-                    account_move_lines = self.env['account.move.line'].search(
-                        [(
-                            'parent_state', 'in', target_move),
-                            ('date', '>=', (current_date - datetime.timedelta(
-                                days=30 * count)).strftime('%Y-%m-01')),
-                            ('date', '<=', (current_date - datetime.timedelta(
-                                days=30 * count)).strftime('%Y-%m-12'))])
-                elif comparison_type == "year":
-                    account_move_lines = self.env['account.move.line'].search(
-                        [(
-                            'parent_state', 'in', target_move),
-                            ('date', '>=', f'{current_year - count}-01-01'),
-                            ('date', '<=', f'{current_year - count}-12-31')])
-                lists = [{'id': rec.id, 'value': [eval(i) for i in
-                                                  rec.analytic_distribution.keys()]}
-                         for rec in account_move_lines if
-                         rec.analytic_distribution]
-                if financial_report_id.analytic_ids:
-                    account_move_lines = account_move_lines.filtered(lambda
-                                                                         rec: rec.id in [
-                        lst['id'] for lst in lists if lst['value'] and any(
-                            i in financial_report_id.analytic_ids.mapped('id')
-                            for i in lst['value'])])
-                account_move_lines = account_move_lines.filtered(lambda
-                                                                     a: not financial_report_id.journal_ids or a.journal_id in financial_report_id.journal_ids)
-                account_move_lines = account_move_lines.filtered(lambda
-                                                                     a: not financial_report_id.account_ids or a.account_id in financial_report_id.account_ids)
-                account_move_lines = account_move_lines.filtered(lambda
-                                                                     a: not financial_report_id.date_from or a.date >= financial_report_id.date_from)
-                account_move_lines = account_move_lines.filtered(lambda
-                                                                     a: not financial_report_id.date_to or a.date <= financial_report_id.date_to)
-                account_entries = {}
-                for account_type in account_types.values():
-                    account_entries[account_type] = self._get_entries(
-                        account_move_lines, self.env['account.account'].search(
-                            [('account_type', '=', account_type)]),
-                        account_type)
-                total_income = sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['income', 'income_other'] for entry in
-                    account_entries[account_type][0]) - sum(
-                    float(entry['amount'].replace(',', '')) for entry in
-                    account_entries['expense_direct_cost'][0])
-                total_expense = sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['expense', 'expense_depreciation'] for entry in
-                    account_entries[account_type][0])
-                total_current_asset = sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['asset_receivable', 'asset_current', 'asset_cash',
-                     'asset_prepayments'] for entry in
-                    account_entries[account_type][0])
-                total_assets = total_current_asset + sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['asset_fixed', 'asset_non_current'] for entry in
-                    account_entries[account_type][0])
-                total_current_liability = sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['liability_current', 'liability_payable'] for entry in
-                    account_entries[account_type][0])
-                total_liability = total_current_liability + sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['liability_non_current'] for entry in
-                    account_entries[account_type][0])
-                total_unallocated_earning = (
-                                                    total_income - total_expense) + sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['equity_unaffected'] for entry in
-                    account_entries[account_type][0])
-                total_equity = total_unallocated_earning + sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['equity'] for entry in
-                    account_entries[account_type][0])
-                total = total_liability + total_equity
-                data = {
-                    'total': total_income - total_expense,
-                    'total_expense': "{:,.2f}".format(total_expense),
-                    'total_income': "{:,.2f}".format(total_income),
-                    'total_current_asset': "{:,.2f}".format(
-                        total_current_asset),
-                    'total_assets': "{:,.2f}".format(total_assets),
-                    'total_current_liability': "{:,.2f}".format(
-                        total_current_liability),
-                    'total_liability': "{:,.2f}".format(total_liability),
-                    'total_earnings': "{:,.2f}".format(
-                        total_income - total_expense),
-                    'total_unallocated_earning': "{:,.2f}".format(
-                        total_unallocated_earning),
-                    'total_equity': "{:,.2f}".format(total_equity),
-                    'total_balance': "{:,.2f}".format(total),
-                    **account_entries}
-                datas.append(data)
-        else:
-            account_move_lines = self.env['account.move.line'].search(
-                [('parent_state', 'in', target_move),
-                 ('date', '>=', f'{current_year}-01-01'),
-                 ('date', '<=', f'{current_year}-12-31')])
-            lists = [{'id': rec.id,
-                      'value': [eval(i) for i in
-                                rec.analytic_distribution.keys()]}
-                     for rec in account_move_lines if
-                     rec.analytic_distribution]
-            if financial_report_id.analytic_ids:
-                account_move_lines = account_move_lines.filtered(
-                    lambda rec: rec.id in [lst['id'] for lst in lists if
-                                           lst['value'] and any(
-                                               i in financial_report_id.analytic_ids.mapped(
-                                                   'id') for i in
-                                               lst['value'])])
-            account_move_lines = account_move_lines.filtered(lambda
-                                                                 a: not financial_report_id.journal_ids or a.journal_id in financial_report_id.journal_ids)
-            account_move_lines = account_move_lines.filtered(lambda
-                                                                 a: not financial_report_id.account_ids or a.account_id in financial_report_id.account_ids)
-            account_move_lines = account_move_lines.filtered(lambda
-                                                                 a: not financial_report_id.date_from or a.date >= financial_report_id.date_from)
-            account_move_lines = account_move_lines.filtered(lambda
-                                                                 a: not financial_report_id.date_to or a.date <= financial_report_id.date_to)
+        periods = self._get_report_periods(comparison, comparison_type)
+        balances = financial_report_id._get_account_balances(periods)
+        accounts = self.env['account.account'].search(
+            [('account_type', 'in', list(account_types.values()))])
+        datas = []
+        for period in range(len(periods)):
             account_entries = {}
             for account_type in account_types.values():
                 account_entries[account_type] = self._get_entries(
-                    account_move_lines, self.env['account.account'].search(
-                        [('account_type', '=', account_type)]), account_type)
-            total_income = sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['income', 'income_other'] for entry in
-                account_entries[account_type][0]) - sum(
-                float(entry['amount'].replace(',', '')) for entry in
-                account_entries['expense_direct_cost'][0])
-            total_expense = sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['expense', 'expense_depreciation'] for entry in
-                account_entries[account_type][0])
-            total_current_asset = sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['asset_receivable', 'asset_current', 'asset_cash',
-                 'asset_prepayments'] for entry in
-                account_entries[account_type][0])
-            total_assets = total_current_asset + sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['asset_fixed', 'asset_non_current'] for entry in
-                account_entries[account_type][0])
-            total_current_liability = sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['liability_current', 'liability_payable'] for entry in
-                account_entries[account_type][0])
-            total_liability = total_current_liability + sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['liability_non_current'] for entry in
-                account_entries[account_type][0])
-            total_unallocated_earning = (total_income - total_expense) + sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['equity_unaffected'] for entry in
-                account_entries[account_type][0])
-            total_equity = total_unallocated_earning + sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['equity'] for entry in account_entries[account_type][0])
-            total = total_liability + total_equity
-            data = {
-                'total': total_income - total_expense,
-                'total_expense': "{:,.2f}".format(total_expense),
-                'total_income': "{:,.2f}".format(total_income),
-                'total_current_asset': "{:,.2f}".format(total_current_asset),
-                'total_assets': "{:,.2f}".format(total_assets),
-                'total_current_liability': "{:,.2f}".format(
-                    total_current_liability),
-                'total_liability': "{:,.2f}".format(total_liability),
-                'total_earnings': "{:,.2f}".format(
-                    total_income - total_expense),
-                'total_unallocated_earning': "{:,.2f}".format(
-                    total_unallocated_earning),
-                'total_equity': "{:,.2f}".format(total_equity),
-                'total_balance': "{:,.2f}".format(total),
-                **account_entries}
-            datas.append(data)
+                    balances.get(period, {}),
+                    accounts.filtered(
+                        lambda account: account.account_type == account_type),
+                    account_type)
+            data = self._get_report_totals(account_entries)
+            datas.append(self._format_report_values(data))
         filters = self._get_filter_data()
-        return data, filters, datas
+        return datas[-1], filters, datas
+
+    @api.model
+    def _get_report_periods(self, comparison, comparison_type):
+        """
+            Get the periods of the report, the current one being the first.
+            :param comparison: The number of periods to compare with.
+            :param comparison_type: The type of comparison, month or year.
+            :return: A list of (date_from, date_to) tuples.
+            """
+        current_year = fields.Date.today().year
+        current_date = fields.Date.today()
+        if not comparison:
+            return [(f'{current_year}-01-01', f'{current_year}-12-31')]
+        periods = []
+        for count in range(0, int(comparison) + 1):
+            if comparison_type == "month":
+                period_date = current_date - datetime.timedelta(
+                    days=30 * count)
+                periods.append((period_date.strftime('%Y-%m-01'),
+                                period_date.strftime('%Y-%m-12')))
+            elif comparison_type == "year":
+                periods.append((f'{current_year - count}-01-01',
+                                f'{current_year - count}-12-31'))
+        return periods
 
-    def _get_entries(self, account_move_lines, account_ids, account_type):
+    def _get_account_balances(self, periods):
+        """
+            Get the balance of the accounts for each period, aggregated in
+            a single query.
+            :param periods: A list of (date_from, date_to) tuples.
+            :return: A dictionary {period index: {account id: balance}}.
+            """
+        if not periods:
+            return {}
+        if self.target_move == 'draft':
+            target_move = ('posted', 'draft')
+        else:
+            target_move = ('posted',)
+        where = ["l.parent_state IN %s", "l.company_id IN %s"]
+        params = [target_move, tuple(self.env.companies.ids)]
+        if self.journal_ids:
+            where.append("l.journal_id IN %s")
+            params.append(tuple(self.journal_ids.ids))
+        if self.account_ids:
+            where.append("l.account_id IN %s")
+            params.append(tuple(self.account_ids.ids))
+        if self.date_from:
+            where.append("l.date >= %s")
+            params.append(self.date_from)
+        if self.date_to:
+            where.append("l.date <= %s")
+            params.append(self.date_to)
+        if self.analytic_ids:
+            where.append("l.analytic_distribution ?| %s")
+            params.append([str(analytic_id) for analytic_id in
+                           self.analytic_ids.ids])
+        period_values = ", ".join(
+            ["(%s, %s::date, %s::date)"] * len(periods))
+        period_params = [value for index, (date_from, date_to) in
+                         enumerate(periods)
+                         for value in (index, date_from, date_to)]
+        query = f"""
+            SELECT period.period_index, l.account_id, a.account_type,
+                   SUM(l.debit) - SUM(l.credit) AS balance
+            FROM account_move_line l
+            JOIN account_account a ON a.id = l.account_id
+            JOIN (VALUES {period_values}) AS period(period_index, date_from, date_to)
+                ON l.date >= period.date_from AND l.date <= period.date_to
+            WHERE {" AND ".join(where)}
+            GROUP BY period.period_index, l.account_id, a.account_type
+        """
+        self.env['account.move.line'].flush_model()
+        self.env.cr.execute(query, period_params + params)
+        balances = {}
+        for index, account_id, account_type, balance in \
+                self.env.cr.fetchall():
+            balances.setdefault(index, {})[account_id] = balance
+        return balances
+
+    def _get_entries(self, balances, account_ids, account_type):
         """
             Get the entries for the specified account type.
-            :param account_move_lines: The account move lines to filter.
+            :param balances: The balances of the period by account id.
             :param account_ids: The account IDs to filter.
             :param account_type: The account type.
             :return: A tuple containing the entries and the total amount.
@@ -290,29 +191,82 @@ class ProfitLossReport(models.TransientModel):
         entries = []
         total = 0
         for account in account_ids:
-            filtered_lines = account_move_lines.filtered(
-                lambda line: line.account_id == account)
-            if filtered_lines:
-                if account_type in ['income', 'income_other',
-                                    'liability_payable', 'liability_current',
-                                    'liability_non_current', 'equity',
-                                    'equity_unaffected']:
-                    amount = -(sum(filtered_lines.mapped('debit')) - sum(
-                        filtered_lines.mapped('credit')))
-                else:
-                    amount = sum(filtered_lines.mapped('debit')) - sum(
-                        filtered_lines.mapped('credit'))
-                entries.append({
-                    'name': "{} - {}".format(account.code, account.name),
-                    'amount': "{:,.2f}".format(amount),
-                })
-                total += amount
+            amount = balances.get(account.id, 0)
+            if account_type in ['income', 'income_other',
+                                'liability_payable', 'liability_current',
+                                'liability_non_current', 'equity',
+                                'equity_unaffected']:
+                amount = -amount
+            entries.append({
+                'name': "{} - {}".format(account.code, account.name),
+                'amount': amount,
+            })
+            total += amount
+        return entries, total
+
+    @api.model
+    def _get_report_totals(self, account_entries):
+        """
+            Compute the totals of the report from the entries of a period.
+            :param account_entries: The entries and total by account type.
+            :return: The report values of the period, not formatted.
+            """
+        def type_total(*types):
+            return sum(account_entries[account_type][1]
+                       for account_type in types)
+
+        total_income = type_total('income', 'income_other') - type_total(
+            'expense_direct_cost')
+        total_expense = type_total('expense', 'expense_depreciation')
+        total_current_asset = type_total(
+            'asset_receivable', 'asset_current', 'asset_cash',
+            'asset_prepayments')
+        total_assets = total_current_asset + type_total(
+            'asset_fixed', 'asset_non_current')
+        total_current_liability = type_total(
+            'liability_current', 'liability_payable')
+        total_liability = total_current_liability + type_total(
+            'liability_non_current')
+        total_unallocated_earning = (total_income - total_expense) + \
+            type_total('equity_unaffected')
+        total_equity = total_unallocated_earning + type_total('equity')
+        return {
+            'total': total_income - total_expense,
+            'total_expense': total_expense,
+            'total_income': total_income,
+            'total_current_asset': total_current_asset,
+            'total_assets': total_assets,
+            'total_current_liability': total_current_liability,
+            'total_liability': total_liability,
+            'total_earnings': total_income - total_expense,
+            'total_unallocated_earning': total_unallocated_earning,
+            'total_equity': total_equity,
+            'total_balance': total_liability + total_equity,
+            **account_entries}
+
+    @api.model
+    def _format_report_values(self, data):
+        """
+            Format the amounts of the report values for display, the
+            'total' key being kept as a number.
+            :param data: The report values of a period.
+            :return: The formatted report values.
+            """
+        def format_amount(amount):
+            return "{:,.2f}".format(amount)
+
+        values = {}
+        for key, value in data.items():
+            if key == 'total':
+                values[key] = value
+            elif isinstance(value, tuple):
+                entries, total = value
+                values[key] = ([dict(entry, amount=format_amount(
+                    entry['amount'])) for entry in entries],
+                               format_amount(total))
             else:
-                entries.append({
-                    'name': "{} - {}".format(account.code, account.name),
-                    'amount': "{:,.2f}".format(0),
-                })
-        return entries, "{:,.2f}".format(total)
+                values[key] = format_amount(value)
+        return values
 
     def filter(self, vals):
         """
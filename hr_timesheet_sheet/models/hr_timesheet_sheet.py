@@ -13,6 +13,7 @@ from dateutil.relativedelta import SU, relativedelta
 
 from odoo import SUPERUSER_ID, _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
+from odoo.osv import expression
 
 _logger = logging.getLogger(__name__)
 
@@ -119,6 +120,7 @@ class Sheet(models.Model):
         selection=lambda self: self._selection_review_policy(),
         default=lambda self: self._default_review_policy(),
         required=True,
+        index=True,
     )
     department_id = fields.Many2one(
         comodel_name="hr.department",
@@ -151,6 +153,18 @@ class Sheet(models.Model):
     can_review = fields.Boolean(
         compute="_compute_can_review", search="_search_can_review"
     )
+    reviewer_user_ids = fields.Many2many(
+        comodel_name="res.users",
+        relation="hr_timesheet_sheet_reviewer_rel",
+        column1="sheet_id",
+        column2="user_id",
+        string="Sheet Reviewers",
+        compute="_compute_reviewer_user_ids",
+        store=True,
+        help="Users allowed to review the sheet by a review policy depending "
+        "on the sheet itself, e.g. on its employee or department. "
+        "The reviewers of the policies by group are not stored.",
+    )
     complete_name = fields.Char(compute="_compute_complete_name")
 
     @api.depends("date_start", "date_end")
@@ -189,21 +203,39 @@ class Sheet(models.Model):
 
     @api.model
     def _search_can_review(self, operator, value):
-        def check_in(users):
-            return self.env.user in users
-
-        def check_not_in(users):
-            return self.env.user not in users
-
+        domain = self._get_can_review_domain(self.env.user)
         if (operator == "=" and value) or (operator in ["<>", "!="] and not value):
-            check = check_in
-        else:
-            check = check_not_in
+            return domain
+        if domain == expression.TRUE_DOMAIN:
+            return expression.FALSE_DOMAIN
+        return ["!"] + domain
 
-        sheets = self.search([]).filtered(
-            lambda sheet: check(sheet._get_possible_reviewers())
+    @api.model
+    def _get_can_review_domain(self, user):
+        """Return the domain of the sheets user can review, which only reads
+        the review policy of the sheets and their stored reviewers."""
+        if user.id == SUPERUSER_ID:
+            return expression.TRUE_DOMAIN
+        policies = [
+            policy
+            for policy, group in self._get_review_policy_groups().items()
+            if user.has_group(group)
+        ]
+        return expression.OR(
+            [
+                [("review_policy", "in", policies)],
+                [("reviewer_user_ids", "in", user.ids)],
+            ]
         )
-        return [("id", "in", sheets.ids)]
+
+    @api.depends(
+        "review_policy",
+        "employee_id.parent_id.user_id",
+        "department_id.manager_id.user_id",
+    )
+    def _compute_reviewer_user_ids(self):
+        for sheet in self:
+            sheet.reviewer_user_ids = sheet._get_sheet_reviewers()
 
     @api.depends("name", "employee_id")
     def _compute_complete_name(self):
@@ -322,13 +354,31 @@ class Sheet(models.Model):
     def _get_possible_reviewers(self):
         self.ensure_one()
         res = self.env["res.users"].browse(SUPERUSER_ID)
-        if self.review_policy == "hr":
-            res |= self.env.ref("hr.group_hr_user").users
-        elif self.review_policy == "hr_manager":
-            res |= self.env.ref("hr.group_hr_manager").users
-        elif self.review_policy == "timesheet_manager":
-            res |= self.env.ref("hr_timesheet.group_hr_timesheet_approver").users
-        return res
+        group = self._get_review_policy_groups().get(self.review_policy)
+        if group:
+            res |= self.env.ref(group).users
+        return res | self._get_sheet_reviewers()
+
+    @api.model
+    def _get_review_policy_groups(self):
+        """Return the {review policy: reviewers group xmlid} of the review
+        policies granted by group."""
+        return {
+            "hr": "hr.group_hr_user",
+            "hr_manager": "hr.group_hr_manager",
+            "timesheet_manager": "hr_timesheet.group_hr_timesheet_approver",
+        }
+
+    def _get_sheet_reviewers(self):
+        """Hook for the review policies depending on the sheet itself, e.g.
+        on its employee manager or department manager.
+
+        Their reviewers are stored in reviewer_user_ids so that the sheets to
+        review are searched with a single query: extend the dependencies of
+        _compute_reviewer_user_ids accordingly.
+        """
+        self.ensure_one()
+        return self.env["res.users"]
 
     def _get_timesheet_sheet_company(self):
         self.ensure_one()
@@ -4,6 +4,7 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 from datetime import date
+from unittest.mock import patch
 
 from dateutil.relativedelta import relativedelta
 
@@ -1103,3 +1104,34 @@ class TestHrTimesheetSheet(TestHrTimesheetSheetCommon):
             self.assertTrue(aal2.exists())
         # but be sure they are merged on save
         self.assertEqual(len((aal1 + aal2).exists()), 1)
+
+    def test_can_review_sheet_reviewers(self):
+        sheet_model = type(self.sheet_model)
+
+        def _get_sheet_reviewers(sheet):
+            return sheet.department_id.manager_id.user_id
+
+        with patch.object(sheet_model, "_get_sheet_reviewers", _get_sheet_reviewers):
+            sheet = self.sheet_model.create(
+                {
+                    "employee_id": self.employee_4.id,
+                    "department_id": self.department_2.id,
+                    "company_id": self.company.id,
+                }
+            )
+            self.assertEqual(sheet.reviewer_user_ids, self.user_3)
+            self.assertTrue(sheet.with_user(self.user_3).can_review)
+            domain = [("can_review", "=", True), ("id", "=", sheet.id)]
+            self.assertEqual(
+                self.sheet_model.with_user(self.user_3).search(domain), sheet
+            )
+            # The stored reviewers follow the department manager
+            self.department_2.manager_id = self.employee_manager
+            self.assertEqual(sheet.reviewer_user_ids, self.user_2)
+            self.assertFalse(self.sheet_model.with_user(self.user_3).search(domain))
+            self.assertEqual(
+                self.sheet_model.with_user(self.user_3).search(
+                    [("can_review", "=", False), ("id", "=", sheet.id)]
+                ),
+                sheet,
+            )
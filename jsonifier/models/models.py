@@ -5,7 +5,9 @@
 # Simone Orsi <simahawk@gmail.com>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
 
+import copy
 import logging
+from collections import defaultdict
 
 from odoo import api, fields, models, tools
 from odoo.exceptions import UserError
@@ -67,61 +69,165 @@ class Base(models.AbstractModel):
             values[key] = value
 
     @api.model
-    def _jsonify_record(self, parser, rec, root):
-        """JSONify one record (rec). Private function called by jsonify."""
+    def _jsonify_field_error(self, message, field_name):
+        if not tools.config["test_enable"]:
+            # If running live, log proper error
+            # so that techies can track it down
+            _logger.error(message, {"model": self._name, "fname": field_name})
+
+    @api.model
+    def _jsonify_compile(self, parser):
+        """Compile a list of field parsers into a plan for this model.
+
+        The plan is a list of ``(kind, field, json_key, arg)`` tuples, ``kind``
+        being ``function``, ``subparser`` or ``value``. The sub parsers of
+        relational fields are compiled for their comodel. Invalid field
+        parsers are reported once, here, instead of once per record.
+        """
         strict = self.env.context.get("jsonify_record_strict", False)
+        plan = []
         for field in parser:
-            field_dict, subparser = rec.__parse_field(field)
+            field_dict, subparser = self.__parse_field(field)
             field_name = field_dict["name"]
-            if field_name not in rec._fields:
+            if field_name not in self._fields:
                 if strict:
                     # let it fail
-                    rec._fields[field_name]  # pylint: disable=pointless-statement
-                if not tools.config["test_enable"]:
-                    # If running live, log proper error
-                    # so that techies can track it down
-                    _logger.error(
-                        "%(model)s.%(fname)s not available",
-                        {"model": self._name, "fname": field_name},
-                    )
+                    self._fields[field_name]  # pylint: disable=pointless-statement
+                self._jsonify_field_error("%(model)s.%(fname)s not available", field_name)
                 continue
             json_key = field_dict.get("target", field_name)
-            field = rec._fields[field_name]
+            field = self._fields[field_name]
             if field_dict.get("function"):
-                function = field_dict["function"]
-                try:
-                    value = self._function_value(rec, function, field_name)
-                except UserError:
-                    if strict:
-                        raise
-                    if not tools.config["test_enable"]:
-                        _logger.error(
-                            "%(model)s.%(func)s not available",
-                            {"model": self._name, "func": str(function)},
-                        )
-                    continue
+                plan.append(("function", field, json_key, field_dict["function"]))
             elif subparser:
                 if not (field.relational or field.type == "reference"):
                     if strict:
                         self._jsonify_bad_parser_error(field_name)
-                    if not tools.config["test_enable"]:
-                        _logger.error(
-                            "%(model)s.%(fname)s not relational",
-                            {"model": self._name, "fname": field_name},
-                        )
+                    self._jsonify_field_error(
+                        "%(model)s.%(fname)s not relational", field_name
+                    )
                     continue
-                value = [
-                    self._jsonify_record(subparser, r, {}) for r in rec[field_name]
-                ]
-                if field.type in ("many2one", "reference"):
-                    value = value[0] if value else None
+                if field.type != "reference":
+                    # The model of a reference is only known per record
+                    subparser = self.env[field.comodel_name]._jsonify_compile(subparser)
+                plan.append(("subparser", field, json_key, subparser))
+            else:
+                plan.append(("value", field, json_key, field_dict.get("resolver")))
+        return plan
+
+    def _jsonify_records(self, plan, results):
+        """JSONify the records following a compiled ``plan``.
+
+        ``results`` holds the dict to fill for each record. Values are
+        computed field by field for the whole recordset, so that the ORM
+        fetches each column and each relation level at once.
+        """
+        strict = self.env.context.get("jsonify_record_strict", False)
+        for kind, field, json_key, arg in plan:
+            if kind == "function":
+                for rec, root in zip(self, results, strict=True):
+                    try:
+                        value = self._function_value(rec, arg, field.name)
+                    except UserError:
+                        if strict:
+                            raise
+                        if not tools.config["test_enable"]:
+                            _logger.error(
+                                "%(model)s.%(func)s not available",
+                                {"model": self._name, "func": str(arg)},
+                            )
+                        continue
+                    self._add_json_key(root, json_key, value)
+                continue
+            if kind == "subparser":
+                values = self._jsonify_related(field, arg)
+            elif arg:
+                values = arg.resolve(field, self)
             else:
-                resolver = field_dict.get("resolver")
-                value = rec._jsonify_value(field, rec[field.name])
-                value = resolver.resolve(field, rec)[0] if resolver else value
+                if field.relational:
+                    column = [rec[field.name] for rec in self]
+                else:
+                    column = self.mapped(field.name)
+                values = [self._jsonify_value(field, value) for value in column]
+            for root, value in zip(results, values, strict=True):
+                self._add_json_key(root, json_key, value)
+        return results
+
+    def _jsonify_related(self, field, subplan):
+        """Return the JSON value of the relational ``field`` for each record.
+
+        The related records of the whole recordset are jsonified together.
+        """
+        if field.type == "reference":
+            related = [rec[field.name] for rec in self]
+            ids_by_model = defaultdict(list)
+            for record in related:
+                if record:
+                    ids_by_model[record._name].append(record.id)
+            jsons = {}
+            for model_name, ids in ids_by_model.items():
+                records = self.env[model_name].browse(ids)
+                records_jsons = records._jsonify_records(
+                    records._jsonify_compile(subplan), [{} for _rec in records]
+                )
+                for record, json in zip(records, records_jsons, strict=True):
+                    jsons[(model_name, record.id)] = json
+            return [
+                copy.deepcopy(jsons[(record._name, record.id)]) if record else None
+                for record in related
+            ]
+        records = self.mapped(field.name)
+        records_jsons = records._jsonify_records(subplan, [{} for _rec in records])
+        jsons = dict(zip(records._ids, records_jsons, strict=True))
+        used = set()
+
+        def get_json(record_id):
+            # A record related to several records gets its own copy each time
+            if record_id in used:
+                return copy.deepcopy(jsons[record_id])
+            used.add(record_id)
+            return jsons[record_id]
+
+        values = []
+        for rec in self:
+            value = [get_json(record_id) for record_id in rec[field.name]._ids]
+            if field.type == "many2one":
+                value = value[0] if value else None
+            values.append(value)
+        return values
+
+    @api.model
+    def _jsonify_record(self, parser, rec, root):
+        """JSONify one record (rec). Prefer _jsonify_records to process
+        several records at once."""
+        return rec._jsonify_records(rec._jsonify_compile(parser), [root])[0]
 
-            self._add_json_key(root, json_key, value)
-        return root
+    def _jsonify_get_parsers(self, parser):
+        if isinstance(parser, list):
+            parser = convert_simple_to_full_parser(parser)
+        parsers = {False: parser["fields"]} if "fields" in parser else parser["langs"]
+        return parser, parsers
+
+    def _jsonify_compile_parsers(self, parser, parsers):
+        """Compile the parser of each language, return a list of
+        ``(records, plan)`` to apply to the records."""
+        compiled = []
+        for lang in parsers:
+            translate = lang or parser.get("language_agnostic")
+            records = self.with_context(lang=lang) if translate else self
+            compiled.append((lang, records._jsonify_compile(parsers[lang])))
+        return compiled
+
+    def _jsonify_apply(self, parser, compiled):
+        results = [{} for record in self]
+        for lang, plan in compiled:
+            translate = lang or parser.get("language_agnostic")
+            records = self.with_context(lang=lang) if translate else self
+            records._jsonify_records(plan, results)
+        resolver = parser.get("resolver")
+        if resolver:
+            results = resolver.resolve(results, self)
+        return results
 
     def jsonify(self, parser, one=False):
         """Convert the record according to the given parser.
@@ -152,21 +258,31 @@ class Base(models.AbstractModel):
         """
         if one:
             self.ensure_one()
-        if isinstance(parser, list):
-            parser = convert_simple_to_full_parser(parser)
-        resolver = parser.get("resolver")
+        parser, parsers = self._jsonify_get_parsers(parser)
+        if not self:
+            results = []
+            resolver = parser.get("resolver")
+            return resolver.resolve(results, self) if resolver else results
+        results = self._jsonify_apply(
+            parser, self._jsonify_compile_parsers(parser, parsers)
+        )
+        return results[0] if one else results
 
-        results = [{} for record in self]
-        parsers = {False: parser["fields"]} if "fields" in parser else parser["langs"]
-        for lang in parsers:
-            translate = lang or parser.get("language_agnostic")
-            records = self.with_context(lang=lang) if translate else self
-            for record, json in zip(records, results, strict=True):
-                self._jsonify_record(parsers[lang], record, json)
+    def jsonify_iter(self, parser, chunk_size=1000):
+        """Yield the JSON of the records one by one, like ``jsonify``.
 
-        if resolver:
-            results = resolver.resolve(results, self)
-        return results[0] if one else results
+        The parser is compiled once and the records are processed by chunks of
+        ``chunk_size``, the cache being cleared between chunks, so that memory
+        use does not grow with the number of records.
+        """
+        if not self:
+            return
+        parser, parsers = self._jsonify_get_parsers(parser)
+        compiled = self._jsonify_compile_parsers(parser, parsers)
+        for index in range(0, len(self), chunk_size):
+            records = self.browse(self._ids[index : index + chunk_size])
+            yield from records._jsonify_apply(parser, compiled)
+            self.env.invalidate_all()
 
     # HELPERS
 
@@ -182,6 +182,23 @@ class TestParser(TransactionCase):
         expected_json["children"] = []
         self.assertDictEqual(json_partner[0], expected_json)
 
+    def test_json_export_batch(self):
+        """Records jsonified together get the same values as one by one, and
+        their own copy of shared related records."""
+        parser = [
+            "name",
+            ("parent_id", ["name"]),
+            ("country_id:country", ["code", "name"]),
+            ("category_id", ["name"]),
+        ]
+        partners = self.partner | self.partner.child_ids
+        expected = [partner.jsonify(parser, one=True) for partner in partners]
+        json_partners = partners.jsonify(parser)
+        self.assertEqual(json_partners, expected)
+        json_partners[0]["country"]["name"] = "Changed"
+        self.assertEqual(json_partners[1]["country"]["name"], "France")
+        self.assertEqual(list(partners.jsonify_iter(parser, chunk_size=1)), expected)
+
     def test_one(self):
         parser = [
             "name",
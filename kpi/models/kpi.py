@@ -3,6 +3,8 @@
 
 import logging
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from dateutil.relativedelta import relativedelta
@@ -55,6 +57,10 @@ class KPI(models.Model):
     _description = "Key Performance Indicator"
     _inherit = ["mail.thread", "mail.activity.mixin"]
 
+    # Number of KPIs computed concurrently by the scheduler, each on its own
+    # cursor. KPIs are computed one after another when lower than 2.
+    _kpi_max_workers = 4
+
     name = fields.Char(required=True)
     description = fields.Text()
     category_id = fields.Many2one(
@@ -85,6 +91,17 @@ class KPI(models.Model):
     next_execution_date = fields.Datetime(
         "Next execution date",
     )
+    timeout = fields.Integer(
+        default=300,
+        help="Maximum duration of the computation by the scheduler, in "
+        "seconds. Slower values are discarded and SQL queries on the local "
+        "database are cancelled. Set 0 to disable.",
+    )
+    last_history_id = fields.Many2one(
+        "kpi.history",
+        compute="_compute_last_history_id",
+        store=True,
+    )
     value = fields.Float(
         compute="_compute_display_last_kpi_value",
     )
@@ -130,12 +147,29 @@ class KPI(models.Model):
         "res.company", "Company", default=lambda self: self.env.company
     )
 
+    @api.depends("history_ids.date")
+    def _compute_last_history_id(self):
+        kpis = self.filtered("id")
+        (self - kpis).last_history_id = False
+        if not kpis:
+            return
+        self.env["kpi.history"].flush_model(["kpi_id", "date"])
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT ON (kpi_id) kpi_id, id FROM kpi_history
+            WHERE kpi_id IN %s ORDER BY kpi_id, date DESC, id DESC
+            """,
+            (tuple(kpis.ids),),
+        )
+        last_history_ids = dict(self.env.cr.fetchall())
+        for obj in kpis:
+            obj.last_history_id = last_history_ids.get(obj.id)
+
+    @api.depends("last_history_id")
     def _compute_display_last_kpi_value(self):
-        history_obj = self.env["kpi.history"]
         for obj in self:
-            history_ids = history_obj.search([("kpi_id", "=", obj.id)])
-            if history_ids:
-                his = obj.history_ids[0]
+            his = obj.last_history_id
+            if his:
                 obj.value = his.value
                 obj.color = his.color
                 obj.last_execution = his.date
@@ -217,11 +251,64 @@ class KPI(models.Model):
         obj_ids = self.search(filters)
         res = None
 
-        try:
-            for obj in obj_ids:
-                obj.compute_kpi_value()
-                obj.update_next_execution_date()
-        except Exception:
-            _logger.exception("Failed updating KPI values")
+        max_workers = self._get_kpi_max_workers()
+        if max_workers > 1 and len(obj_ids) > 1:
+            obj_ids._update_kpi_value_concurrently(max_workers)
+        else:
+            obj_ids._update_kpi_value_sequentially()
 
         return res
+
+    @api.model
+    def _get_kpi_max_workers(self):
+        return self._kpi_max_workers
+
+    def _update_kpi_value_sequentially(self):
+        """Compute the KPIs in the current transaction, a failing KPI not
+        preventing the others from being computed."""
+        for obj in self:
+            try:
+                with self.env.cr.savepoint():
+                    obj.compute_kpi_value()
+                    obj.update_next_execution_date()
+            except Exception:
+                _logger.exception("Failed updating KPI %s value", obj.name)
+
+    def _update_kpi_value_concurrently(self, max_workers):
+        """Compute the KPIs in a pool of threads, each KPI on its own cursor,
+        so a slow KPI does not delay the others."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._update_kpi_value_in_cursor, obj.id, obj.timeout)
+                for obj in self
+            ]
+        for future in futures:
+            future.result()
+        # The histories and next execution dates were committed by the workers
+        self.env.invalidate_all()
+
+    @api.model
+    def _update_kpi_value_in_cursor(self, kpi_id, timeout):
+        """Compute a KPI on a new cursor, committed on success.
+
+        The value is discarded when its computation takes more than
+        ``timeout`` seconds, SQL queries on the local database being
+        cancelled by PostgreSQL as well.
+        """
+        start = time.monotonic()
+        with self.pool.cursor() as cr:
+            obj = self.with_env(self.env(cr=cr)).browse(kpi_id)
+            try:
+                if timeout:
+                    cr.execute(
+                        "SET LOCAL statement_timeout = %s", (int(timeout * 1000),)
+                    )
+                obj.compute_kpi_value()
+                if timeout and time.monotonic() - start > timeout:
+                    raise TimeoutError(
+                        "KPI computed in more than %s seconds" % timeout
+                    )
+                obj.update_next_execution_date()
+            except Exception:
+                _logger.exception("Failed updating KPI %s value", kpi_id)
+                cr.rollback()
@@ -2,6 +2,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 from odoo import fields, models
+from odoo.tools.sql import create_index
 
 
 class KPIHistory(models.Model):
@@ -16,7 +17,7 @@ class KPIHistory(models.Model):
         required=True,
         default=fields.Datetime.now(),
     )
-    kpi_id = fields.Many2one("kpi", "KPI", required=True)
+    kpi_id = fields.Many2one("kpi", "KPI", required=True, index=True)
     date = fields.Datetime(
         "Execution Date",
         required=True,
@@ -27,3 +28,12 @@ class KPIHistory(models.Model):
     company_id = fields.Many2one(
         "res.company", "Company", default=lambda self: self.env.company
     )
+
+    def init(self):
+        # Latest history of each KPI
+        create_index(
+            self._cr,
+            "kpi_history_kpi_id_date_index",
+            self._table,
+            ["kpi_id", "date DESC", "id DESC"],
+        )
@@ -1,12 +1,33 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from odoo import SUPERUSER_ID, api
 from odoo.tests.common import TransactionCase
+from odoo.tools import mute_logger
 
 
 class TestKPI(TransactionCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
+        # The worker cursors do not see the records of the test transaction
+        patcher = patch.object(type(cls.env["kpi"]), "_kpi_max_workers", 1)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    def _create_kpi(self, name, kpi_code, env=None):
+        env = env or self.env
+        return env["kpi"].create(
+            {
+                "name": name,
+                "category_id": env["kpi.category"].create({"name": name}).id,
+                "threshold_id": env["kpi.threshold"].create({"name": name}).id,
+                "kpi_type": "python",
+                "kpi_code": kpi_code,
+            }
+        )
 
     def test_invalid_threshold_range(self):
         range1 = self.env["kpi.threshold.range"].create(
@@ -127,3 +148,77 @@ class TestKPI(TransactionCase):
         self.assertEqual(len(kpi_history), 1)
         self.assertEqual(kpi_history.color, "#00FF00")
         self.assertEqual(kpi_history.value, 1.0)
+
+    def test_kpi_last_value(self):
+        kpi = self._create_kpi("Last value kpi", "{'value': 2.0}")
+        self.assertFalse(kpi.last_history_id)
+        self.assertEqual(kpi.value, 0)
+        History = self.env["kpi.history"]
+        now = datetime.now()
+        last = History.create({"kpi_id": kpi.id, "value": 2.0, "date": now})
+        History.create(
+            {"kpi_id": kpi.id, "value": 1.0, "date": now - timedelta(days=1)}
+        )
+        self.assertEqual(kpi.last_history_id, last)
+        self.assertEqual(kpi.value, 2.0)
+        self.assertEqual(kpi.last_execution, last.date)
+        last.unlink()
+        self.assertEqual(kpi.value, 1.0)
+
+    def test_update_kpi_value_failure(self):
+        failing_kpi = self._create_kpi("Failing kpi", "1 / 0")
+        kpi = self._create_kpi("Working kpi", "{'value': 3.0}")
+        kpis = failing_kpi | kpi
+        kpis.with_context(filters=[("id", "in", kpis.ids)]).update_kpi_value()
+        self.assertFalse(failing_kpi.history_ids)
+        self.assertFalse(failing_kpi.next_execution_date)
+        self.assertEqual(kpi.value, 3.0)
+        self.assertTrue(kpi.next_execution_date)
+
+    def test_update_kpi_value_concurrently(self):
+        kpis = self._create_kpi("Kpi 1", "{'value': 1.0}") | self._create_kpi(
+            "Kpi 2", "{'value': 2.0}"
+        )
+        kpis[1].timeout = 0
+        Kpi = type(self.env["kpi"])
+        with patch.object(Kpi, "_get_kpi_max_workers", return_value=2), patch.object(
+            Kpi, "_update_kpi_value_in_cursor"
+        ) as update_kpi_value_in_cursor:
+            kpis.with_context(filters=[("id", "in", kpis.ids)]).update_kpi_value()
+        self.assertEqual(
+            sorted(call.args for call in update_kpi_value_in_cursor.call_args_list),
+            [(kpis[0].id, 300), (kpis[1].id, 0)],
+        )
+
+    def _unlink_committed(self, kpi_ids):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            kpis = env["kpi"].browse(kpi_ids)
+            categories, thresholds = kpis.category_id, kpis.threshold_id
+            kpis.history_ids.unlink()
+            kpis.unlink()
+            categories.unlink()
+            thresholds.unlink()
+
+    def test_update_kpi_value_in_cursors(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            failing_kpi = self._create_kpi("Failing kpi", "1 / 0", env=env)
+            kpi_1 = self._create_kpi("Kpi 1", "{'value': 1.0}", env=env)
+            kpi_2 = self._create_kpi("Kpi 2", "{'value': 2.0}", env=env)
+            kpis = failing_kpi | kpi_1 | kpi_2
+            self.addCleanup(self._unlink_committed, kpis.ids)
+            cr.commit()
+            self.assertFalse(any(kpis.mapped("next_execution_date")))
+            with patch.object(type(env["kpi"]), "_kpi_max_workers", 2), mute_logger(
+                "odoo.addons.kpi.models.kpi"
+            ):
+                kpis.with_context(filters=[("id", "in", kpis.ids)]).update_kpi_value()
+            # Read the values committed by the workers in a new transaction
+            cr.commit()
+            self.assertFalse(failing_kpi.history_ids)
+            self.assertFalse(failing_kpi.next_execution_date)
+            self.assertEqual(kpi_1.value, 1.0)
+            self.assertEqual(kpi_2.value, 2.0)
+            self.assertTrue(kpi_1.next_execution_date)
+            self.assertTrue(kpi_2.next_execution_date)
@@ -716,6 +716,81 @@ class ks_dynamic_financial_base(models.Model):
             ks_filter_context['date_from'] = False
         return ks_filter_context
 
+    def ks_gl_date_conditions(self, ks_df_informations):
+        '''
+        SQL conditions on the move line date of each section of the general ledger
+        :return: dict of SQL conditions, dict of their parameters
+        '''
+        ks_date = ks_df_informations['date']
+        ks_params = {
+            'ks_start_date': ks_date.get('ks_start_date'),
+            'ks_end_date': ks_date.get('ks_end_date'),
+        }
+        if ks_date['ks_process'] == 'range':
+            ks_conditions = {
+                'init': 'l.date < %(ks_start_date)s',
+                'current': 'l.date >= %(ks_start_date)s AND l.date <= %(ks_end_date)s',
+            }
+        else:
+            # Without date range, the initial balance is computed on all the lines
+            ks_conditions = {
+                'init': 'TRUE',
+                'current': 'l.date <= %(ks_end_date)s',
+            }
+        if ks_df_informations.get('initial_balance') and ks_date['ks_process'] == 'range':
+            ks_conditions['full'] = 'l.date <= %(ks_start_date)s'
+        else:
+            ks_conditions['full'] = ks_conditions['current']
+        # Initial balance shown in the ledger, for balance sheet accounts only
+        ks_conditions['in_bal'] = 'FALSE'
+        if self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal') and \
+                ks_date['ks_process'] == 'range':
+            ks_conditions['in_bal'] = "l.date < %(ks_start_date)s AND a.internal_group NOT IN ('income', 'expense')"
+        return ks_conditions, ks_params
+
+    def ks_gl_order_by(self, ks_df_informations):
+        if ks_df_informations.get('sort_accounts_by') == 'date':
+            return 'l.date, l.move_id, l.id'
+        return 'j.code, p.name, l.move_id, l.id'
+
+    def ks_gl_date_format(self):
+        lang = self.env.user.lang
+        return self.env['res.lang'].search([('code', '=', lang)])['date_format'].replace('/', '-')
+
+    def ks_gl_account_balances(self, WHERE, ks_df_informations, ks_group_by, ks_params):
+        '''
+        Fetch the initial, current, final and ledger initial balances of all the accounts
+        in a single grouped query
+        :param ks_group_by: SQL expression of the account key, eg. a.code
+        :return: dict {account key: dict of balances}
+        '''
+        ks_conditions, ks_date_params = self.ks_gl_date_conditions(ks_df_informations)
+        ks_params = dict(ks_params, **ks_date_params)
+        sql = ('''
+            SELECT
+                %(group_by)s AS ks_key,
+                COALESCE(SUM(l.debit) FILTER (WHERE %(init)s), 0) AS init_debit,
+                COALESCE(SUM(l.credit) FILTER (WHERE %(init)s), 0) AS init_credit,
+                COALESCE(SUM(l.debit - l.credit) FILTER (WHERE %(init)s), 0) AS init_balance,
+                COUNT(*) FILTER (WHERE %(current)s) AS current_count,
+                COALESCE(SUM(l.debit) FILTER (WHERE %(full)s), 0) AS full_debit,
+                COALESCE(SUM(l.credit) FILTER (WHERE %(full)s), 0) AS full_credit,
+                COALESCE(SUM(l.debit - l.credit) FILTER (WHERE %(full)s), 0) AS full_balance,
+                COALESCE(SUM(l.debit) FILTER (WHERE %(in_bal)s), 0) AS in_bal_debit,
+                COALESCE(SUM(l.credit) FILTER (WHERE %(in_bal)s), 0) AS in_bal_credit,
+                COALESCE(SUM(l.debit - l.credit) FILTER (WHERE %(in_bal)s), 0) AS in_bal_balance,
+                COALESCE(SUM(l.amount_currency) FILTER (WHERE %(in_bal)s), 0) AS in_bal_amount_currency
+            FROM account_move_line l
+            JOIN account_move m ON (l.move_id=m.id)
+            JOIN account_account a ON (l.account_id=a.id)
+            LEFT JOIN res_partner p ON (l.partner_id=p.id)
+            JOIN account_journal j ON (l.journal_id=j.id)
+            WHERE %(where)s AND l.account_id IN %%(ks_account_ids)s
+            GROUP BY %(group_by)s
+        ''') % dict(ks_conditions, where=WHERE, group_by=ks_group_by)
+        self.env.cr.execute(sql, ks_params)
+        return {ks_row.pop('ks_key'): ks_row for ks_row in self.env.cr.dictfetchall()}
+
     # Method to fetch data for General ledger
     def ks_process_general_ledger(self, ks_df_informations):
         '''
@@ -724,11 +799,15 @@ class ks_dynamic_financial_base(models.Model):
         1. Initial Balance
         2. Current Balance
         3. Final Balance
+        The balances of all the accounts are fetched with a single grouped query. The move lines
+        are only fetched when they are printed, the report view loads them by page with
+        ks_build_detailed_gen_move_lines.
         :return:
         '''
         cr = self.env.cr
-        WHERE = self.ks_df_where_clause(ks_df_informations)[0]
-        ks_account_ids = self.env['account.account'].sudo().search(self.ks_df_where_clause(ks_df_informations)[1])
+        WHERE, ks_account_domain = self.ks_df_where_clause(ks_df_informations)
+        ks_account_ids = self.env['account.account'].sudo().search(ks_account_domain)
+        ks_accounts = {x.code: x for x in ks_account_ids}
         ks_move_lines = {
             x.code: {
                 'name': x.name,
@@ -741,56 +820,18 @@ class ks_dynamic_financial_base(models.Model):
                 'lines': []
             } for x in sorted(ks_account_ids, key=lambda a: a.code)
         }  # base for accounts to display
-        for ks_account in ks_account_ids:
-            ks_company_id = self.env['res.company'].sudo().browse(ks_df_informations.get('company_id'))
-            ks_currency = ks_account.company_id.currency_id or ks_company_id.currency_id
-            ks_symbol = ks_currency.symbol
-            ks_rounding = ks_currency.rounding
-            ks_position = ks_currency.position
-
-            ks_opening_balance = 0
-            KS_WHERE_INIT = WHERE
-            if ks_df_informations['date']['ks_process'] == 'range':
-                KS_WHERE_INIT = KS_WHERE_INIT + " AND l.date < '%s'" % ks_df_informations['date'].get('ks_start_date')
-            # else:
-            # KS_WHERE_INIT += " AND l.account_id = %s" % ks_account.id
-            KS_WHERE_INIT += " AND l.code = %s" % "\'" + ks_account.code + '\''
-            if ks_df_informations.get('sort_accounts_by') == 'date':
-                KS_ORDER_BY_CURRENT = 'l.date, l.move_id'
-            else:
-                KS_ORDER_BY_CURRENT = 'j.code, p.name, l.move_id'
-            if ks_df_informations.get('initial_balance'):
-                sql = ('''
-                    SELECT 
-                        COALESCE(SUM(l.debit),0) AS debit, 
-                        COALESCE(SUM(l.credit),0) AS credit, 
-                        COALESCE(SUM(l.debit - l.credit),0) AS balance
-                    FROM account_move_line l
-                    JOIN account_move m ON (l.move_id=m.id)
-                    JOIN account_account a ON (l.account_id=a.id)
-                   
-                    LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                    LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                    JOIN account_journal j ON (l.journal_id=j.id)
-                    WHERE %s
-                ''') % KS_WHERE_INIT
-                cr.execute(sql)
-                for ks_row in cr.dictfetchall():
-                    ks_row['move_name'] = 'Initial Balance'
-                    ks_row['account_id'] = ks_account.id
-                    ks_row['initial_bal'] = True
-                    ks_row['ending_bal'] = False
-                    ks_opening_balance += ks_row['balance']
-                    ks_move_lines[ks_account.code]['lines'].append(ks_row)
-            if ks_df_informations['date']['ks_process'] == 'range':
-                KS_WHERE_CURRENT = WHERE + " AND l.date >= '%s'" % ks_df_informations['date'].get(
-                    'ks_start_date') + " AND l.date <= '%s'" % ks_df_informations['date'].get('ks_end_date')
-            else:
-                KS_WHERE_CURRENT = WHERE + " AND l.date <= '%s'" % ks_df_informations['date'].get('ks_end_date')
-            # KS_WHERE_CURRENT += " AND a.id = %s" % ks_account.id
-            KS_WHERE_CURRENT += " AND a.code = %s" % "\'" + ks_account.code + '\''
+        if not ks_account_ids:
+            return ks_move_lines, 0.0, 0.0, 0.0
+        ks_params = {'ks_account_ids': tuple(ks_account_ids.ids)}
+        ks_balances = self.ks_gl_account_balances(WHERE, ks_df_informations, 'a.code', ks_params)
+
+        ks_current_lines = {}
+        if ks_df_informations.get('ks_report_with_lines'):
+            ks_conditions, ks_date_params = self.ks_gl_date_conditions(ks_df_informations)
+            ks_order_by = self.ks_gl_order_by(ks_df_informations)
             sql = ('''
                 SELECT
+                    a.code AS ks_account_code,
                     l.id AS lid,
                     l.date AS ldate,
                     j.code AS lcode,
@@ -799,108 +840,72 @@ class ks_dynamic_financial_base(models.Model):
                     l.name AS lname,
                     COALESCE(l.debit,0) AS debit,
                     COALESCE(l.credit,0) AS credit,
-                    COALESCE(l.debit - l.credit,0) AS balance,
+                    SUM(COALESCE(l.debit - l.credit,0)) OVER (
+                        PARTITION BY a.code ORDER BY %(order_by)s ROWS UNBOUNDED PRECEDING
+                    ) AS balance,
                     COALESCE(l.amount_currency,0) AS amount_currency
                 FROM account_move_line l
                 JOIN account_move m ON (l.move_id=m.id)
                 JOIN account_account a ON (l.account_id=a.id)
-           
-                LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                LEFT JOIN res_currency cc ON (l.company_currency_id=cc.id)
                 LEFT JOIN res_partner p ON (l.partner_id=p.id)
                 JOIN account_journal j ON (l.journal_id=j.id)
-                WHERE %s
-                GROUP BY l.id, l.account_id, l.date, j.code, l.currency_id, l.ref, l.name, m.id, m.name, c.rounding, cc.rounding, cc.position, c.position, c.symbol, cc.symbol, p.name
-                ORDER BY %s
-            ''') % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT)
-            cr.execute(sql)
-            ks_current_lines = cr.dictfetchall()
-            for ks_row in ks_current_lines:
+                WHERE %(where)s AND %(current)s AND l.account_id IN %%(ks_account_ids)s
+                ORDER BY a.code, %(order_by)s
+            ''') % {'where': WHERE, 'current': ks_conditions['current'], 'order_by': ks_order_by}
+            cr.execute(sql, dict(ks_params, **ks_date_params))
+            ks_date_format = self.ks_gl_date_format()
+            for ks_row in cr.dictfetchall():
+                ks_row['ldate'] = datetime.datetime.strptime(ks_row['ldate'].strftime(ks_date_format),
+                                                             ks_date_format).date()
                 ks_row['initial_bal'] = False
                 ks_row['ending_bal'] = False
+                ks_current_lines.setdefault(ks_row.pop('ks_account_code'), []).append(ks_row)
 
-                ks_current_balance = ks_row['balance']
-                ks_row['balance'] = ks_opening_balance + ks_current_balance
-                ks_opening_balance += ks_current_balance
-                ks_row['initial_bal'] = False
-
-                ks_move_lines[ks_account.code]['lines'].append(ks_row)
-            if ks_df_informations.get('initial_balance') and ks_df_informations['date']['ks_process'] == 'range':
-                KS_WHERE_FULL = WHERE + " AND l.date <= '%s'" % ks_df_informations['date'].get('ks_start_date')
-            else:
-                if ks_df_informations['date']['ks_process'] == 'range':
-                    KS_WHERE_FULL = WHERE + " AND l.date >= '%s'" % ks_df_informations['date'].get(
-                        'ks_start_date') + " AND l.date <= '%s'" % ks_df_informations['date'].get('ks_end_date')
-                else:
-                    KS_WHERE_FULL = WHERE + " AND l.date <= '%s'" % ks_df_informations['date'].get('ks_end_date')
-            # KS_WHERE_FULL += " AND a.id = %s" % ks_account.id
-            KS_WHERE_FULL += " AND a.code = %s" % "\'" + ks_account.code + '\''
-            sql = ('''
-                SELECT 
-                    COALESCE(SUM(l.debit),0) AS debit, 
-                    COALESCE(SUM(l.credit),0) AS credit, 
-                    COALESCE(SUM(l.debit - l.credit),0) AS balance
-                FROM account_move_line l
-                JOIN account_move m ON (l.move_id=m.id)
-                JOIN account_account a ON (l.account_id=a.id)
-            
-                LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                JOIN account_journal j ON (l.journal_id=j.id) 
-                WHERE %s
-            ''') % KS_WHERE_FULL
-
-            initial_bal_data = []
-            if self.env['ir.config_parameter'].sudo().get_param(
-                    'ks_enable_ledger_in_bal') and ks_account.internal_group not in ['income', 'expense'] and \
-                    ks_df_informations['date']['ks_process'] == 'range':
-                KS_INIT_BAL_WHERE_FULL = WHERE + " AND l.date < '%s'" % ks_df_informations['date'].get('ks_start_date')
-                KS_INIT_BAL_WHERE_FULL += " AND a.code = %s" % "\'" + ks_account.code + '\''
-                ks_init_bal_sql = ('''
-                                    SELECT 
-                                        COALESCE(SUM(l.debit),0) AS debit, 
-                                        COALESCE(SUM(l.credit),0) AS credit, 
-                                        COALESCE(SUM(l.debit - l.credit),0) AS initial_balance
-                                    FROM account_move_line l
-                                    JOIN account_move m ON (l.move_id=m.id)
-                                    JOIN account_account a ON (l.account_id=a.id)
-                                   
-                                    LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                                    LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                                    JOIN account_journal j ON (l.journal_id=j.id) 
-                                    WHERE %s
-                                ''') % KS_INIT_BAL_WHERE_FULL
-                cr.execute(ks_init_bal_sql)
-                initial_bal_data = cr.dictfetchall()
-
-            cr.execute(sql)
-            for ks_row in cr.dictfetchall():
-                if ks_currency.is_zero(ks_row['debit']) and ks_currency.is_zero(ks_row['credit']):
-                    ks_move_lines.pop(ks_account.code, None)
-                else:
-                    ks_row['ending_bal'] = True
-                    ks_row['initial_bal'] = False
-                    ks_move_lines[ks_account.code]['lines'].append(ks_row)
-                    ks_move_lines[ks_account.code]['initial_balance'] = initial_bal_data[0].get('initial_balance', 0.0) \
-                        if len(initial_bal_data) > 0 else 0.0
-                    ks_move_lines[ks_account.code]['debit'] = ks_row['debit']
-                    ks_move_lines[ks_account.code]['credit'] = ks_row['credit']
-                    ks_move_lines[ks_account.code]['balance'] = ks_row['balance'] + ks_move_lines[ks_account.code][
-                        'initial_balance']
-                    ks_move_lines[ks_account.code]['company_currency_id'] = ks_currency.id
-                    ks_move_lines[ks_account.code]['company_currency_symbol'] = ks_symbol
-                    ks_move_lines[ks_account.code]['company_currency_precision'] = ks_rounding
-                    ks_move_lines[ks_account.code]['company_currency_position'] = ks_position
-                    ks_move_lines[ks_account.code]['count'] = len(ks_current_lines)
-                    ks_move_lines[ks_account.code]['pages'] = self.ks_fetch_page_list(len(ks_current_lines))
-                    ks_move_lines[ks_account.code]['single_page'] = True if len(
-                        ks_current_lines) <= FETCH_RANGE else False
-                    for i in range(0, len(ks_move_lines[ks_account.code]['lines'])):
-                        lang = self.env.user.lang
-                        lang_id = self.env['res.lang'].search([('code', '=', lang)])['date_format'].replace('/', '-')
-                        if ks_move_lines[ks_account.code]['lines'][i].get('ldate') != None:
-                            ks_move_lines[ks_account.code]['lines'][i]['ldate'] = datetime.datetime.strptime(
-                                (ks_move_lines[ks_account.code]['lines'][i]['ldate']).strftime(lang_id), lang_id).date()
+        ks_company_id = self.env['res.company'].sudo().browse(ks_df_informations.get('company_id'))
+        for ks_code, ks_account in ks_accounts.items():
+            ks_balance = ks_balances.get(ks_code)
+            ks_currency = ks_account.company_id.currency_id or ks_company_id.currency_id
+            if not ks_balance or (ks_currency.is_zero(ks_balance['full_debit'])
+                                  and ks_currency.is_zero(ks_balance['full_credit'])):
+                ks_move_lines.pop(ks_code, None)
+                continue
+            ks_account_lines = ks_move_lines[ks_code]
+            ks_opening_balance = 0
+            if ks_df_informations.get('initial_balance'):
+                ks_opening_balance = ks_balance['init_balance']
+                ks_account_lines['lines'].append({
+                    'debit': ks_balance['init_debit'],
+                    'credit': ks_balance['init_credit'],
+                    'balance': ks_balance['init_balance'],
+                    'move_name': 'Initial Balance',
+                    'account_id': ks_account.id,
+                    'initial_bal': True,
+                    'ending_bal': False,
+                })
+            for ks_row in ks_current_lines.get(ks_code, []):
+                ks_row['balance'] += ks_opening_balance
+                ks_account_lines['lines'].append(ks_row)
+            ks_account_lines['lines'].append({
+                'debit': ks_balance['full_debit'],
+                'credit': ks_balance['full_credit'],
+                'balance': ks_balance['full_balance'],
+                'ending_bal': True,
+                'initial_bal': False,
+            })
+            ks_count = ks_balance['current_count']
+            ks_account_lines.update({
+                'initial_balance': ks_balance['in_bal_balance'],
+                'debit': ks_balance['full_debit'],
+                'credit': ks_balance['full_credit'],
+                'balance': ks_balance['full_balance'] + ks_balance['in_bal_balance'],
+                'company_currency_id': ks_currency.id,
+                'company_currency_symbol': ks_currency.symbol,
+                'company_currency_precision': ks_currency.rounding,
+                'company_currency_position': ks_currency.position,
+                'count': ks_count,
+                'pages': self.ks_fetch_page_list(ks_count),
+                'single_page': True if ks_count <= FETCH_RANGE else False,
+            })
 
         return ks_move_lines, 0.0, 0.0, 0.0
 
@@ -2470,110 +2475,71 @@ class ks_dynamic_financial_base(models.Model):
         1. Initial Balance
         2. Current Balance
         3. Final Balance
+        The running balance of the page is computed by a window function, so only the lines
+        of the requested page are read.
         '''
         cr = self.env.cr
         ks_offset_count = offset * fetch_range
-        count = 0
-        ks_opening_balance = 0
 
         ks_company_id = self.env.user.company_id
         ks_currency_id = ks_company_id.currency_id
 
         WHERE = self.ks_df_build_where_clause(ks_df_informations)
-        KSINITWHERE = WHERE
-        KS_WHERE_INIT = WHERE
-        if ks_df_informations['date']['ks_process'] == 'range':
-            KS_WHERE_INIT = KS_WHERE_INIT + " AND l.date < '%s'" % ks_df_informations['date'].get('ks_start_date')
-            KS_WHERE_CURRENT = WHERE + " AND l.date >= '%s'" % ks_df_informations['date'].get(
-                'ks_start_date') + " AND l.date <= '%s'" % ks_df_informations['date'].get(
-                'ks_end_date')
-        else:
-            KS_WHERE_CURRENT = WHERE + " AND l.date <= '%s'" % ks_df_informations['date'].get(
-                'ks_end_date')
-
-        KS_WHERE_INIT += " AND l.account_id = %s" % ks_account
-        # KS_WHERE_INIT += WHERE
-
-        KS_WHERE_CURRENT += " AND a.id = %s" % ks_account
-        KSINITWHERE += " AND a.id = %s" % ks_account
+        ks_params = {'ks_account_ids': (int(ks_account),)}
+        ks_balance = self.ks_gl_account_balances(
+            WHERE, ks_df_informations, 'l.account_id', ks_params).get(int(ks_account))
+        if not ks_balance:
+            ks_balance = dict.fromkeys([
+                'init_debit', 'init_credit', 'init_balance', 'current_count', 'full_debit',
+                'full_credit', 'full_balance', 'in_bal_debit', 'in_bal_credit', 'in_bal_balance',
+                'in_bal_amount_currency'], 0)
+        count = ks_balance['current_count']
 
+        ks_opening_balance = 0
         if ks_df_informations.get('initial_balance'):
-            KS_WHERE_FULL = WHERE + " AND l.date <= '%s'" % ks_df_informations['date'].get('ks_start_date')
-            # KS_WHERE_INIT += WHERE
-        else:
-            KS_WHERE_FULL = WHERE + " AND l.date >= '%s'" % ks_df_informations['date'].get(
-                'ks_start_date') + " AND l.date <= '%s'" % ks_df_informations['date'].get(
-                'ks_end_date')
-        KS_WHERE_FULL += " AND a.id = %s" % ks_account
-
-        if ks_df_informations.get('sort_accounts_by') == 'date':
-            KS_ORDER_BY_CURRENT = 'l.date, l.move_id'
-        else:
-            KS_ORDER_BY_CURRENT = 'j.code, p.name, l.move_id'
+            ks_opening_balance += ks_balance['init_balance']
 
         ks_move_lines = []
-        if ks_df_informations.get('initial_balance'):
-            sql = ('''
-                    SELECT 
-                        COALESCE(SUM(l.debit - l.credit),0) AS balance
-                    FROM account_move_line l
-                    JOIN account_move m ON (l.move_id=m.id)
-                    JOIN account_account a ON (l.account_id=a.id)
-                    LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                    LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                    JOIN account_journal j ON (l.journal_id=j.id)
-                    WHERE %s
-                ''') % KS_WHERE_INIT
-            cr.execute(sql)
-            row = cr.dictfetchone()
-            ks_opening_balance += row.get('balance')
-
-        sql = ('''
-            SELECT 
-                COALESCE(SUM(l.debit - l.credit),0) AS balance
-            FROM account_move_line l
-            JOIN account_move m ON (l.move_id=m.id)
-            JOIN account_account a ON (l.account_id=a.id)
-            LEFT JOIN res_currency c ON (l.currency_id=c.id)
-            LEFT JOIN res_partner p ON (l.partner_id=p.id)
-            JOIN account_journal j ON (l.journal_id=j.id)
-            WHERE %s
-            GROUP BY j.code, p.name, l.date, l.move_id
-            ORDER BY %s
-            OFFSET %s ROWS
-            FETCH FIRST %s ROWS ONLY
-        ''') % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, 0, ks_offset_count)
-        cr.execute(sql)
-        ks_running_balance_list = cr.fetchall()
-        for ks_running_balance in ks_running_balance_list:
-            ks_opening_balance += ks_running_balance[0]
+        ks_initial_bal_data = 0
+        ks_conditions, ks_date_params = self.ks_gl_date_conditions(ks_df_informations)
+        if ks_conditions['in_bal'] != 'FALSE':
+            ks_opening_balance += ks_balance['in_bal_balance']
+            ks_initial_bal_data = ks_balance['in_bal_balance']
+            ks_move_lines.append({
+                'lcode': 'Initial Balance',
+                'partner_name': "-",
+                'move_name': "-",
+                'lname': "-",
+                'currency_id': ks_currency_id.id,
+                'currency_symbol': ks_currency_id.symbol,
+                'currency_position': ks_currency_id.position,
+                'company_currency_symbol': ks_currency_id.symbol,
+                'company_currency_id': ks_currency_id.id,
+                'amount_currency': ks_balance['in_bal_amount_currency'],
+                'initial_balance': ks_opening_balance,
+                'debit': ks_balance['in_bal_debit'],
+                'credit': ks_balance['in_bal_credit'],
+                'balance': ks_opening_balance,
+            })
 
+        if (int(ks_offset_count / fetch_range) == 0) and ks_df_informations.get('initial_balance'):
+            ks_move_lines.append({
+                'debit': ks_balance['init_debit'],
+                'credit': ks_balance['init_credit'],
+                'balance': ks_balance['init_balance'],
+                'move_name': 'Initial Balance',
+                'account_id': ks_account,
+                'company_currency_id': ks_currency_id.id,
+            })
+        ks_order_by = self.ks_gl_order_by(ks_df_informations)
         sql = ('''
-            SELECT COUNT(*)
-            FROM account_move_line l
-                JOIN account_move m ON (l.move_id=m.id)
-                JOIN account_account a ON (l.account_id=a.id)
-                LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                LEFT JOIN res_currency cc ON (l.company_currency_id=cc.id)
-                LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                JOIN account_journal j ON (l.journal_id=j.id)
-            WHERE %s
-        ''') % (KS_WHERE_CURRENT)
-        cr.execute(sql)
-        count = cr.fetchone()[0]
-        ks_initial_bal_data = 0
-        if self.env['ir.config_parameter'].sudo().get_param('ks_enable_ledger_in_bal') and \
-                ks_df_informations['date']['ks_process'] == 'range':
-            KSINITWHERE_CURRENT = KSINITWHERE + " AND l.date < '%s'" % ks_df_informations['date'].get('ks_start_date')
-            KSINITWHERE_CURRENT += " AND a.internal_group not in ('income', 'expense')"
-            ks_initial_bal_sql = ('''
+                SELECT * FROM (
                     SELECT
                         l.id AS lid,
                         l.account_id AS account_id,
                         l.date AS ldate,
                         j.code AS lcode,
                         l.currency_id,
-                        --l.ref AS lref,
                         l.name AS lname,
                         m.id AS move_id,
                         m.name AS move_name,
@@ -2587,8 +2553,11 @@ class ks_dynamic_financial_base(models.Model):
                         p.name AS partner_name,
                         COALESCE(l.debit,0) AS debit,
                         COALESCE(l.credit,0) AS credit,
-                        COALESCE(l.debit - l.credit,0) AS balance,
-                        COALESCE(l.amount_currency,0) AS amount_currency
+                        SUM(COALESCE(l.debit - l.credit,0)) OVER (
+                            ORDER BY %(order_by)s ROWS UNBOUNDED PRECEDING
+                        ) AS balance,
+                        COALESCE(l.amount_currency,0) AS amount_currency,
+                        ROW_NUMBER() OVER (ORDER BY %(order_by)s) AS ks_row_number
                     FROM account_move_line l
                     JOIN account_move m ON (l.move_id=m.id)
                     JOIN account_account a ON (l.account_id=a.id)
@@ -2596,147 +2565,33 @@ class ks_dynamic_financial_base(models.Model):
                     LEFT JOIN res_currency cc ON (l.company_currency_id=cc.id)
                     LEFT JOIN res_partner p ON (l.partner_id=p.id)
                     JOIN account_journal j ON (l.journal_id=j.id)
-                    WHERE %s
-                    GROUP BY l.id, l.account_id, l.date, j.code, l.currency_id, l.amount_currency, l.name, m.id, m.name, c.rounding, cc.id, cc.rounding, cc.position, c.position, c.symbol, cc.symbol, p.name
-                    ORDER BY %s
-                    OFFSET %s ROWS
-                    FETCH FIRST %s ROWS ONLY
-                ''') % (KSINITWHERE_CURRENT, KS_ORDER_BY_CURRENT, ks_offset_count, fetch_range)
-            cr.execute(ks_initial_bal_sql)
-            ks_dict = cr.dictfetchall()
-            ks_temp_dict = {
-                'lcode': 'Initial Balance',
-                'partner_name': "-",
-                'move_name': "-",
-                'lname': "-",
-                'currency_id': False,
-                'currency_symbol': False,
-                'currency_position': False,
-                'company_currency_symbol': False,
-                'company_currency_id': False,
-                'amount_currency': 0,
-                'initial_balance': 0,
-                'debit': 0,
-                'credit': 0,
-                'balance': 0,
-            }
-            for row in ks_dict:
-                current_balance = row['balance']
-                row['balance'] = ks_opening_balance + current_balance
-                ks_opening_balance += current_balance
-                row['initial_balance'] = row['balance']
-                row['initial_bal'] = False
-
-                ks_temp_dict['currency_id'] = row['currency_id']
-                ks_temp_dict['currency_symbol'] = row['currency_symbol']
-                ks_temp_dict['currency_position'] = row['currency_position']
-                ks_temp_dict['company_currency_symbol'] = row['company_currency_symbol']
-                ks_temp_dict['company_currency_id'] = row['company_currency_id']
-
-                ks_temp_dict['debit'] += row['debit']
-                ks_temp_dict['credit'] += row['credit']
-                ks_temp_dict['balance'] = row['balance']
-                ks_temp_dict['initial_balance'] = row['balance']
-                ks_temp_dict['amount_currency'] += row['amount_currency']
-
-                ks_initial_bal_data += row['balance']
-            ks_move_lines.append(ks_temp_dict)
-
-        if (int(ks_offset_count / fetch_range) == 0) and ks_df_informations.get('initial_balance'):
-            sql = ('''
-                    SELECT 
-                        COALESCE(SUM(l.debit),0) AS debit, 
-                        COALESCE(SUM(l.credit),0) AS credit, 
-                        COALESCE(SUM(l.debit - l.credit),0) AS balance
-                    FROM account_move_line l
-                    JOIN account_move m ON (l.move_id=m.id)
-                    JOIN account_account a ON (l.account_id=a.id)
-      
-                    LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                    LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                    JOIN account_journal j ON (l.journal_id=j.id)
-                    WHERE %s
-                ''') % KS_WHERE_INIT
-            cr.execute(sql)
-            for ks_row in cr.dictfetchall():
-                ks_row['move_name'] = 'Initial Balance'
-                ks_row['account_id'] = ks_account
-                ks_row['company_currency_id'] = ks_currency_id.id
-                ks_move_lines.append(ks_row)
-        sql = ('''
-                SELECT
-                    l.id AS lid,
-                    l.account_id AS account_id,
-                    l.date AS ldate,
-                    j.code AS lcode,
-                    l.currency_id,
-                    --l.ref AS lref,
-                    l.name AS lname,
-                    m.id AS move_id,
-                    m.name AS move_name,
-                    c.symbol AS currency_symbol,
-                    c.position AS currency_position,
-                    c.rounding AS currency_precision,
-                    cc.id AS company_currency_id,
-                    cc.symbol AS company_currency_symbol,
-                    cc.rounding AS company_currency_precision,
-                    cc.position AS company_currency_position,
-                    p.name AS partner_name,
-                    COALESCE(l.debit,0) AS debit,
-                    COALESCE(l.credit,0) AS credit,
-                    COALESCE(l.debit - l.credit,0) AS balance,
-                    COALESCE(l.amount_currency,0) AS amount_currency
-                FROM account_move_line l
-                JOIN account_move m ON (l.move_id=m.id)
-                JOIN account_account a ON (l.account_id=a.id)
-      
-                LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                LEFT JOIN res_currency cc ON (l.company_currency_id=cc.id)
-                LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                JOIN account_journal j ON (l.journal_id=j.id)
-                WHERE %s
-                GROUP BY l.id, l.account_id, l.date, j.code, l.currency_id, l.amount_currency, l.name, m.id, m.name, c.rounding, cc.id, cc.rounding, cc.position, c.position, c.symbol, cc.symbol, p.name
-                ORDER BY %s
-                OFFSET %s ROWS
-                FETCH FIRST %s ROWS ONLY
-            ''') % (KS_WHERE_CURRENT, KS_ORDER_BY_CURRENT, ks_offset_count, fetch_range)
-        cr.execute(sql)
+                    WHERE %(where)s AND %(current)s AND l.account_id IN %%(ks_account_ids)s
+                ) ks_lines
+                ORDER BY ks_row_number
+                OFFSET %%(ks_offset)s ROWS
+                FETCH FIRST %%(ks_fetch_range)s ROWS ONLY
+            ''') % {'where': WHERE, 'current': ks_conditions['current'], 'order_by': ks_order_by}
+        cr.execute(sql, dict(ks_params, ks_offset=ks_offset_count, ks_fetch_range=fetch_range, **ks_date_params))
+        ks_date_format = self.ks_gl_date_format()
         for ks_row in cr.dictfetchall():
-            lang = self.env.user.lang
-            lang_id = self.env['res.lang'].search([('code', '=', lang)])['date_format'].replace('/', '-')
-
-            dt_con_dt_maturity = ks_row['ldate'].strftime(lang_id)
-            ks_row['ldate'] = datetime.datetime.strptime(dt_con_dt_maturity, lang_id).date()
-            ks_current_balance = ks_row['balance']
-            ks_row['balance'] = ks_opening_balance + ks_current_balance
-            ks_opening_balance += ks_current_balance
+            ks_row.pop('ks_row_number')
+            ks_row['ldate'] = datetime.datetime.strptime(ks_row['ldate'].strftime(ks_date_format),
+                                                         ks_date_format).date()
+            ks_row['balance'] += ks_opening_balance
             ks_row['initial_bal'] = False
             ks_move_lines.append(ks_row)
 
         if ((count - ks_offset_count) <= fetch_range) and ks_df_informations.get('initial_balance'):
-            sql = ('''
-                    SELECT 
-                        COALESCE(SUM(l.debit),0) AS debit, 
-                        COALESCE(SUM(l.credit),0) AS credit, 
-                        COALESCE(SUM(l.debit - l.credit),0) AS balance
-                    FROM account_move_line l
-                    JOIN account_move m ON (l.move_id=m.id)
-                    JOIN account_account a ON (l.account_id=a.id)
-                   
-                    LEFT JOIN res_currency c ON (l.currency_id=c.id)
-                    LEFT JOIN res_partner p ON (l.partner_id=p.id)
-                    JOIN account_journal j ON (l.journal_id=j.id)
-                    WHERE %s
-                ''') % KS_WHERE_FULL
-            cr.execute(sql)
-            for ks_row in cr.dictfetchall():
-                ks_row['move_name'] = 'Ending Balance'
-                ks_row['account_id'] = ks_account
-                ks_row['company_currency_id'] = ks_currency_id.id
-                ks_move_lines.append(ks_row)
+            ks_move_lines.append({
+                'debit': ks_balance['full_debit'],
+                'credit': ks_balance['full_credit'],
+                'balance': ks_balance['full_balance'],
+                'move_name': 'Ending Balance',
+                'account_id': ks_account,
+                'company_currency_id': ks_currency_id.id,
+            })
         if len(ks_move_lines) > 0 and ks_move_lines[-1].get('move_name') == 'Ending Balance':
             ks_move_lines[-1]['initial_balance'] = ks_initial_bal_data
-            # ks_move_lines[-1]['debit'] = ks_initial_bal_data
             ks_move_lines[-1]['balance'] += ks_initial_bal_data
         return count, ks_offset_count, ks_move_lines
 
@@ -2,9 +2,13 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
 
 import hashlib
+import json
 import os
+import tempfile
 from fnmatch import fnmatch
 
+CHUNK_SIZE = 64 * 1024
+
 
 def _fnmatch(filename, patterns):
     for pattern in patterns:
@@ -32,13 +36,66 @@ def _walk(top, exclude_patterns, keep_langs):
             yield filepath
 
 
-def addon_hash(top, exclude_patterns, keep_langs):
-    """Compute a sha1 digest of file contents."""
+def _stat_signature(top, filepaths):
+    """Return a digest of the path, size, modification time and inode of
+    ``filepaths``, which changes whenever one of the files may have changed."""
+    m = hashlib.sha1()
+    for filepath in filepaths:
+        st = os.stat(os.path.join(top, filepath))
+        m.update(
+            repr((filepath, st.st_size, st.st_mtime_ns, st.st_ino)).encode("utf-8")
+        )
+    return m.hexdigest()
+
+
+def addon_hash(top, exclude_patterns, keep_langs, cache=None):
+    """Compute a sha1 digest of file contents.
+
+    When a ``cache`` dict is given, the digest is stored in it with the
+    signature of the hashed files, and returned without reading them again
+    as long as none of them is added, removed or modified.
+    """
+    filepaths = list(_walk(top, exclude_patterns, keep_langs))
+    if cache is not None:
+        # stat before reading, so a file modified meanwhile is hashed again
+        signature = _stat_signature(top, filepaths)
+        entry = cache.get(top)
+        if entry and entry.get("signature") == signature:
+            return entry["digest"]
     m = hashlib.sha1()
-    for filepath in _walk(top, exclude_patterns, keep_langs):
+    for filepath in filepaths:
         # hash filename so empty files influence the hash
         m.update(filepath.encode("utf-8"))
         # hash file content
         with open(os.path.join(top, filepath), "rb") as f:
-            m.update(f.read())
-    return m.hexdigest()
+            for chunk in iter(lambda f=f: f.read(CHUNK_SIZE), b""):
+                m.update(chunk)
+    digest = m.hexdigest()
+    if cache is not None:
+        cache[top] = {"signature": signature, "digest": digest}
+    return digest
+
+
+def load_cache(path):
+    """Return the cache saved in the ``path`` json file, empty if the file is
+    missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_cache(path, cache):
+    """Atomically save ``cache`` in the ``path`` json file."""
+    dirname = os.path.dirname(path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
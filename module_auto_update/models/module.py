@@ -5,15 +5,17 @@
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from odoo import _, api, exceptions, models, tools
 from odoo.modules.module import get_module_path
 
-from ..addon_hash import addon_hash
+from ..addon_hash import addon_hash, load_cache, save_cache
 
 PARAM_INSTALLED_CHECKSUMS = "module_auto_update.installed_checksums"
 PARAM_EXCLUDE_PATTERNS = "module_auto_update.exclude_patterns"
 DEFAULT_EXCLUDE_PATTERNS = "*.pyc,*.pyo,i18n/*.pot,i18n_extra/*.pot,static/*"
+CHECKSUM_CACHE_FILE = "module_auto_update_checksums.json"
 
 _logger = logging.getLogger(__name__)
 
@@ -45,9 +47,24 @@ def ensure_module_state(env, modules, state):
 class Module(models.Model):
     _inherit = "ir.module.module"
 
+    # Number of threads hashing the modules, None for the executor default
+    _checksum_max_workers = None
+
     def _get_checksum_dir(self):
         self.ensure_one()
+        return self._get_checksum_dirs()[self.name]
+
+    @api.model
+    def _get_checksum_cache_path(self):
+        return os.path.join(tools.config["data_dir"], CHECKSUM_CACHE_FILE)
 
+    def _get_checksum_dirs(self):
+        """Return the checksums of the modules, by module name.
+
+        Modules are hashed in parallel threads. Their checksums are cached
+        on disk with the size, modification time and inode of their files,
+        so unchanged modules are not read again on the next run.
+        """
         exclude_patterns = self.env["ir.config_parameter"].get_param(
             PARAM_EXCLUDE_PATTERNS,
             DEFAULT_EXCLUDE_PATTERNS,
@@ -55,17 +72,29 @@ class Module(models.Model):
         exclude_patterns = [p.strip() for p in exclude_patterns.split(",")]
         keep_langs = self.env["res.lang"].search([]).mapped("code")
 
-        module_path = get_module_path(self.name)
-        if module_path and os.path.isdir(module_path):
-            checksum_dir = addon_hash(
-                module_path,
-                exclude_patterns,
-                keep_langs,
-            )
-        else:
-            checksum_dir = False
+        module_paths = {}
+        for module in self:
+            module_path = get_module_path(module.name)
+            if module_path and os.path.isdir(module_path):
+                module_paths[module.name] = module_path
+        if not module_paths:
+            return dict.fromkeys(self.mapped("name"), False)
+
+        cache_path = self._get_checksum_cache_path()
+        cache = load_cache(cache_path)
 
-        return checksum_dir
+        def checksum(module_path):
+            return addon_hash(module_path, exclude_patterns, keep_langs, cache)
+
+        with ThreadPoolExecutor(max_workers=self._checksum_max_workers) as executor:
+            checksums = dict(
+                zip(module_paths, executor.map(checksum, module_paths.values()))
+            )
+        try:
+            save_cache(cache_path, cache)
+        except OSError as e:
+            _logger.warning("Could not save checksums cache %s: %s", cache_path, e)
+        return {name: checksums.get(name, False) for name in self.mapped("name")}
 
     @api.model
     def _get_saved_checksums(self):
@@ -80,11 +109,8 @@ class Module(models.Model):
 
     @api.model
     def _save_installed_checksums(self):
-        checksums = {}
         installed_modules = self.search([("state", "=", "installed")])
-        for module in installed_modules:
-            checksums[module.name] = module._get_checksum_dir()
-        self._save_checksums(checksums)
+        self._save_checksums(installed_modules._get_checksum_dirs())
 
     @api.model
     def _get_modules_partially_installed(self):
@@ -94,8 +120,9 @@ class Module(models.Model):
     def _get_modules_with_changed_checksum(self):
         saved_checksums = self._get_saved_checksums()
         installed_modules = self.search([("state", "=", "installed")])
+        checksums = installed_modules._get_checksum_dirs()
         return installed_modules.filtered(
-            lambda r: r._get_checksum_dir() != saved_checksums.get(r.name),
+            lambda r: checksums[r.name] != saved_checksums.get(r.name),
         )
 
     @api.model
@@ -2,6 +2,9 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl).
 
 import os
+import shutil
+import tempfile
+from unittest import mock
 
 from odoo.tests import TransactionCase
 
@@ -74,3 +77,35 @@ class TestAddonHash(TransactionCase):
             keep_langs=["fr_FR", "nl"],
         )
         self.assertEqual(checksum, "5a14909e62f05c340f717bd87f64479a862b1941")
+
+    def test_cache(self):
+        kwargs = dict(
+            exclude_patterns=["*.pyc", "*.pyo", "*.pot", "static/*"],
+            keep_langs=["fr_FR", "nl"],
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sample_dir = os.path.join(tmp_dir, "sample_module")
+            shutil.copytree(self.sample_dir, sample_dir)
+            cache = {}
+            checksum = addon_hash.addon_hash(sample_dir, cache=cache, **kwargs)
+            self.assertEqual(checksum, "5a14909e62f05c340f717bd87f64479a862b1941")
+            self.assertEqual(cache[sample_dir]["digest"], checksum)
+            # unchanged files are not read again
+            with mock.patch("builtins.open", side_effect=AssertionError):
+                self.assertEqual(
+                    addon_hash.addon_hash(sample_dir, cache=cache, **kwargs),
+                    checksum,
+                )
+            # a modified file invalidates the cached digest
+            with open(os.path.join(sample_dir, "README.rst"), "a") as f:
+                f.write("changed")
+            new_checksum = addon_hash.addon_hash(sample_dir, cache=cache, **kwargs)
+            self.assertNotEqual(new_checksum, checksum)
+            self.assertEqual(
+                new_checksum, addon_hash.addon_hash(sample_dir, **kwargs)
+            )
+            # the cache survives a save and load round trip
+            cache_path = os.path.join(tmp_dir, "cache", "checksums.json")
+            addon_hash.save_cache(cache_path, cache)
+            self.assertEqual(addon_hash.load_cache(cache_path), cache)
+        self.assertEqual(addon_hash.load_cache(cache_path), {})
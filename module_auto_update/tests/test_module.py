@@ -63,6 +63,31 @@ class TestModule(TransactionCase):
                 "SHA1 checksum not recomputed",
             )
 
+    def test_compute_checksum_dirs(self):
+        """It should compute the checksums of several modules in parallel,
+        with the same result as one by one"""
+        Imm = self.env["ir.module.module"]
+        modules = Imm.search([("name", "in", ("base", "web", MODULE_NAME))])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = os.path.join(tmp_dir, "checksums.json")
+            with mock.patch.object(
+                type(Imm), "_get_checksum_cache_path", return_value=cache_path
+            ):
+                checksums = modules._get_checksum_dirs()
+                self.assertTrue(os.path.exists(cache_path))
+                # served from the cache the second time
+                self.assertEqual(modules._get_checksum_dirs(), checksums)
+        self.assertEqual(checksums[MODULE_NAME], self.own_checksum)
+        for module in modules:
+            self.assertEqual(
+                checksums[module.name],
+                addon_hash(
+                    get_module_path(module.name),
+                    exclude_patterns=DEFAULT_EXCLUDE_PATTERNS.split(","),
+                    keep_langs=self.env["res.lang"].search([]).mapped("code"),
+                ),
+            )
+
     def test_saved_checksums(self):
         Imm = self.env["ir.module.module"]
         base_module = Imm.search([("name", "=", "base")])
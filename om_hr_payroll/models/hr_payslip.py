@@ -1,12 +1,102 @@
 # -*- coding:utf-8 -*-
 
 import babel
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, time
 from dateutil.relativedelta import relativedelta
 from pytz import timezone
 from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError, ValidationError
 
+_logger = logging.getLogger(__name__)
+
+# Total of a payslip line, as computed by hr.payslip.line
+LINE_TOTAL = "pl.quantity * pl.amount * pl.rate / 100"
+
+# Sums of the done payslips of employees by code and payslip dates, the
+# ``sum`` helpers of the salary rules filter and add them up
+AGGREGATE_QUERIES = {
+    'inputs': """
+        SELECT hp.employee_id, pi.code, hp.date_from, hp.date_to, sum(pi.amount)
+        FROM hr_payslip as hp, hr_payslip_input as pi
+        WHERE hp.employee_id IN %s AND hp.state = 'done'
+        AND hp.date_from >= %s AND hp.id = pi.payslip_id
+        GROUP BY hp.employee_id, pi.code, hp.date_from, hp.date_to""",
+    'worked_days': """
+        SELECT hp.employee_id, pi.code, hp.date_from, hp.date_to,
+            sum(number_of_days), sum(number_of_hours)
+        FROM hr_payslip as hp, hr_payslip_worked_days as pi
+        WHERE hp.employee_id IN %s AND hp.state = 'done'
+        AND hp.date_from >= %s AND hp.id = pi.payslip_id
+        GROUP BY hp.employee_id, pi.code, hp.date_from, hp.date_to""",
+    'payslips': """
+        SELECT hp.employee_id, pl.code, hp.date_from, hp.date_to,
+            sum(case when hp.credit_note = False then ({total}) else (-{total}) end)
+        FROM hr_payslip as hp, hr_payslip_line as pl
+        WHERE hp.employee_id IN %s AND hp.state = 'done'
+        AND hp.date_from >= %s AND hp.id = pl.slip_id
+        GROUP BY hp.employee_id, pl.code, hp.date_from, hp.date_to""".format(total=LINE_TOTAL),
+}
+
+
+class PayslipBatchData(object):
+    """Data shared by the payslips computed together: the sorted rules by
+    structures, and the sums of the done payslips of their employees since
+    ``date_from``, each kind of sum being fetched by one grouped query on
+    first use."""
+
+    def __init__(self, env, employee_ids, date_from):
+        self.env = env
+        self.employee_ids = set(employee_ids)
+        self.date_from = date_from
+        self.rules = {}
+        self._aggregates = {}
+
+    def _get_aggregates(self, kind):
+        if kind not in self._aggregates:
+            for model in ('hr.payslip', 'hr.payslip.input', 'hr.payslip.worked_days', 'hr.payslip.line'):
+                self.env[model].flush_model()
+            self.env.cr.execute(AGGREGATE_QUERIES[kind], (tuple(self.employee_ids), self.date_from))
+            aggregates = defaultdict(list)
+            for employee_id, code, date_from, date_to, *values in self.env.cr.fetchall():
+                aggregates[employee_id, code].append((date_from, date_to, values))
+            self._aggregates[kind] = aggregates
+        return self._aggregates[kind]
+
+    @staticmethod
+    def _to_date(value):
+        # datetimes are not compared like dates by PostgreSQL
+        if isinstance(value, datetime):
+            return None
+        if isinstance(value, date):
+            return value
+        if isinstance(value, str):
+            try:
+                return fields.Date.to_date(value)
+            except ValueError:
+                return None
+        return None
+
+    def sum(self, kind, employee_id, code, from_date, to_date):
+        """Return the row the SQL query of the ``sum`` helper would return,
+        or None if the sums of these arguments were not fetched."""
+        from_date, to_date = self._to_date(from_date), self._to_date(to_date)
+        if employee_id not in self.employee_ids or not from_date or not to_date \
+                or from_date < self.date_from:
+            return None
+        rows = [
+            values
+            for row_from, row_to, values in self._get_aggregates(kind).get((employee_id, code), [])
+            if row_from >= from_date and row_to <= to_date
+        ]
+        res = []
+        for column in zip(*rows) if rows else [()] * (2 if kind == 'worked_days' else 1):
+            column = [value for value in column if value is not None]
+            res.append(sum(column) if column else None)
+        return tuple(res)
+
 
 class HrPayslip(models.Model):
     _name = 'hr.payslip'
@@ -14,6 +104,10 @@ class HrPayslip(models.Model):
     _inherit = ['mail.thread', 'mail.activity.mixin']
     _order = 'id desc'
 
+    # Number of payslips computed together, sharing the sorted rules and the
+    # sums of the done payslips of their employees
+    _payslip_chunk_size = 100
+
     struct_id = fields.Many2one('hr.payroll.structure', string='Structure',
         help='Defines the rules that have to be applied to this payslip, accordingly '
              'to the contract chosen. If you let empty the field contract, this field isn\'t '
@@ -162,19 +256,35 @@ class HrPayslip(models.Model):
         return self.env['hr.contract'].search(clause_final).ids
 
     def compute_sheet(self):
+        for index in range(0, len(self), self._payslip_chunk_size):
+            self[index:index + self._payslip_chunk_size]._compute_sheet_chunk()
+        return True
+
+    def _compute_sheet_chunk(self):
+        batch_data = None
+        # done payslips are part of the sums, they must be computed one by one
+        if len(self) > 1 and 'done' not in self.mapped('state'):
+            date_from = min(self.mapped('date_from'))
+            batch_data = PayslipBatchData(self.env, self.employee_id.ids, date(date_from.year, 1, 1))
+        # delete old payslip lines
+        self.line_ids.unlink()
+        line_vals = []
         for payslip in self:
             number = payslip.number or self.env['ir.sequence'].next_by_code('salary.slip')
-            # delete old payslip lines
-            payslip.line_ids.unlink()
             # set the list of contract for which the rules have to be applied
             # if we don't give the contract, then the rules to apply should be for all current contracts of the employee
             contract_ids = payslip.contract_id.ids or \
                 self.get_contract(payslip.employee_id, payslip.date_from, payslip.date_to)
             if not contract_ids:
                 raise ValidationError(_("No running contract found for the employee: %s or no contract in the given period" % payslip.employee_id.name))
-            lines = [(0, 0, line) for line in self._get_payslip_lines(contract_ids, payslip.id)]
-            payslip.write({'line_ids': lines, 'number': number})
-        return True
+            if batch_data:
+                lines = self._get_payslip_lines(contract_ids, payslip.id, batch_data=batch_data)
+            else:
+                lines = self._get_payslip_lines(contract_ids, payslip.id)
+            line_vals += [dict(line, slip_id=payslip.id) for line in lines]
+            if payslip.number != number:
+                payslip.number = number
+        self.env['hr.payslip.line'].create(line_vals)
 
     @api.model
     def get_worked_day_lines(self, contracts, date_from, date_to):
@@ -252,7 +362,7 @@ class HrPayslip(models.Model):
         return res
 
     @api.model
-    def _get_payslip_lines(self, contract_ids, payslip_id):
+    def _get_payslip_lines(self, contract_ids, payslip_id, batch_data=None):
         def _sum_salary_rule_category(localdict, category, amount):
             if category.parent_id:
                 localdict = _sum_salary_rule_category(localdict, category.parent_id, amount)
@@ -273,19 +383,25 @@ class HrPayslip(models.Model):
             def sum(self, code, from_date, to_date=None):
                 if to_date is None:
                     to_date = fields.Date.today()
-                self.env.cr.execute("""
-                    SELECT sum(amount) as sum
-                    FROM hr_payslip as hp, hr_payslip_input as pi
-                    WHERE hp.employee_id = %s AND hp.state = 'done'
-                    AND hp.date_from >= %s AND hp.date_to <= %s AND hp.id = pi.payslip_id AND pi.code = %s""",
-                    (self.employee_id, from_date, to_date, code))
-                return self.env.cr.fetchone()[0] or 0.0
+                res = batch_data and batch_data.sum('inputs', self.employee_id, code, from_date, to_date)
+                if res is None:
+                    self.env.cr.execute("""
+                        SELECT sum(amount) as sum
+                        FROM hr_payslip as hp, hr_payslip_input as pi
+                        WHERE hp.employee_id = %s AND hp.state = 'done'
+                        AND hp.date_from >= %s AND hp.date_to <= %s AND hp.id = pi.payslip_id AND pi.code = %s""",
+                        (self.employee_id, from_date, to_date, code))
+                    res = self.env.cr.fetchone()
+                return res[0] or 0.0
 
         class WorkedDays(BrowsableObject):
             """a class that will be used into the python code, mainly for usability purposes"""
             def _sum(self, code, from_date, to_date=None):
                 if to_date is None:
                     to_date = fields.Date.today()
+                res = batch_data and batch_data.sum('worked_days', self.employee_id, code, from_date, to_date)
+                if res is not None:
+                    return res
                 self.env.cr.execute("""
                     SELECT sum(number_of_days) as number_of_days, sum(number_of_hours) as number_of_hours
                     FROM hr_payslip as hp, hr_payslip_worked_days as pi
@@ -308,12 +424,15 @@ class HrPayslip(models.Model):
             def sum(self, code, from_date, to_date=None):
                 if to_date is None:
                     to_date = fields.Date.today()
-                self.env.cr.execute("""SELECT sum(case when hp.credit_note = False then (pl.total) else (-pl.total) end)
-                            FROM hr_payslip as hp, hr_payslip_line as pl
-                            WHERE hp.employee_id = %s AND hp.state = 'done'
-                            AND hp.date_from >= %s AND hp.date_to <= %s AND hp.id = pl.slip_id AND pl.code = %s""",
-                            (self.employee_id, from_date, to_date, code))
-                res = self.env.cr.fetchone()
+                res = batch_data and batch_data.sum('payslips', self.employee_id, code, from_date, to_date)
+                if res is None:
+                    # total is not stored on the payslip lines
+                    self.env.cr.execute("""SELECT sum(case when hp.credit_note = False then ({total}) else (-{total}) end)
+                                FROM hr_payslip as hp, hr_payslip_line as pl
+                                WHERE hp.employee_id = %s AND hp.state = 'done'
+                                AND hp.date_from >= %s AND hp.date_to <= %s AND hp.id = pl.slip_id AND pl.code = %s""".format(total=LINE_TOTAL),
+                                (self.employee_id, from_date, to_date, code))
+                    res = self.env.cr.fetchone()
                 return res and res[0] or 0.0
 
         #we keep a dict with the result because a value can be overwritten by another rule with the same code
@@ -341,11 +460,15 @@ class HrPayslip(models.Model):
             structure_ids = list(set(payslip.struct_id._get_parent_structure().ids))
         else:
             structure_ids = contracts.get_all_structures()
-        #get the rules of the structure and thier children
-        rule_ids = self.env['hr.payroll.structure'].browse(structure_ids).get_all_rules()
-        #run the rules by sequence
-        sorted_rule_ids = [id for id, sequence in sorted(rule_ids, key=lambda x:x[1])]
-        sorted_rules = self.env['hr.salary.rule'].browse(sorted_rule_ids)
+        sorted_rules = batch_data and batch_data.rules.get(tuple(structure_ids))
+        if sorted_rules is None:
+            #get the rules of the structure and thier children
+            rule_ids = self.env['hr.payroll.structure'].browse(structure_ids).get_all_rules()
+            #run the rules by sequence
+            sorted_rule_ids = [id for id, sequence in sorted(rule_ids, key=lambda x:x[1])]
+            sorted_rules = self.env['hr.salary.rule'].browse(sorted_rule_ids)
+            if batch_data:
+                batch_data.rules[tuple(structure_ids)] = sorted_rules
 
         for contract in contracts:
             employee = contract.employee_id
@@ -605,6 +728,48 @@ class HrPayslipRun(models.Model):
     def draft_payslip_run(self):
         return self.write({'state': 'draft'})
 
+    def compute_sheet(self):
+        """Compute the draft payslips of the batches, by chunks computed in
+        parallel on separate cursors when configured so"""
+        slips = self.slip_ids.filtered(lambda slip: slip.state == 'draft')
+        chunk_size = slips._payslip_chunk_size
+        chunks = [slips[index:index + chunk_size].ids for index in range(0, len(slips), chunk_size)]
+        max_workers = self._get_payslip_max_workers()
+        if max_workers > 1 and len(chunks) > 1:
+            # the workers only see committed payslips
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self._compute_sheet_in_cursor, chunk) for chunk in chunks]
+            failed_slip_ids = [slip_id for future in futures for slip_id in future.result()]
+            # The payslip lines were committed by the workers
+            self.env.invalidate_all()
+            if failed_slip_ids:
+                raise UserError(_(
+                    "The following payslips could not be computed, see the server log for the details. "
+                    "The other payslips of the batch have been computed.\n%s"
+                ) % "\n".join(self.env['hr.payslip'].browse(failed_slip_ids).mapped('name')))
+        else:
+            slips.compute_sheet()
+        return True
+
+    def _get_payslip_max_workers(self):
+        """Number of chunks computed in parallel, set in the payroll settings. The
+        chunks spend most of their time querying contracts, worked days and previous
+        payslips, which separate cursors run side by side"""
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'om_hr_payroll.payslip_compute_workers', 1) or 1)
+
+    def _compute_sheet_in_cursor(self, slip_ids):
+        """Compute payslips on a new cursor, committed on success. Return
+        the payslips not computed."""
+        with self.pool.cursor() as cr:
+            try:
+                self.env['hr.payslip'].with_env(self.env(cr=cr)).browse(slip_ids).compute_sheet()
+            except Exception:
+                _logger.exception('Failed computing the payslips %s', slip_ids)
+                cr.rollback()
+                return slip_ids
+        return []
+
     def close_payslip_run(self):
         return self.write({'state': 'close'})
 
@@ -7,4 +7,8 @@ class ResConfigSettings(models.TransientModel):
     _inherit = 'res.config.settings'
 
     module_om_hr_payroll_account = fields.Boolean(string='Payroll Accounting')
+    payslip_compute_workers = fields.Integer(
+        string='Payslip Computation Workers', default=1,
+        config_parameter='om_hr_payroll.payslip_compute_workers',
+        help='Number of parallel workers computing the payslips of a batch')
 
@@ -0,0 +1,244 @@
+# -*- coding:utf-8 -*-
+
+from datetime import date
+from unittest.mock import patch
+
+from odoo import SUPERUSER_ID, api
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+from odoo.tools import mute_logger
+
+from ..models.hr_payslip import PayslipBatchData
+
+YEAR_SUMS = "payslip.sum('%s', '2024-01-01', '2024-12-31')"
+
+
+class TestPayslipBatch(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        rule_model = cls.env['hr.salary.rule']
+        rules = rule_model.create({
+            'name': 'Basic',
+            'code': 'BASIC',
+            'sequence': 1,
+            'category_id': cls.env.ref('om_hr_payroll.BASIC').id,
+            'amount_select': 'code',
+            'amount_python_compute': 'result = contract.wage',
+        })
+        # Quantity and rate make the total differ from the amount
+        rules += rule_model.create({
+            'name': 'Bonus',
+            'code': 'BONUS',
+            'sequence': 2,
+            'category_id': cls.env.ref('om_hr_payroll.ALW').id,
+            'amount_select': 'percentage',
+            'amount_percentage_base': 'contract.wage',
+            'quantity': '2',
+            'amount_percentage': 10,
+        })
+        rules += rule_model.create({
+            'name': 'Year to date',
+            'code': 'YTD',
+            'sequence': 10,
+            'category_id': cls.env.ref('om_hr_payroll.COMP').id,
+            'amount_select': 'code',
+            'amount_python_compute': (
+                "result = %s + %s"
+                " + inputs.sum('EXTRA', '2024-01-01', '2024-12-31')"
+                " + worked_days.sum('WORK100', '2024-01-01', '2024-12-31')"
+                " + worked_days.sum_hours('WORK100', '2024-01-01', '2024-12-31')"
+            ) % (YEAR_SUMS % 'BASIC', YEAR_SUMS % 'BONUS'),
+        })
+        # Sums before the current year are not prefetched
+        rules += rule_model.create({
+            'name': 'Since last year',
+            'code': 'SINCE',
+            'sequence': 11,
+            'category_id': cls.env.ref('om_hr_payroll.COMP').id,
+            'amount_select': 'code',
+            'amount_python_compute': "result = payslip.sum('BASIC', '2023-01-01', '2024-12-31')",
+        })
+        cls.structure = cls.env['hr.payroll.structure'].create({
+            'name': 'Batch structure',
+            'code': 'BATCH',
+            'parent_id': False,
+            'rule_ids': [(6, 0, rules.ids)],
+        })
+        cls.employees = cls.env['hr.employee'].create([
+            {'name': 'Batch employee %s' % i} for i in range(3)])
+        cls.contracts = cls.env['hr.contract'].create([{
+            'name': 'Batch contract %s' % i,
+            'employee_id': employee.id,
+            'wage': 1000.0 * (i + 1),
+            'date_start': '2024-01-01',
+            'struct_id': cls.structure.id,
+            'state': 'open',
+        } for i, employee in enumerate(cls.employees)])
+        done_slips = cls._create_slips('2024-01-01', '2024-01-31')
+        for i, slip in enumerate(done_slips):
+            slip.input_line_ids = [(0, 0, {
+                'name': 'Extra',
+                'code': 'EXTRA',
+                'amount': 50.0 * (i + 1),
+                'contract_id': slip.contract_id.id,
+            })]
+            slip.worked_days_line_ids = [(0, 0, {
+                'name': 'Worked days',
+                'code': 'WORK100',
+                'number_of_days': 20.0,
+                'number_of_hours': 160.0,
+                'contract_id': slip.contract_id.id,
+            })]
+        done_slips.action_payslip_done()
+        # A refunded payslip of the first employee
+        refunded_slip = cls._create_slips('2024-02-01', '2024-02-29', cls.contracts[0])
+        refunded_slip.action_payslip_done()
+        refunded_slip.refund_sheet()
+        # Two payslips of the first employee in the same batch
+        cls.slips = cls._create_slips('2024-03-01', '2024-03-31')
+        cls.slips += cls._create_slips('2024-03-01', '2024-03-31', cls.contracts[0])
+
+    @classmethod
+    def _create_slips(cls, date_from, date_to, contracts=None):
+        return cls.env['hr.payslip'].create([{
+            'name': 'Payslip of %s' % contract.employee_id.name,
+            'employee_id': contract.employee_id.id,
+            'contract_id': contract.id,
+            'struct_id': cls.structure.id,
+            'date_from': date_from,
+            'date_to': date_to,
+        } for contract in contracts or cls.contracts])
+
+    def _get_lines(self):
+        return [
+            (line.slip_id.id, line.code, line.quantity, line.rate, line.amount, line.total)
+            for line in self.slips.line_ids.sorted(lambda line: (line.slip_id.id, line.sequence))
+        ]
+
+    def _compute_slips_alone(self):
+        for slip in self.slips:
+            slip.compute_sheet()
+        return self._get_lines()
+
+    def test_batch_data(self):
+        employee = self.employees[0]
+        batch_data = PayslipBatchData(self.env, self.employees.ids, date(2024, 1, 1))
+        # The refund cancels the payslip of February
+        self.assertEqual(
+            batch_data.sum('payslips', employee.id, 'BASIC', '2024-01-01', '2024-12-31'), (1000.0,))
+        # Totals are quantity * amount * rate / 100
+        self.assertEqual(
+            batch_data.sum('payslips', employee.id, 'BONUS', '2024-01-01', '2024-12-31'), (200.0,))
+        self.assertEqual(
+            batch_data.sum('payslips', employee.id, 'BASIC', date(2024, 2, 1), date(2024, 2, 29)), (0.0,))
+        self.assertEqual(
+            batch_data.sum('inputs', employee.id, 'EXTRA', '2024-01-01', '2024-12-31'), (50.0,))
+        self.assertEqual(
+            batch_data.sum('worked_days', employee.id, 'WORK100', '2024-01-01', '2024-12-31'), (20.0, 160.0))
+        self.assertEqual(
+            batch_data.sum('inputs', employee.id, 'UNKNOWN', '2024-01-01', '2024-12-31'), (None,))
+        # Not prefetched
+        self.assertIsNone(batch_data.sum('payslips', employee.id, 'BASIC', '2023-01-01', '2024-12-31'))
+        self.assertIsNone(batch_data.sum('payslips', 0, 'BASIC', '2024-01-01', '2024-12-31'))
+
+    def test_compute_sheet_batch(self):
+        expected_lines = self._compute_slips_alone()
+        ytd_line = self.slips[0].line_ids.filtered(lambda line: line.code == 'YTD')
+        self.assertEqual(ytd_line.amount, 1000.0 + 200.0 + 50.0 + 20.0 + 160.0)
+        self.slips.line_ids.unlink()
+        with patch.object(PayslipBatchData, 'sum', autospec=True, side_effect=PayslipBatchData.sum) as batch_sum:
+            self.slips.compute_sheet()
+        self.assertTrue(batch_sum.called)
+        self.assertEqual(self._get_lines(), expected_lines)
+        # Chunks of 3 and 1 payslips, the last one computed alone
+        self.slips.line_ids.unlink()
+        with patch.object(type(self.env['hr.payslip']), '_payslip_chunk_size', 3):
+            self.slips.compute_sheet()
+        self.assertEqual(self._get_lines(), expected_lines)
+
+    def test_compute_sheet_run(self):
+        expected_lines = self._compute_slips_alone()
+        run = self.env['hr.payslip.run'].create({
+            'name': 'Batch run',
+            'date_start': '2024-03-01',
+            'date_end': '2024-03-31',
+            'slip_ids': [(6, 0, self.slips.ids)],
+        })
+        self.slips.line_ids.unlink()
+        with patch.object(type(self.env['hr.payslip']), '_payslip_chunk_size', 2):
+            run.compute_sheet()
+        self.assertEqual(self._get_lines(), expected_lines)
+
+    def _unlink_committed(self, run_id):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            run = env['hr.payslip.run'].browse(run_id)
+            slips = run.slip_ids
+            contracts = slips.contract_id
+            employees = contracts.employee_id
+            structure = contracts.struct_id
+            rules = structure.rule_ids
+            slips.unlink()
+            run.unlink()
+            contracts.unlink()
+            employees.unlink()
+            structure.unlink()
+            rules.unlink()
+
+    def test_compute_sheet_run_in_cursors(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            # The rule fails for the contract with a wage of 2000
+            rule = env['hr.salary.rule'].create({
+                'name': 'Committed',
+                'code': 'COMMITTED',
+                'category_id': env.ref('om_hr_payroll.BASIC').id,
+                'amount_select': 'code',
+                'amount_python_compute': 'result = contract.wage * 1000 / (contract.wage - 2000)',
+            })
+            structure = env['hr.payroll.structure'].create({
+                'name': 'Committed structure',
+                'code': 'COMMITTED',
+                'parent_id': False,
+                'rule_ids': [(6, 0, rule.ids)],
+            })
+            employees = env['hr.employee'].create([
+                {'name': 'Committed employee %s' % i} for i in range(3)])
+            contracts = env['hr.contract'].create([{
+                'name': 'Committed contract %s' % i,
+                'employee_id': employee.id,
+                'wage': 1000.0 * (i + 1),
+                'date_start': '2024-01-01',
+                'struct_id': structure.id,
+                'state': 'open',
+            } for i, employee in enumerate(employees)])
+            slips = env['hr.payslip'].create([{
+                'name': 'Committed payslip %s' % i,
+                'employee_id': contract.employee_id.id,
+                'contract_id': contract.id,
+                'struct_id': structure.id,
+                'date_from': '2024-03-01',
+                'date_to': '2024-03-31',
+            } for i, contract in enumerate(contracts)])
+            run = env['hr.payslip.run'].create({
+                'name': 'Committed run',
+                'date_start': '2024-03-01',
+                'date_end': '2024-03-31',
+                'slip_ids': [(6, 0, slips.ids)],
+            })
+            self.addCleanup(self._unlink_committed, run.id)
+            cr.commit()
+            self.assertFalse(slips.line_ids)
+            run_model = type(env['hr.payslip.run'])
+            with patch.object(type(env['hr.payslip']), '_payslip_chunk_size', 1), \
+                    patch.object(run_model, '_get_payslip_max_workers', return_value=2), \
+                    mute_logger('odoo.addons.om_hr_payroll.models.hr_payslip'), \
+                    self.assertRaisesRegex(UserError, 'Committed payslip 1'):
+                run.compute_sheet()
+            # Read the payslips committed by the workers in a new transaction
+            cr.commit()
+            self.assertEqual(slips[0].line_ids.total, -1000.0)
+            self.assertFalse(slips[1].line_ids)
+            self.assertEqual(slips[2].line_ids.total, 3000.0)
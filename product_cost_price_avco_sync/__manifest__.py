@@ -5,7 +5,7 @@
 {
     "name": "Product cost price avco sync",
     "summary": "Set product cost price from updated moves",
-    "version": "17.0.1.0.0",
+    "version": "17.0.1.1.0",
     "development_status": "Production/Stable",
     "category": "Stock",
     "website": "https://github.com/OCA/stock-logistics-workflow",
@@ -14,4 +14,5 @@
     "license": "AGPL-3",
     "installable": True,
     "depends": ["stock_account"],
+    "data": ["security/ir.model.access.csv"],
 }
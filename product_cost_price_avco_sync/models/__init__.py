@@ -1,5 +1,7 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 from . import product_product
+from . import stock_move
 from . import stock_move_line
 from . import stock_picking
 from . import stock_valuation_layer
+from . import stock_valuation_layer_avco_checkpoint
@@ -0,0 +1,24 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+# Fields of the stock moves the AVCO running state of their layers depends on
+AVCO_SYNC_MOVE_FIELDS = {
+    "location_id",
+    "location_dest_id",
+    "picking_id",
+    "scrapped",
+    "move_orig_ids",
+}
+
+
+class StockMove(models.Model):
+    _inherit = "stock.move"
+
+    def write(self, vals):
+        if AVCO_SYNC_MOVE_FIELDS & set(vals):
+            # Only done moves have valuation layers
+            self.filtered(
+                lambda move: move.state == "done"
+            ).stock_valuation_layer_ids._invalidate_avco_checkpoints()
+        return super().write(vals)
@@ -7,16 +7,36 @@ from collections import OrderedDict, defaultdict
 
 from odoo import _, api, exceptions, models
 from odoo.exceptions import ValidationError
+from odoo.osv import expression
 from odoo.tools import float_compare, float_is_zero, float_round, groupby
 
+# Fields of the layers the AVCO running state depends on
+AVCO_SYNC_FIELDS = {
+    "quantity",
+    "unit_cost",
+    "value",
+    "description",
+    "stock_move_id",
+    "stock_valuation_layer_id",
+}
+
 
 class StockValuationLayer(models.Model):
     """Stock Valuation Layer"""
 
     _inherit = "stock.valuation.layer"
 
+    # The running AVCO state is stored every this number of layers of a product
+    _avco_checkpoint_interval = 1000
+    # Number of layers read at once when replaying the AVCO
+    _avco_sync_batch_size = 1000
+
     def write(self, vals):
         """Update cost price avco"""
+        if AVCO_SYNC_FIELDS & set(vals) and not self.env.context.get(
+            "avco_checkpoints_invalidated"
+        ):
+            self._invalidate_avco_checkpoints()
         svl_previous_vals = defaultdict(dict)
         if ("unit_cost" in vals or "quantity" in vals) and not self.env.context.get(
             "skip_avco_sync"
@@ -39,23 +59,109 @@ class StockValuationLayer(models.Model):
                 elems[0]._cost_price_avco_sync(svl_previous_vals[elems[0]])
         return res
 
-    def _get_next_svl_to_sync_avco(self):
+    def unlink(self):
+        self._invalidate_avco_checkpoints()
+        return super().unlink()
+
+    def _get_avco_sync_domain(self, operator, date_field="create_date", id_field="id"):
+        """Return the domain of the records of the same product and company
+        before (``<``) or after (``>``, ``>=``) self in the AVCO sync order."""
         self.ensure_one()
-        domain = [
+        return [
             ("company_id", "=", self.company_id.id),
             ("product_id", "=", self.product_id.id),
             "|",
             "&",
-            ("create_date", "=", self.create_date),
-            ("id", ">", self.id),
-            ("create_date", ">", self.create_date),
+            (date_field, "=", self.create_date),
+            (id_field, operator, self.id),
+            (date_field, operator[0], self.create_date),
         ]
+
+    def _get_next_svls_to_sync_avco(self, limit=None):
+        self.ensure_one()
         return (
             self.env["stock.valuation.layer"]
             .sudo()
-            .search(domain, order="create_date, id", limit=1)
+            .search(
+                self._get_avco_sync_domain(">"), order="create_date, id", limit=limit
+            )
         )
 
+    def _get_next_svl_to_sync_avco(self):
+        return self._get_next_svls_to_sync_avco(limit=1)
+
+    def _pop_next_svl_to_sync_avco(self, svl_dic):
+        """Return the layer following self, the following layers being read by
+        batches kept in the sync structure."""
+        self.ensure_one()
+        next_svl = next(svl_dic["next_svls"], None)
+        if next_svl is None:
+            svl_dic["next_svls"] = iter(
+                self._get_next_svls_to_sync_avco(limit=self._avco_sync_batch_size)
+            )
+            next_svl = next(svl_dic["next_svls"], self.browse())
+        return next_svl
+
+    def _is_avco_checkpoint_enabled(self):
+        """Method to be overrided in extension modules for products whose AVCO
+        depends on the layers of other products, that checkpoints can't follow.
+
+        Disabled with the ``keep_avco_inventory`` context, under which the
+        replay processes the inventory layers differently: the stored
+        ``inventory_processed`` flags don't apply.
+        """
+        return self._avco_checkpoint_interval > 0 and not self.env.context.get(
+            "keep_avco_inventory"
+        )
+
+    def _get_avco_checkpoint(self):
+        """Return the nearest checkpoint before self."""
+        self.ensure_one()
+        if not self._is_avco_checkpoint_enabled():
+            return self.env["stock.valuation.layer.avco.checkpoint"]
+        return (
+            self.env["stock.valuation.layer.avco.checkpoint"]
+            .sudo()
+            .search(
+                self._get_avco_sync_domain("<", "svl_create_date", "svl_id"), limit=1
+            )
+        )
+
+    def _get_avco_checkpoint_vals(self, svl_dic):
+        """Return the values of the checkpoint of the running state after self,
+        if one has to be stored there."""
+        self.ensure_one()
+        if (
+            not self._is_avco_checkpoint_enabled()
+            or svl_dic["processed_count"] % self._avco_checkpoint_interval
+        ):
+            return {}
+        return {
+            "product_id": self.product_id.id,
+            "company_id": self.company_id.id,
+            "svl_id": self.id,
+            "svl_create_date": self.create_date,
+            "previous_unit_cost": svl_dic["previous_unit_cost"],
+            "previous_qty": svl_dic["previous_qty"],
+            "inventory_processed": svl_dic["inventory_processed"],
+            "unit_cost_processed": svl_dic["unit_cost_processed"],
+            "processed_count": svl_dic["processed_count"],
+        }
+
+    def _invalidate_avco_checkpoints(self):
+        """Remove the checkpoints from the first layer of self of each product
+        and company, as the running state after it may change."""
+        domains = []
+        svls = self.filtered("create_date").sorted(lambda x: (x.create_date, x.id))
+        for _group, elems in groupby(svls, lambda x: (x.product_id, x.company_id)):
+            domains.append(
+                elems[0]._get_avco_sync_domain(">=", "svl_create_date", "svl_id")
+            )
+        if domains:
+            self.env["stock.valuation.layer.avco.checkpoint"].sudo().search(
+                expression.OR(domains)
+            ).unlink()
+
     def _is_avco_sync_processable(self, svls_dic):
         """Method to be overrided in extension modules for blocking the sync in
         specific cases (like manufactured or component products) where we don't still
@@ -151,7 +257,10 @@ class StockValuationLayer(models.Model):
 
     @api.model
     def _flush_all_avco_sync(self, svls_dic, skip_avco_sync=True):
-        """Check if there's something to write and write it in the DB."""
+        """Check if there's something to write and write it in the DB, the
+        layers with the same new values being written together. The caller
+        replaces the checkpoints of the synced layers."""
+        svl_ids_by_vals = defaultdict(list)
         for svl, svl_dic in svls_dic.items():
             vals = {}
             for field_name, new_value in svl_dic.items():
@@ -173,24 +282,21 @@ class StockValuationLayer(models.Model):
                         svl[field_name], new_value, precision_digits=prec_digits
                     ):
                         vals[field_name] = new_value
-            # Write modified fields
             if vals:
-                svl.with_context(skip_avco_sync=skip_avco_sync).write(vals)
+                svl_ids_by_vals[tuple(sorted(vals.items()))].append(svl.id)
+        if not svl_ids_by_vals:
+            return
+        # Write modified fields
+        svls = self.env["stock.valuation.layer"].sudo().with_context(
+            skip_avco_sync=skip_avco_sync, avco_checkpoints_invalidated=True
+        )
+        for vals, svl_ids in svl_ids_by_vals.items():
+            svls.browse(svl_ids).write(dict(vals))
 
     def _get_previous_svl_info(self):
+        """Replay in dry mode the layers before self, from the nearest
+        checkpoint, storing new checkpoints on the way."""
         self.ensure_one()
-        previous_svls = self.env["stock.valuation.layer"].search(
-            [
-                ("product_id", "=", self.product_id.id),
-                ("company_id", "=", self.company_id.id),
-                "|",
-                "&",
-                ("create_date", "=", self.create_date),
-                ("id", "<", self.id),
-                ("create_date", "<", self.create_date),
-            ],
-            order="create_date, id",
-        )
         key = (self.product_id, self.company_id)
         svls_dic = OrderedDict()
         svls_dic[key] = {
@@ -199,15 +305,39 @@ class StockValuationLayer(models.Model):
             "previous_qty": 0,
             "inventory_processed": 0,
             "unit_cost_processed": 0,
+            "processed_count": 0,
             "qty_diff": 0,
         }
-        for svl in previous_svls:
-            svl._process_avco_sync_one(svls_dic, dry=True)
+        checkpoint = self._get_avco_checkpoint()
+        last_svl = checkpoint.svl_id
+        if checkpoint:
+            svls_dic[key].update(checkpoint._get_avco_sync_state())
+        checkpoint_vals_list = []
+        while True:
+            domain = self._get_avco_sync_domain("<")
+            if last_svl:
+                domain = expression.AND([domain, last_svl._get_avco_sync_domain(">")])
+            previous_svls = self.env["stock.valuation.layer"].search(
+                domain, order="create_date, id", limit=self._avco_sync_batch_size
+            )
+            for svl in previous_svls:
+                svl._process_avco_sync_one(svls_dic, dry=True)
+                svls_dic[key]["processed_count"] += 1
+                checkpoint_vals = svl._get_avco_checkpoint_vals(svls_dic[key])
+                if checkpoint_vals:
+                    checkpoint_vals_list.append(checkpoint_vals)
+            if len(previous_svls) < self._avco_sync_batch_size:
+                break
+            last_svl = previous_svls[-1]
+        self.env["stock.valuation.layer.avco.checkpoint"].sudo().create(
+            checkpoint_vals_list
+        )
         return (
             svls_dic[key]["previous_unit_cost"],
             svls_dic[key]["previous_qty"],
             svls_dic[key]["inventory_processed"],
             svls_dic[key]["unit_cost_processed"],
+            svls_dic[key]["processed_count"],
         )
 
     def _initialize_avco_sync_struct(self, svl_prev_vals):
@@ -218,11 +348,14 @@ class StockValuationLayer(models.Model):
         prev_vals = self._get_previous_svl_info()
         return {
             "to_sync": self,
+            "next_svls": iter(()),
             "svls": OrderedDict(),
             "previous_unit_cost": prev_vals[0],
             "previous_qty": prev_vals[1],
             "inventory_processed": prev_vals[2],
             "unit_cost_processed": prev_vals[3],
+            "processed_count": prev_vals[4],
+            "checkpoints": [],
             "qty_diff": self.quantity - svl_prev_vals.get("quantity", self.quantity),
         }
 
@@ -272,7 +405,11 @@ class StockValuationLayer(models.Model):
                     reloop = True
                     break
                 svl._process_avco_sync_one(svls_dic)
-                svl_dic["to_sync"] = svl._get_next_svl_to_sync_avco()
+                svl_dic["processed_count"] += 1
+                checkpoint_vals = svl._get_avco_checkpoint_vals(svl_dic)
+                if checkpoint_vals:
+                    svl_dic["checkpoints"].append(checkpoint_vals)
+                svl_dic["to_sync"] = svl._pop_next_svl_to_sync_avco(svl_dic)
                 any_processed = True
             index += 1
             if index >= len(svls_dic) and reloop:
@@ -303,6 +440,12 @@ class StockValuationLayer(models.Model):
                 )
             # Write changes in db
             self._flush_all_avco_sync(svl_dic["svls"])
+            # Replace the checkpoints of the synced layers
+            if svl_dic["svls"]:
+                next(iter(svl_dic["svls"]))._invalidate_avco_checkpoints()
+                self.env["stock.valuation.layer.avco.checkpoint"].sudo().create(
+                    svl_dic["checkpoints"]
+                )
         # Update unit_cost for incoming stock moves
         if (
             self.stock_move_id
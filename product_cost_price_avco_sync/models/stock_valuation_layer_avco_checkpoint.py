@@ -0,0 +1,52 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import fields, models
+from odoo.tools.sql import create_index
+
+
+class StockValuationLayerAvcoCheckpoint(models.Model):
+    """Running AVCO state of a product and company after a given layer, the
+    replay of the previous layers starting from the nearest checkpoint."""
+
+    _name = "stock.valuation.layer.avco.checkpoint"
+    _description = "Stock Valuation Layer AVCO Checkpoint"
+    _order = "svl_create_date desc, svl_id desc"
+
+    product_id = fields.Many2one(
+        comodel_name="product.product", required=True, ondelete="cascade"
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company", required=True, ondelete="cascade"
+    )
+    svl_id = fields.Many2one(
+        comodel_name="stock.valuation.layer",
+        string="Last Processed Layer",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    svl_create_date = fields.Datetime(required=True)
+    previous_unit_cost = fields.Float()
+    previous_qty = fields.Float()
+    inventory_processed = fields.Boolean()
+    unit_cost_processed = fields.Boolean()
+    processed_count = fields.Integer(help="Number of layers processed up to here")
+
+    def init(self):
+        create_index(
+            self._cr,
+            "stock_valuation_layer_avco_checkpoint_position_index",
+            self._table,
+            ["product_id", "company_id", "svl_create_date DESC", "svl_id DESC"],
+        )
+
+    def _get_avco_sync_state(self):
+        """Return the running values of the AVCO sync structure."""
+        self.ensure_one()
+        return {
+            "previous_unit_cost": self.previous_unit_cost,
+            "previous_qty": self.previous_qty,
+            "inventory_processed": self.inventory_processed,
+            "unit_cost_processed": self.unit_cost_processed,
+            "processed_count": self.processed_count,
+        }
@@ -3,6 +3,7 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 import logging
 from time import sleep
+from unittest.mock import patch
 
 from odoo.tests.common import tagged
 
@@ -491,6 +492,94 @@ class TestProductCostPriceAvcoSync(BaseCommon):
             )
         )
 
+    def test_avco_checkpoints(self):
+        svl_model = self.env["stock.valuation.layer"]
+        checkpoint_model = self.env["stock.valuation.layer.avco.checkpoint"]
+        with patch.object(
+            type(svl_model), "_avco_checkpoint_interval", 2
+        ), patch.object(type(svl_model), "_avco_sync_batch_size", 3):
+            picking_in_01, move_in_01 = self.create_picking("IN", 10)
+            picking_in_02, move_in_02 = self.create_picking("IN", 10)
+            picking_out_01, move_out_01 = self.create_picking("OUT", 5)
+            picking_in_03, move_in_03 = self.create_picking("IN", 10)
+            picking_out_02, move_out_02 = self.create_picking("OUT", 5)
+            move_in_01.stock_valuation_layer_ids.unit_cost = 2.0
+            self.assertAlmostEqual(move_out_02.stock_valuation_layer_ids.value, -6.5)
+            self.assertAlmostEqual(self.product.standard_price, 1.3, 2)
+            checkpoints = checkpoint_model.search(
+                [("product_id", "=", self.product.id)]
+            )
+            self.assertEqual(checkpoints.mapped("processed_count"), [4, 2])
+            self.assertEqual(
+                checkpoints.svl_id,
+                move_in_02.stock_valuation_layer_ids
+                | move_in_03.stock_valuation_layer_ids,
+            )
+            self.assertAlmostEqual(checkpoints[1].previous_unit_cost, 1.5)
+            self.assertAlmostEqual(checkpoints[1].previous_qty, 20)
+            # The replay starts from the checkpoint before the changed layer
+            move_in_03.stock_valuation_layer_ids.unit_cost = 4.0
+            self.assertTrue(checkpoints[1].exists())
+            self.assertFalse(checkpoints[0].exists())
+            self.assertAlmostEqual(move_out_02.stock_valuation_layer_ids.value, -12.5)
+            self.assertAlmostEqual(self.product.standard_price, 2.5, 2)
+            checkpoint = checkpoint_model.search(
+                [("product_id", "=", self.product.id)], limit=1
+            )
+            self.assertEqual(checkpoint.processed_count, 4)
+            self.assertAlmostEqual(checkpoint.previous_unit_cost, 2.5)
+            # Deleting a layer drops the checkpoints from it
+            move_out_01.stock_valuation_layer_ids.unlink()
+            checkpoints = checkpoint_model.search(
+                [("product_id", "=", self.product.id)]
+            )
+            self.assertEqual(checkpoints.svl_id, move_in_02.stock_valuation_layer_ids)
+
+    def _apply_inventory(self, quantity):
+        quant = (
+            self.env["stock.quant"]
+            .with_context(inventory_mode=True)
+            .search(
+                [
+                    ("location_id", "=", self.stock_location.id),
+                    ("product_id", "=", self.product.id),
+                ]
+            )
+        )
+        quant.inventory_quantity = quantity
+        quant.action_apply_inventory()
+
+    def _run_keep_avco_inventory(self, checkpoint_interval):
+        """Change a quantity keeping the inventories, after a sync without the
+        context, and return the resulting layers."""
+        svl_model = self.env["stock.valuation.layer"]
+        with patch.object(
+            type(svl_model), "_avco_checkpoint_interval", checkpoint_interval
+        ):
+            picking_in_01, move_in_01 = self.create_picking("IN", 10)
+            self._apply_inventory(15)
+            picking_in_02, move_in_02 = self.create_picking("IN", 10)
+            self._apply_inventory(30)
+            # Stores checkpoints after the first inventory
+            move_in_01.stock_valuation_layer_ids.unit_cost = 2.0
+            move_in_02.with_context(
+                keep_avco_inventory=True
+            ).move_line_ids.quantity = 5.0
+        svls = svl_model.search(
+            [("product_id", "=", self.product.id)], order="create_date, id"
+        )
+        return [
+            (svl.quantity, svl.unit_cost, svl.value, svl.stock_move_id.quantity)
+            for svl in svls
+        ]
+
+    def test_avco_checkpoints_keep_avco_inventory(self):
+        product_copy = self.product.copy()
+        without_checkpoints = self._run_keep_avco_inventory(0)
+        self.product = product_copy
+        with_checkpoints = self._run_keep_avco_inventory(1)
+        self.assertEqual(with_checkpoints, without_checkpoints)
+
     def print_svl(self, char_info=""):
         msg_list = [f"{char_info}"]
         total_qty = total_value = 0.0
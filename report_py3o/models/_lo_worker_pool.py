@@ -0,0 +1,284 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl)
+"""Pool of long-lived headless LibreOffice processes.
+
+Starting LibreOffice is by far the most expensive part of a conversion with
+``--convert-to``. The workers of this pool are started once, listen on a
+named pipe and convert documents through UNO, each worker handling one
+document at a time. A worker is restarted when its process died, when a
+conversion failed or timed out, and after a given number of conversions to
+bound its memory usage.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    from com.sun.star.connection import NoConnectException
+except ImportError:
+    uno = None
+    logger.debug("Cannot import uno")
+
+# Export filters by document service and target format
+EXPORT_FILTERS = {
+    "com.sun.star.text.TextDocument": {
+        "doc": "MS Word 97",
+        "docbook": "DocBook File",
+        "docx": "MS Word 2007 XML",
+        "html": "HTML (StarWriter)",
+        "odt": "writer8",
+        "pdf": "writer_pdf_Export",
+    },
+    "com.sun.star.sheet.SpreadsheetDocument": {
+        "html": "HTML (StarCalc)",
+        "ods": "calc8",
+        "pdf": "calc_pdf_Export",
+        "xls": "MS Excel 97",
+        "xlsx": "Calc MS Excel 2007 XML",
+    },
+}
+
+START_TIMEOUT = 60
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _properties(**values):
+    properties = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        properties.append(prop)
+    return tuple(properties)
+
+
+class LibreOfficeWorker:
+    """A headless LibreOffice process converting documents through UNO."""
+
+    def __init__(self, lo_bin):
+        self.lo_bin = lo_bin
+        self.jobs = 0
+        self.process = None
+        self.desktop = None
+        self.user_installation = None
+
+    def start(self):
+        self.user_installation = tempfile.mkdtemp(prefix="py3o-lo-worker-")
+        pipe_name = "py3o_%s" % uuid.uuid4().hex
+        self.process = subprocess.Popen(
+            [
+                self.lo_bin,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--nolockcheck",
+                "--norestore",
+                "--accept=pipe,name=%s;urp;StarOffice.ComponentContext" % pipe_name,
+                "-env:UserInstallation=file://%s" % self.user_installation,
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            # ``soffice`` is a launcher script, kill the whole process group
+            start_new_session=True,
+        )
+        try:
+            self.desktop = self._connect(pipe_name)
+        except Exception:
+            self.stop()
+            raise
+        logger.debug("LibreOffice worker %s started", self.process.pid)
+
+    def _connect(self, pipe_name):
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + START_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(
+                    "uno:pipe,name=%s;urp;StarOffice.ComponentContext" % pipe_name
+                )
+                break
+            except NoConnectException:
+                if self.process.poll() is not None:
+                    raise RuntimeError(
+                        "LibreOffice exited with code %s" % self.process.returncode
+                    ) from None
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        return context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            logger.debug("LibreOffice worker already stopped", exc_info=True)
+
+    def stop(self):
+        if self.is_alive():
+            try:
+                self.desktop.terminate()
+            except Exception:
+                logger.debug("Cannot terminate LibreOffice", exc_info=True)
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                logger.warning("LibreOffice worker %s not stopping", self.process.pid)
+        if self.process is not None:
+            # Also stop the office process left by the launcher, if any
+            self.kill()
+            self.process.wait()
+        if self.user_installation:
+            shutil.rmtree(self.user_installation, ignore_errors=True)
+        self.process = self.desktop = self.user_installation = None
+
+    def convert(self, path, filetype, timeout=None):
+        """Convert the document at ``path`` to ``filetype``, next to it.
+
+        The worker is killed if the conversion lasts more than ``timeout``
+        seconds, which makes the conversion fail.
+        """
+        watchdog = None
+        if timeout:
+            watchdog = threading.Timer(timeout, self.kill)
+            watchdog.start()
+        try:
+            document = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(path), "_blank", 0, _properties(Hidden=True)
+            )
+            if document is None:
+                raise RuntimeError("LibreOffice cannot load %s" % path)
+            try:
+                result_path = "{}.{}".format(os.path.splitext(path)[0], filetype)
+                document.storeToURL(
+                    uno.systemPathToFileUrl(result_path),
+                    _properties(
+                        FilterName=self._get_filter(document, filetype),
+                        Overwrite=True,
+                    ),
+                )
+            finally:
+                document.close(True)
+        finally:
+            if watchdog:
+                watchdog.cancel()
+        self.jobs += 1
+        return result_path
+
+    def _get_filter(self, document, filetype):
+        for service, filters in EXPORT_FILTERS.items():
+            if document.supportsService(service):
+                if filetype in filters:
+                    return filters[filetype]
+                break
+        raise ValueError("No LibreOffice export filter for %s" % filetype)
+
+
+class LibreOfficeWorkerPool:
+    """Up to ``size`` LibreOffice workers, each started on first use and
+    restarted after ``max_jobs`` conversions."""
+
+    def __init__(self, lo_bin, size, max_jobs=0, timeout=None):
+        self.lo_bin = lo_bin
+        self.size = size
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._workers = set()
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = None
+        if worker is not None and not worker.is_alive():
+            logger.warning("LibreOffice worker died, restarting it")
+            self._discard(worker)
+            worker = None
+        if worker is None:
+            worker = LibreOfficeWorker(self.lo_bin)
+            try:
+                worker.start()
+            except Exception:
+                self._slots.release()
+                raise
+            with self._lock:
+                self._workers.add(worker)
+        return worker
+
+    def _release(self, worker, failed=False):
+        if failed or (self.max_jobs and worker.jobs >= self.max_jobs):
+            self._discard(worker)
+        else:
+            self._idle.put(worker)
+        self._slots.release()
+
+    def _discard(self, worker):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop()
+
+    def convert(self, path, filetype):
+        """Convert the document at ``path`` to ``filetype`` with the first
+        available worker and return the path of the converted document."""
+        worker = self._acquire()
+        failed = True
+        try:
+            result_path = worker.convert(path, filetype, timeout=self.timeout)
+            failed = False
+        finally:
+            self._release(worker, failed=failed)
+        return result_path
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+
+def get_pool(lo_bin, size, max_jobs=0, timeout=None):
+    """Return the pool of the current process for the given settings."""
+    # Workers are never shared with forked processes
+    key = (os.getpid(), lo_bin, size, max_jobs, timeout)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = LibreOfficeWorkerPool(lo_bin, size, max_jobs, timeout)
+        return pool
+
+
+@atexit.register
+def close_pools():
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if key[0] == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
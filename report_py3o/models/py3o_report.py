@@ -9,6 +9,7 @@ import sys
 import tempfile
 import warnings
 from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
 from importlib.resources import files
 from io import BytesIO
@@ -18,6 +19,7 @@ from odoo import _, api, fields, models, tools
 from odoo.exceptions import AccessError
 from odoo.tools.safe_eval import safe_eval, time
 
+from . import _lo_worker_pool
 from ._py3o_parser_context import Py3oParserContext
 
 logger = logging.getLogger(__name__)
@@ -252,31 +254,84 @@ class Py3oReport(models.TransientModel):
         return self._postprocess_report(model_instance, result_path)
 
     def _convert_single_report(self, result_path, model_instance, data):
-        """Run a command to convert to our target format"""
+        """Convert to our target format, with the LibreOffice workers if
+        available, by running a command otherwise"""
         if not self.ir_actions_report_id.is_py3o_native_format:
-            with tempfile.TemporaryDirectory() as tmp_user_installation:
-                command = self._convert_single_report_cmd(
-                    result_path,
-                    model_instance,
-                    data,
-                    user_installation=tmp_user_installation,
-                )
-                logger.debug("Running command %s", command)
-                output = subprocess.check_output(
-                    command, cwd=os.path.dirname(result_path)
-                )
-                logger.debug("Output was %s", output)
-                self._cleanup_tempfiles([result_path])
-                result_path, result_filename = os.path.split(result_path)
-                result_path = os.path.join(
-                    result_path,
-                    "{}.{}".format(
-                        os.path.splitext(result_filename)[0],
-                        self.ir_actions_report_id.py3o_filetype,
-                    ),
-                )
+            pool = self._get_lo_worker_pool()
+            converted_path = pool and self._convert_single_report_worker(
+                pool, result_path, self.ir_actions_report_id.py3o_filetype
+            )
+            if converted_path:
+                return converted_path
+            return self._convert_single_report_subprocess(
+                result_path, model_instance, data
+            )
         return result_path
 
+    @api.model
+    def _convert_single_report_worker(self, pool, result_path, filetype):
+        """Convert to ``filetype`` with the LibreOffice workers of ``pool``.
+
+        Does not touch the database, so that reports can be converted
+        concurrently. Return False if the conversion failed.
+        """
+        try:
+            converted_path = pool.convert(result_path, filetype)
+        except Exception:
+            logger.warning(
+                "Conversion of %s by the LibreOffice workers failed, "
+                "falling back to the conversion command",
+                result_path,
+                exc_info=True,
+            )
+            return False
+        self._cleanup_tempfiles([result_path])
+        return converted_path
+
+    def _convert_single_report_subprocess(self, result_path, model_instance, data):
+        """Run a command to convert to our target format"""
+        with tempfile.TemporaryDirectory() as tmp_user_installation:
+            command = self._convert_single_report_cmd(
+                result_path,
+                model_instance,
+                data,
+                user_installation=tmp_user_installation,
+            )
+            logger.debug("Running command %s", command)
+            output = subprocess.check_output(command, cwd=os.path.dirname(result_path))
+            logger.debug("Output was %s", output)
+            self._cleanup_tempfiles([result_path])
+            result_path, result_filename = os.path.split(result_path)
+            result_path = os.path.join(
+                result_path,
+                "{}.{}".format(
+                    os.path.splitext(result_filename)[0],
+                    self.ir_actions_report_id.py3o_filetype,
+                ),
+            )
+        return result_path
+
+    @api.model
+    def _get_lo_worker_pool(self):
+        """Return the pool of LibreOffice workers of this process, or None
+        if it is disabled or UNO is not available."""
+        size = int(tools.config.get_misc("report_py3o", "conversion_workers", 0))
+        if size <= 0 or _lo_worker_pool.uno is None:
+            return None
+        lo_bin = self.env["ir.actions.report"]._get_lo_bin()
+        if not lo_bin:
+            return None
+        return _lo_worker_pool.get_pool(
+            lo_bin,
+            size,
+            max_jobs=int(
+                tools.config.get_misc("report_py3o", "conversion_worker_max_jobs", 200)
+            ),
+            timeout=int(
+                tools.config.get_misc("report_py3o", "conversion_timeout", 300)
+            ),
+        )
+
     def _convert_single_report_cmd(
         self, result_path, model_instance, data, user_installation=None
     ):
@@ -316,6 +371,49 @@ class Py3oReport(models.TransientModel):
             return report_file
         return self._create_single_report(model_instance, data)
 
+    def _create_reports_concurrently(
+        self, model_instances, data, existing_reports_attachment, pool
+    ):
+        """Render the reports one by one, then convert them concurrently with
+        the LibreOffice workers"""
+        self.ensure_one()
+        reports_path = {}
+        rendered_paths = {}
+        for model_instance in model_instances:
+            attachment = existing_reports_attachment.get(model_instance.id)
+            if attachment and self.ir_actions_report_id.attachment_use:
+                reports_path[model_instance] = self._get_or_create_single_report(
+                    model_instance, data, existing_reports_attachment
+                )
+            else:
+                reports_path[model_instance] = rendered_paths[model_instance] = (
+                    self.with_context(
+                        report_py3o_skip_conversion=True
+                    )._create_single_report(model_instance, data)
+                )
+        filetype = self.ir_actions_report_id.py3o_filetype
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            converted_paths = dict(
+                zip(
+                    rendered_paths,
+                    executor.map(
+                        lambda path: self._convert_single_report_worker(
+                            pool, path, filetype
+                        ),
+                        rendered_paths.values(),
+                    ),
+                )
+            )
+        for model_instance, result_path in converted_paths.items():
+            if not result_path:
+                result_path = self._convert_single_report_subprocess(
+                    rendered_paths[model_instance], model_instance, data
+                )
+            reports_path[model_instance] = self._postprocess_report(
+                model_instance, result_path
+            )
+        return reports_path
+
     def _zip_results(self, reports_path):
         self.ensure_one()
         fd, result_path = tempfile.mkstemp(suffix="zip", prefix="py3o-zip-result")
@@ -380,10 +478,18 @@ class Py3oReport(models.TransientModel):
             existing_reports_attachment = self.ir_actions_report_id._get_attachments(
                 res_ids
             )
-            for model_instance in model_instances:
-                reports_path[model_instance] = self._get_or_create_single_report(
-                    model_instance, data, existing_reports_attachment
+            pool = None
+            if len(model_instances) > 1:
+                pool = self._get_lo_worker_pool()
+            if pool and not self.ir_actions_report_id.is_py3o_native_format:
+                reports_path = self._create_reports_concurrently(
+                    model_instances, data, existing_reports_attachment, pool
                 )
+            else:
+                for model_instance in model_instances:
+                    reports_path[model_instance] = self._get_or_create_single_report(
+                        model_instance, data, existing_reports_attachment
+                    )
 
         result_path, filetype = self._merge_results(reports_path)
         cleanup_path = list(reports_path.values())
@@ -1 +1,2 @@
 from . import test_report_py3o
+from . import test_report_py3o_benchmark
@@ -97,6 +97,49 @@ class TestReportPy3o(TransactionCase):
             self.assertEqual(1, patched_zip_results.call_count)
             self.assertEqual(filetype, "zip")
 
+    def _fake_pool(self):
+        def convert(path, filetype):
+            result_path = "{}.{}".format(os.path.splitext(path)[0], filetype)
+            shutil.copy(path, result_path)
+            return result_path
+
+        return mock.Mock(size=2, convert=mock.Mock(side_effect=convert))
+
+    def test_reports_convert_concurrently(self):
+        self.report.py3o_filetype = "docx"
+        users = self.env["res.users"].search([], limit=3)
+        self.assertEqual(len(users), 3)
+        pool = self._fake_pool()
+        py3o_report = self.env["py3o.report"]
+        with mock.patch.object(
+            type(py3o_report), "_get_lo_worker_pool", return_value=pool
+        ), mock.patch.object(
+            type(py3o_report), "_convert_single_report_subprocess"
+        ) as patched_subprocess:
+            content, filetype = self.report._render(self.report.id, users.ids)
+        self.assertEqual(pool.convert.call_count, 3)
+        self.assertFalse(patched_subprocess.called)
+        self.assertEqual(filetype, "zip")
+
+    def test_convert_worker_fallback(self):
+        self.report.py3o_filetype = "docx"
+        pool = self._fake_pool()
+        pool.convert.side_effect = RuntimeError("LibreOffice died")
+        py3o_report = self.env["py3o.report"]
+        _convert_subprocess = self.py3o_report._convert_single_report_subprocess
+        with mock.patch.object(
+            type(py3o_report), "_get_lo_worker_pool", return_value=pool
+        ), mock.patch.object(
+            type(py3o_report), "_convert_single_report_subprocess"
+        ) as patched_subprocess, tools.misc.mute_logger(
+            "odoo.addons.report_py3o.models.py3o_report"
+        ):
+            patched_subprocess.side_effect = _convert_subprocess
+            res = self.report._render(self.report.id, self.env.user.ids)
+        self.assertTrue(res)
+        self.assertEqual(pool.convert.call_count, 1)
+        self.assertEqual(patched_subprocess.call_count, 1)
+
     def test_reports_merge_pdf(self):
         reports_path = []
         for _i in range(0, 3):
@@ -0,0 +1,74 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+import logging
+import time
+from unittest import mock
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..models import _lo_worker_pool
+
+_logger = logging.getLogger(__name__)
+
+NB_REPORTS = 20
+NB_WORKERS = 4
+
+
+@tagged("-standard", "report_py3o_benchmark")
+class TestReportPy3oBenchmark(TransactionCase):
+    """Compare the conversion throughput of the ``--convert-to`` command and
+    of the LibreOffice workers.
+
+    Not run by default, use ``--test-tags report_py3o_benchmark`` to run it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = cls.env.ref("report_py3o.res_users_report_py3o")
+        cls.report.py3o_filetype = "pdf"
+        cls.users = cls.env["res.users"].create(
+            [
+                {"name": "Py3o user %s" % i, "login": "py3o_benchmark_%s" % i}
+                for i in range(NB_REPORTS)
+            ]
+        )
+
+    def setUp(self):
+        super().setUp()
+        if _lo_worker_pool.uno is None:
+            self.skipTest("UNO is not available")
+        if not self.report.lo_bin_path:
+            self.skipTest("LibreOffice is not available")
+
+    def _render(self, pool):
+        with mock.patch.object(
+            type(self.env["py3o.report"]), "_get_lo_worker_pool", return_value=pool
+        ):
+            start = time.perf_counter()
+            content, filetype = self.report._render(self.report.id, self.users.ids)
+        self.assertEqual(filetype, "pdf")
+        return time.perf_counter() - start
+
+    def test_benchmark(self):
+        command = self._render(None)
+        pool = _lo_worker_pool.LibreOfficeWorkerPool(
+            self.report.lo_bin_path, NB_WORKERS, max_jobs=NB_REPORTS
+        )
+        try:
+            # Workers are started on first use
+            cold = self._render(pool)
+            warm = self._render(pool)
+        finally:
+            pool.close()
+        _logger.info(
+            "Py3o conversion of %s reports: command %.2fs (%.1f/s), "
+            "%s workers %.2fs cold, %.2fs warm (%.1f/s)",
+            NB_REPORTS,
+            command,
+            NB_REPORTS / command,
+            NB_WORKERS,
+            cold,
+            warm,
+            NB_REPORTS / warm,
+        )
@@ -4,6 +4,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 from odoo import api, fields, models
@@ -35,6 +36,41 @@ class AutomaticWorkflowJob(models.Model):
         " invoices, pickings..."
     )
 
+    # Number of workflows run concurrently by the cron, each on its own cursor.
+    # One by default: only workflows whose filters never select the same
+    # orders can run together without waiting on each other's locks.
+    _workflow_max_workers = 1
+
+    def _group_by_company(self, records):
+        for company in records.company_id:
+            yield company, records.filtered(lambda rec: rec.company_id == company)
+
+    def _run_batches(self, records, batch_size, method, domain_filter):
+        """Call ``method`` on ``records`` by batches of ``batch_size``"""
+        for start in range(0, len(records), batch_size):
+            self._run_batch(records[start : start + batch_size], method, domain_filter)
+
+    def _run_batch(self, records, method, domain_filter):
+        """Call ``method`` on ``records`` in a savepoint.
+
+        When it fails, the batch is split in halves which are run again, down
+        to the single failing records whose errors are logged then discarded.
+        """
+        try:
+            with self.env.cr.savepoint():
+                method(records, domain_filter)
+        except Exception:
+            if len(records) == 1:
+                _logger.exception("Error during an automatic workflow action.")
+                return
+            _logger.info(
+                "Automatic workflow batch of %s records failed, splitting it",
+                len(records),
+            )
+            half = len(records) // 2
+            self._run_batch(records[:half], method, domain_filter)
+            self._run_batch(records[half:], method, domain_filter)
+
     def _do_validate_sale_order(self, sale, domain_filter):
         """Validate a sales order, filter ensure no duplication"""
         if not self.env["sale.order"].search_count(
@@ -56,11 +92,26 @@ class AutomaticWorkflowJob(models.Model):
         sale._send_order_confirmation_mail()
         return f"{sale.display_name} {sale} send order confirmation mail successfully"
 
+    def _do_validate_sale_orders_batch(self, sales, domain_filter):
+        """Validate sales orders together, filter ensure no duplication"""
+        sales = sales.search([("id", "in", sales.ids)] + domain_filter)
+        for company, company_sales in self._group_by_company(sales):
+            company_sales.with_company(company).action_confirm()
+        if self.env.context.get("send_order_confirmation_mail"):
+            for sale in sales:
+                self._do_send_order_confirmation_mail(sale)
+        return f"{len(sales)} sale orders confirmed successfully"
+
     @api.model
-    def _validate_sale_orders(self, order_filter):
+    def _validate_sale_orders(self, order_filter, batch_size=0):
         sale_obj = self.env["sale.order"]
         sales = sale_obj.search(order_filter)
         _logger.debug("Sale Orders to validate: %s", sales.ids)
+        if batch_size:
+            self._run_batches(
+                sales, batch_size, self._do_validate_sale_orders_batch, order_filter
+            )
+            return
         for sale in sales:
             with savepoint(self.env.cr):
                 self._do_validate_sale_order(
@@ -81,11 +132,34 @@ class AutomaticWorkflowJob(models.Model):
         payment.with_context(active_model="sale.order").create_invoices()
         return f"{sale.display_name} {sale} create invoice successfully"
 
+    def _do_create_invoices_batch(self, sales, domain_filter):
+        """Create the invoices of sales orders together, one per order like
+        _do_create_invoice, filter ensure no duplication"""
+        sales = sales.search([("id", "in", sales.ids)] + domain_filter)
+        for company, company_sales in self._group_by_company(sales):
+            payment = (
+                self.env["sale.advance.payment.inv"]
+                .with_company(company)
+                .create(
+                    {
+                        "sale_order_ids": company_sales.ids,
+                        "consolidated_billing": False,
+                    }
+                )
+            )
+            payment.with_context(active_model="sale.order").create_invoices()
+        return f"{len(sales)} sale orders invoiced successfully"
+
     @api.model
-    def _create_invoices(self, create_filter):
+    def _create_invoices(self, create_filter, batch_size=0):
         sale_obj = self.env["sale.order"]
         sales = sale_obj.search(create_filter)
         _logger.debug("Sale Orders to create Invoice: %s", sales.ids)
+        if batch_size:
+            self._run_batches(
+                sales, batch_size, self._do_create_invoices_batch, create_filter
+            )
+            return
         for sale in sales:
             with savepoint(self.env.cr):
                 self._do_create_invoice(
@@ -101,11 +175,26 @@ class AutomaticWorkflowJob(models.Model):
         invoice.with_company(invoice.company_id).action_post()
         return f"{invoice.display_name} {invoice} validate invoice successfully"
 
+    def _do_validate_invoices_batch(self, invoices, domain_filter):
+        """Validate invoices together, filter ensure no duplication"""
+        invoices = invoices.search([("id", "in", invoices.ids)] + domain_filter)
+        for company, company_invoices in self._group_by_company(invoices):
+            company_invoices.with_company(company).action_post()
+        return f"{len(invoices)} invoices validated successfully"
+
     @api.model
-    def _validate_invoices(self, validate_invoice_filter):
+    def _validate_invoices(self, validate_invoice_filter, batch_size=0):
         move_obj = self.env["account.move"]
         invoices = move_obj.search(validate_invoice_filter)
         _logger.debug("Invoices to validate: %s", invoices.ids)
+        if batch_size:
+            self._run_batches(
+                invoices,
+                batch_size,
+                self._do_validate_invoices_batch,
+                validate_invoice_filter,
+            )
+            return
         for invoice in invoices:
             with savepoint(self.env.cr):
                 self._do_validate_invoice(
@@ -121,10 +210,22 @@ class AutomaticWorkflowJob(models.Model):
         sale.action_lock()
         return f"{sale.display_name} {sale} locked successfully"
 
+    def _do_sale_done_batch(self, sales, domain_filter):
+        """Lock sales orders together, filter ensure no duplication"""
+        sales = sales.search([("id", "in", sales.ids)] + domain_filter)
+        for company, company_sales in self._group_by_company(sales):
+            company_sales.with_company(company).action_lock()
+        return f"{len(sales)} sale orders locked successfully"
+
     @api.model
-    def _sale_done(self, sale_done_filter):
+    def _sale_done(self, sale_done_filter, batch_size=0):
         sales = self.env["sale.order"].search(sale_done_filter)
         _logger.debug("Sale Orders to done: %s", sales.ids)
+        if batch_size:
+            self._run_batches(
+                sales, batch_size, self._do_sale_done_batch, sale_done_filter
+            )
+            return
         for sale in sales:
             with savepoint(self.env.cr):
                 self._do_sale_done(sale.with_company(sale.company_id), sale_done_filter)
@@ -150,11 +251,23 @@ class AutomaticWorkflowJob(models.Model):
             res["journal_id"] = property_payment_journal_id.id
         return res
 
+    def _do_register_payments_batch(self, invoices, domain_filter):
+        """Register the payments of invoices, filter ensure no duplication"""
+        invoices = invoices.search([("id", "in", invoices.ids)] + domain_filter)
+        for invoice in invoices:
+            self._register_payment_invoice(invoice)
+        return f"{len(invoices)} invoice payments registered successfully"
+
     @api.model
-    def _register_payments(self, payment_filter):
+    def _register_payments(self, payment_filter, batch_size=0):
         invoice_obj = self.env["account.move"]
         invoices = invoice_obj.search(payment_filter)
         _logger.debug("Invoices to Register Payment: %s", invoices.ids)
+        if batch_size:
+            self._run_batches(
+                invoices, batch_size, self._do_register_payments_batch, payment_filter
+            )
+            return
         for invoice in invoices:
             with savepoint(self.env.cr):
                 self._register_payment_invoice(invoice)
@@ -185,37 +298,83 @@ class AutomaticWorkflowJob(models.Model):
     @api.model
     def run_with_workflow(self, sale_workflow):
         workflow_domain = [("workflow_process_id", "=", sale_workflow.id)]
+        batch_size = sale_workflow.batch_size
         if sale_workflow.validate_order:
             self.with_context(
                 send_order_confirmation_mail=sale_workflow.send_order_confirmation_mail
             )._validate_sale_orders(
-                safe_eval(sale_workflow.order_filter_id.domain) + workflow_domain
+                safe_eval(sale_workflow.order_filter_id.domain) + workflow_domain,
+                batch_size=batch_size,
             )
         self._handle_pickings(sale_workflow)
         if sale_workflow.create_invoice:
             self._create_invoices(
                 safe_eval(sale_workflow.create_invoice_filter_id.domain)
-                + workflow_domain
+                + workflow_domain,
+                batch_size=batch_size,
             )
         if sale_workflow.validate_invoice:
             self._validate_invoices(
                 safe_eval(sale_workflow.validate_invoice_filter_id.domain)
-                + workflow_domain
+                + workflow_domain,
+                batch_size=batch_size,
             )
         if sale_workflow.sale_done:
             self._sale_done(
-                safe_eval(sale_workflow.sale_done_filter_id.domain) + workflow_domain
+                safe_eval(sale_workflow.sale_done_filter_id.domain) + workflow_domain,
+                batch_size=batch_size,
             )
 
         if sale_workflow.register_payment:
             self._register_payments(
-                safe_eval(sale_workflow.payment_filter_id.domain) + workflow_domain
+                safe_eval(sale_workflow.payment_filter_id.domain) + workflow_domain,
+                batch_size=batch_size,
             )
 
     @api.model
-    def run(self):
-        """Must be called from ir.cron"""
+    def run(self, max_workers=None):
+        """Must be called from ir.cron
+
+        :param max_workers: number of workflows run concurrently, each on its
+            own cursor, defaults to ``_workflow_max_workers``
+        """
         sale_workflow_process = self.env["sale.workflow.process"]
-        for sale_workflow in sale_workflow_process.search([]):
-            self.run_with_workflow(sale_workflow)
+        sale_workflows = sale_workflow_process.search([])
+        max_workers = self._get_workflow_max_workers(max_workers)
+        if max_workers > 1 and len(sale_workflows) > 1:
+            self._run_concurrently(sale_workflows, max_workers)
+        else:
+            for sale_workflow in sale_workflows:
+                self.run_with_workflow(sale_workflow)
         return True
+
+    @api.model
+    def _get_workflow_max_workers(self, max_workers=None):
+        return max_workers or self._workflow_max_workers
+
+    @api.model
+    def _run_concurrently(self, sale_workflows, max_workers):
+        """Run the workflows in a pool of threads, each on its own cursor, so
+        a large workflow does not delay the others."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._run_with_workflow_in_cursor, sale_workflow.id)
+                for sale_workflow in sale_workflows
+            ]
+        for future in futures:
+            future.result()
+        # The orders, pickings and invoices were committed by the workers
+        self.env.invalidate_all()
+
+    @api.model
+    def _run_with_workflow_in_cursor(self, sale_workflow_id):
+        """Run a workflow on a new cursor, committed on success"""
+        with self.pool.cursor() as cr:
+            job = self.with_env(self.env(cr=cr))
+            try:
+                job.run_with_workflow(
+                    job.env["sale.workflow.process"].browse(sale_workflow_id)
+                )
+            except Exception:
+                _logger.exception("Automatic workflow %s failed", sale_workflow_id)
+                cr.rollback()
@@ -114,6 +114,12 @@ class SaleWorkflowProcess(models.Model):
         ),
     )
     register_payment = fields.Boolean()
+    batch_size = fields.Integer(
+        help="When set, the automatic actions process the records by batches "
+        "of this size: orders are confirmed, invoiced and their invoices "
+        "posted together. A failing batch is split until the failing records "
+        "are isolated. When empty, the records are processed one by one.",
+    )
     payment_filter_domain = fields.Text(
         related="payment_filter_id.domain",
     )
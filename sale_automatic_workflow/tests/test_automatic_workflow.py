@@ -4,8 +4,10 @@
 from datetime import timedelta
 from unittest import mock
 
-from odoo import fields
+from odoo import SUPERUSER_ID, api, fields
+from odoo.exceptions import UserError
 from odoo.tests import tagged
+from odoo.tools import mute_logger
 
 from .common import TestAutomaticWorkflowMixin, TestCommon
 
@@ -225,3 +227,128 @@ class TestAutomaticWorkflow(TestCommon, TestAutomaticWorkflowMixin):
         self.run_job()
         payment = self.env["account.payment"].search([], limit=1, order="id desc")
         self.assertEqual(payment.journal_id, payment_journal)
+
+    def test_batch_full_automatic(self):
+        workflow = self.create_full_automatic(override={"batch_size": 2})
+        sales = self.env["sale.order"]
+        for __ in range(3):
+            sales |= self.create_sale_order(workflow)
+        self.run_job()
+        self.assertEqual(set(sales.mapped("state")), {"sale"})
+        for sale in sales:
+            self.assertEqual(len(sale.invoice_ids), 1)
+            self.assertEqual(sale.invoice_ids.state, "posted")
+            self.assertEqual(sale.invoice_ids.workflow_process_id, workflow)
+
+    def _get_invoices_by_order(self, sales):
+        return [
+            (
+                len(sale.invoice_ids),
+                sale.invoice_ids.move_type,
+                sale.invoice_ids.state,
+                sale.invoice_ids.amount_total,
+                sorted(
+                    sale.invoice_ids.invoice_line_ids.mapped(
+                        lambda line: (line.product_id.name, line.quantity)
+                    )
+                ),
+            )
+            for sale in sales
+        ]
+
+    def test_batch_same_invoices(self):
+        invoices_by_mode = []
+        for batch_size in (0, 2):
+            workflow = self.create_full_automatic(override={"batch_size": batch_size})
+            sales = self.env["sale.order"]
+            for __ in range(3):
+                sales |= self.create_sale_order(workflow)
+            self.run_job()
+            invoices_by_mode.append(self._get_invoices_by_order(sales))
+        self.assertEqual(invoices_by_mode[0], invoices_by_mode[1])
+
+    def test_batch_failure_isolated(self):
+        workflow = self.create_full_automatic(override={"batch_size": 4})
+        sales = self.env["sale.order"]
+        for __ in range(4):
+            sales |= self.create_sale_order(workflow)
+        failing_sale = sales[2]
+        action_confirm = type(sales).action_confirm
+
+        def confirm(records):
+            if failing_sale in records:
+                raise UserError("Cannot confirm this order")
+            return action_confirm(records)
+
+        with mock.patch.object(
+            type(sales), "action_confirm", autospec=True, side_effect=confirm
+        ), mute_logger(
+            "odoo.addons.sale_automatic_workflow.models.automatic_workflow_job"
+        ):
+            self.run_job()
+        self.assertEqual(failing_sale.state, "draft")
+        self.assertFalse(failing_sale.invoice_ids)
+        for sale in sales - failing_sale:
+            self.assertEqual(sale.state, "sale")
+            self.assertEqual(sale.invoice_ids.state, "posted")
+
+    def test_run_concurrently(self):
+        job_model = self.env["automatic.workflow.job"]
+        self.assertEqual(job_model._get_workflow_max_workers(), 1)
+        self.assertEqual(job_model._get_workflow_max_workers(4), 4)
+        with mock.patch.object(
+            type(job_model), "_get_workflow_max_workers", return_value=2
+        ), mock.patch.object(
+            type(job_model), "_run_concurrently"
+        ) as patched_run_concurrently:
+            job_model.run()
+        patched_run_concurrently.assert_called_once()
+
+    def _unlink_committed(self, sale_ids, workflow_ids):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            sales = env["sale.order"].browse(sale_ids)
+            partners, products = sales.partner_id, sales.order_line.product_id
+            sales._action_cancel()
+            sales.unlink()
+            products.unlink()
+            partners.unlink()
+            env["sale.workflow.process"].browse(workflow_ids).unlink()
+
+    def test_run_in_cursors(self):
+        with self.registry.cursor() as cr:
+            # The worker cursors only see committed records
+            self.env = api.Environment(cr, SUPERUSER_ID, dict(self.env.context))
+            override = {"create_invoice": False, "validate_invoice": False}
+            workflow = self.create_full_automatic(override=override)
+            failing_workflow = self.create_full_automatic(override=override)
+            # Services do not create pickings to clean up
+            sale = self.create_sale_order(workflow, product_type="service")
+            failing_sale = self.create_sale_order(
+                failing_workflow, product_type="service"
+            )
+            self.addCleanup(
+                self._unlink_committed,
+                (sale | failing_sale).ids,
+                (workflow | failing_workflow).ids,
+            )
+            cr.commit()
+            self.assertEqual(sale.state, "draft")
+            job_model = type(self.env["automatic.workflow.job"])
+            run_with_workflow = job_model.run_with_workflow
+
+            def run(job, sale_workflow):
+                run_with_workflow(job, sale_workflow)
+                if sale_workflow == failing_workflow:
+                    raise UserError("Cannot run this workflow")
+
+            with mock.patch.object(
+                job_model, "run_with_workflow", autospec=True, side_effect=run
+            ), mute_logger(
+                "odoo.addons.sale_automatic_workflow.models.automatic_workflow_job"
+            ):
+                self.env["automatic.workflow.job"].run(max_workers=2)
+            # Read the orders committed by the workers in a new transaction
+            cr.commit()
+            self.assertEqual(sale.state, "sale")
+            self.assertEqual(failing_sale.state, "draft")
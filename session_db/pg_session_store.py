@@ -2,9 +2,14 @@
 # @author Nicolas Seinlet
 # Copyright (c) ACSONE SA 2022
 # @author Stéphane Bidoul
+import hashlib
 import json
 import logging
 import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 
 import psycopg2
 
@@ -21,10 +26,17 @@ if odoo.evented:
 
     lock = gevent.lock.RLock()
 elif odoo.tools.config["workers"] == 0:
-    import threading
-
     lock = threading.RLock()
 
+# Number of session payload hashes kept by the pooled store to skip the saves
+# of unchanged sessions
+SESSION_HASH_CACHE_SIZE = 10000
+# Unchanged sessions are still saved after this delay, so that vacuum does not
+# remove sessions in use
+SESSION_TOUCH_INTERVAL = timedelta(hours=1)
+# Maximum number of expired sessions deleted by a single statement
+VACUUM_BATCH_SIZE = 1000
+
 
 def with_lock(func):
     def wrapper(*args, **kwargs):
@@ -150,6 +162,170 @@ class PGSessionStore(sessions.SessionStore):
         )
 
 
+def with_pooled_cursor(func):
+    def wrapper(self, *args, **kwargs):
+        tries = 0
+        while True:
+            tries += 1
+            try:
+                with self._cursor() as cr:
+                    return func(self, cr, *args, **kwargs)
+            except (psycopg2.InterfaceError, psycopg2.OperationalError):
+                if tries > 4:
+                    _logger.warning(
+                        "session_db operation try %s/5 failed, aborting", tries
+                    )
+                    raise
+                _logger.info("session_db operation try %s/5 failed, retrying", tries)
+
+    return wrapper
+
+
+class PGSessionPoolStore(PGSessionStore):
+    """Session store borrowing a connection from the Odoo connection pool for
+    each operation, instead of sharing a single connection behind a lock.
+
+    Concurrent requests of threaded and evented servers thus do not wait on
+    each other. Sessions which did not change since they were read or saved
+    are not written again, unless their last write is older than
+    ``SESSION_TOUCH_INTERVAL``.
+    """
+
+    def __init__(self, uri, session_class=None):
+        sessions.SessionStore.__init__(self, session_class)
+        self._uri = uri
+        self._cnx = odoo.sql_db.db_connect(uri, allow_uri=True)
+        # {sid: (payload hash, write date)} of the last read or saved sessions
+        self._hashes = OrderedDict()
+        self._hashes_lock = threading.Lock()
+        self._setup_db()
+
+    def __del__(self):
+        # No connection of its own to close
+        pass
+
+    @contextmanager
+    def _cursor(self):
+        cr = self._cnx.cursor()
+        try:
+            cr._cnx.autocommit = True
+            yield cr
+        except (psycopg2.InterfaceError, psycopg2.OperationalError):
+            # Do not give a broken connection back to the pool, closed
+            # connections are discarded by the pool
+            cr._cnx.close()
+            raise
+        finally:
+            try:
+                if not cr._cnx.closed:
+                    cr._cnx.autocommit = False
+                cr.close()
+            except Exception:  # pylint: disable=except-pass
+                pass
+
+    @staticmethod
+    def _payload_hash(payload):
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _get_hash(self, sid):
+        with self._hashes_lock:
+            return self._hashes.get(sid)
+
+    def _set_hash(self, sid, payload_hash, write_date):
+        with self._hashes_lock:
+            self._hashes[sid] = (payload_hash, write_date)
+            self._hashes.move_to_end(sid)
+            while len(self._hashes) > SESSION_HASH_CACHE_SIZE:
+                self._hashes.popitem(last=False)
+
+    def _pop_hash(self, sid):
+        with self._hashes_lock:
+            self._hashes.pop(sid, None)
+
+    @with_pooled_cursor
+    def _setup_db(self, cr):
+        cr.execute(
+            """
+                CREATE TABLE IF NOT EXISTS http_sessions (
+                    sid varchar PRIMARY KEY,
+                    write_date timestamp without time zone NOT NULL,
+                    payload text NOT NULL
+                )
+            """
+        )
+        cr.execute(
+            """
+                CREATE INDEX IF NOT EXISTS http_sessions_write_date_index
+                ON http_sessions (write_date)
+            """
+        )
+
+    @with_pooled_cursor
+    def _save(self, cr, session, payload):
+        cr.execute(
+            """
+                INSERT INTO http_sessions(sid, write_date, payload)
+                    VALUES (%(sid)s, now() at time zone 'UTC', %(payload)s)
+                ON CONFLICT (sid)
+                DO UPDATE SET payload = %(payload)s,
+                              write_date = now() at time zone 'UTC'
+                RETURNING write_date
+            """,
+            dict(sid=session.sid, payload=payload),
+        )
+        return cr.fetchone()[0]
+
+    def save(self, session):
+        payload = json.dumps(dict(session))
+        payload_hash = self._payload_hash(payload)
+        cached = self._get_hash(session.sid)
+        if (
+            cached
+            and cached[0] == payload_hash
+            and datetime.utcnow() - cached[1] < SESSION_TOUCH_INTERVAL
+        ):
+            return
+        write_date = self._save(session, payload)
+        self._set_hash(session.sid, payload_hash, write_date)
+
+    @with_pooled_cursor
+    def delete(self, cr, session):
+        self._pop_hash(session.sid)
+        cr.execute("DELETE FROM http_sessions WHERE sid=%s", (session.sid,))
+
+    @with_pooled_cursor
+    def get(self, cr, sid):
+        cr.execute(
+            "SELECT payload, write_date FROM http_sessions WHERE sid=%s", (sid,)
+        )
+        row = cr.fetchone()
+        try:
+            data = json.loads(row[0])
+        except Exception:
+            return self.new()
+        self._set_hash(sid, self._payload_hash(row[0]), row[1])
+        return self.session_class(data, sid, False)
+
+    @with_pooled_cursor
+    def vacuum(self, cr, max_lifetime=http.SESSION_LIFETIME):
+        """Delete the expired sessions by batches of ``VACUUM_BATCH_SIZE``,
+        to keep the locks and the statements short."""
+        while True:
+            cr.execute(
+                """
+                    DELETE FROM http_sessions WHERE sid IN (
+                        SELECT sid FROM http_sessions
+                        WHERE write_date < now() at time zone 'UTC' - %s::interval
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                """,
+                (f"{max_lifetime} seconds", VACUUM_BATCH_SIZE),
+            )
+            if cr.rowcount < VACUUM_BATCH_SIZE:
+                break
+
+
 _original_session_store = http.root.__class__.session_store
 
 
@@ -158,7 +334,9 @@ def session_store(self):
     session_db_uri = os.environ.get("SESSION_DB_URI")
     if session_db_uri:
         _logger.debug("HTTP sessions stored in: db")
-        return PGSessionStore(session_db_uri, session_class=http.Session)
+        if os.environ.get("SESSION_DB_POOL", "1") == "0":
+            return PGSessionStore(session_db_uri, session_class=http.Session)
+        return PGSessionPoolStore(session_db_uri, session_class=http.Session)
     return _original_session_store.__get__(self, self.__class__)
 
 
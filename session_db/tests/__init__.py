@@ -1 +1,2 @@
 from . import test_pg_session_store
+from . import test_pg_session_store_benchmark
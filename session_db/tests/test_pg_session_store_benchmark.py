@@ -0,0 +1,72 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import http
+from odoo.sql_db import connection_info_for
+from odoo.tests.common import TransactionCase, tagged
+from odoo.tools import config
+
+from odoo.addons.session_db.pg_session_store import PGSessionPoolStore, PGSessionStore
+
+from .test_pg_session_store import _make_postgres_uri
+
+_logger = logging.getLogger(__name__)
+
+NB_THREADS = 16
+NB_REQUESTS = 200
+
+
+@tagged("-standard", "session_db_benchmark")
+class TestPGSessionStoreBenchmark(TransactionCase):
+    """Compare the throughput of the session stores under concurrent requests.
+
+    Not run by default, use ``--test-tags session_db_benchmark`` to run it.
+    """
+
+    def setUp(self):
+        super().setUp()
+        _, connection_info = connection_info_for(config["db_name"])
+        self.uri = _make_postgres_uri(**connection_info)
+
+    def _request(self, session_store, sid, index):
+        # Like an HTTP request: read the session, update it once in a while
+        session = session_store.get(sid)
+        if not index % 10:
+            session["counter"] = index
+        session_store.save(session)
+
+    def _benchmark(self, session_store):
+        sids = []
+        for _i in range(NB_THREADS):
+            session = session_store.new()
+            session_store.save(session)
+            sids.append(session.sid)
+
+        def worker(sid):
+            for index in range(NB_REQUESTS):
+                self._request(session_store, sid, index)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=NB_THREADS) as executor:
+            list(executor.map(worker, sids))
+        duration = time.perf_counter() - start
+        for sid in sids:
+            session_store.delete(session_store.get(sid))
+        return NB_THREADS * NB_REQUESTS / duration
+
+    def test_benchmark(self):
+        single = self._benchmark(
+            PGSessionStore(self.uri, session_class=http.Session)
+        )
+        pooled = self._benchmark(
+            PGSessionPoolStore(self.uri, session_class=http.Session)
+        )
+        _logger.info(
+            "Session store with %s threads: single connection %.0f requests/s, "
+            "pooled %.0f requests/s (x%.1f)",
+            NB_THREADS,
+            single,
+            pooled,
+            pooled / single,
+        )
@@ -20,18 +20,30 @@
 #
 #############################################################################
 import base64
+import hashlib
 import io
 import json
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import xlsxwriter
-from odoo import fields, models
+from odoo import api, fields, models
 from odoo.exceptions import ValidationError
 from odoo.tools import date_utils
 
+_logger = logging.getLogger(__name__)
+
 
 class Partner(models.Model):
     """ Class for adding report options  in 'res.partner' """
     _inherit = 'res.partner'
 
+    # Number of statements sent per transaction, and of transactions run
+    # in parallel by the automatic statement crons: rendering the pdf
+    # statements mostly waits on wkhtmltopdf, so chunks render side by side
+    _statement_chunk_size = 100
+    _statement_max_workers = 4
+
     customer_report_ids = fields.Many2many(
         'account.move',
         compute='_compute_customer_report_ids',
@@ -45,6 +57,15 @@ class Partner(models.Model):
         default=lambda self: self.env.company.currency_id.id,
         help="currency related to Customer or Vendor"
     )
+    # Fingerprints of the open items of the last statements sent
+    # automatically, by company and by cron, to not send them again while
+    # the items are unchanged
+    weekly_statement_hash = fields.Char(
+        company_dependent=True, copy=False,
+        help="Fingerprint of the open items of the last weekly statement")
+    monthly_statement_hash = fields.Char(
+        company_dependent=True, copy=False,
+        help="Fingerprint of the open items of the last monthly statement")
 
     def _compute_customer_report_ids(self):
         """ For computing 'invoices' of partner"""
@@ -406,264 +427,208 @@ class Partner(models.Model):
     def auto_week_statement_report(self):
         """ Action for sending automatic weekly statement
             of both pdf and xlsx report """
-
-        partner = []
-        invoice = self.env['account.move'].search(
-            [('move_type', 'in', ['out_invoice', 'in_invoice']),
-             ('payment_state', '!=', 'paid'),
-             ('state', '=', 'posted')])
-
-        for inv in invoice:
-            if inv.partner_id not in partner:
-                partner.append(inv.partner_id)
-
-        for rec in partner:
-            if rec.id:
-                main_query = """ SELECT name , invoice_date, invoice_date_due,
-                            amount_total_signed AS sub_total,
-                            amount_residual_signed AS amount_due ,
-                            amount_residual AS balance
-                    FROM account_move WHERE move_type
-                        IN ('out_invoice', 'in_invoice')
-                       AND state ='posted' AND payment_state != 'paid'
-                       AND company_id = '%s' AND partner_id = '%s'
-                    GROUP BY name, invoice_date, invoice_date_due,
-                    amount_total_signed, amount_residual_signed,
-                    amount_residual
-                    ORDER by name DESC""" % (self.env.company.id, rec.id)
-
-                self.env.cr.execute(main_query)
-                main = self.env.cr.dictfetchall()
-                data = {
-                    'customer': rec.display_name,
-                    'street': rec.street,
-                    'street2': rec.street2,
-                    'city': rec.city,
-                    'state': rec.state_id.name,
-                    'zip': rec.zip,
-                    'my_data': main,
-                }
-                report = self.env['ir.actions.report']._render_qweb_pdf(
-                    'statement_report.res_partner_action',
-                    self, data=data)
-                data_record = base64.b64encode(report[0])
-                ir_values = {
-                    'name': 'Statement Report',
-                    'type': 'binary',
-                    'datas': data_record,
-                    'mimetype': 'application/pdf',
-                    'res_model': 'res.partner',
-                }
-                attachment1 = self.env[
-                    'ir.attachment'].sudo().create(ir_values)
-                # FOR XLSX
-                output = io.BytesIO()
-                workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-                sheet = workbook.add_worksheet()
-                cell_format = workbook.add_format(
-                    {'font_size': '14px', 'bold': True})
-                txt = workbook.add_format({'font_size': '13px'})
-                head = workbook.add_format(
-                    {'align': 'center', 'bold': True, 'font_size': '22px'})
-                sheet.merge_range('B2:P4', 'Payment Statement Report', head)
-                date_style = workbook.add_format(
-                    {'text_wrap': True, 'align': 'center',
-                     'num_format': 'yyyy-mm-dd'})
-
-                if data['customer']:
-                    sheet.write('B7:D7', 'Customer/Supplier : ', cell_format)
-                    sheet.merge_range('E7:H7', data['customer'], txt)
-                sheet.write('B9:C7', 'Address : ', cell_format)
-                if data['street']:
-                    sheet.merge_range('D9:F9', data['street'], txt)
-                if data['street2']:
-                    sheet.merge_range('D10:F10', data['street2'], txt)
-                if data['city']:
-                    sheet.merge_range('D11:F11', data['city'], txt)
-                if data['state']:
-                    sheet.merge_range('D12:F12', data['state'], txt)
-                if data['zip']:
-                    sheet.merge_range('D13:F13', data['zip'], txt)
-
-                sheet.write('B15', 'Date', cell_format)
-                sheet.write('D15', 'Invoice/Bill Number', cell_format)
-                sheet.write('H15', 'Due Date', cell_format)
-                sheet.write('J15', 'Invoices/Debit', cell_format)
-                sheet.write('M15', 'Amount Due', cell_format)
-                sheet.write('P15', 'Balance Due', cell_format)
-
-                row = 16
-                column = 0
-
-                for record in data['my_data']:
-                    sheet.merge_range(row, column + 1, row, column + 2,
-                                      record['invoice_date'], date_style)
-                    sheet.merge_range(row, column + 3, row, column + 5,
-                                      record['name'], txt)
-                    sheet.merge_range(row, column + 7, row, column + 8,
-                                      record['invoice_date_due'], date_style)
-                    sheet.merge_range(row, column + 9, row, column + 10,
-                                      record['sub_total'], txt)
-                    sheet.merge_range(row, column + 12, row, column + 13,
-                                      record['amount_due'], txt)
-                    sheet.merge_range(row, column + 15, row, column + 16,
-                                      record['balance'], txt)
-                    row = row + 1
-                workbook.close()
-                output.seek(0)
-                xlsx = base64.b64encode(output.read())
-                output.close()
-                ir_values = {
-                    'name': "Statement Report.xlsx",
-                    'type': 'binary',
-                    'datas': xlsx,
-                    'store_fname': xlsx,
-                }
-                attachment2 = self.env['ir.attachment'].sudo().create(
-                    ir_values)
-                email_values = {
-                    'email_to': rec.email,
-                    'subject': 'Weekly Payment Statement Report',
-                    'body_html': '<p>Dear <strong> Mr/Miss. ' + rec.name +
-                                 '</strong> </p> <p> We have attached your '
-                                 'payment statement. Please check </p> <p>'
-                                 'Best regards, </p><p> ' + self.env.user.name,
-                    'attachment_ids': [attachment1.id, attachment2.id]
-                }
-                mail = self.env['mail.mail'].sudo().create(email_values)
-                mail.send()
+        self._auto_statement_report('Weekly Payment Statement Report',
+                                    'weekly_statement_hash')
 
     def auto_month_statement_report(self):
         """ Action for sending automatic monthly statement report
             of both pdf and xlsx report"""
+        self._auto_statement_report('Monthly Payment Statement Report',
+                                    'monthly_statement_hash')
+
+    def _auto_statement_report(self, subject, hash_field):
+        """ Send the statement of every partner having open invoices or
+            bills, skipping the partners whose open items did not change
+            since the last statement of ``hash_field`` they received in the
+            current company. Statements are rendered by chunks, in parallel
+            on separate cursors """
+        items_by_partner = self._get_statement_items()
+        hashes = {
+            partner_id: self._get_statement_hash(items)
+            for partner_id, items in items_by_partner.items()
+        }
+        partners = self.browse(list(hashes)).filtered(
+            lambda rec: rec[hash_field] != hashes[rec.id])
+        _logger.info('Sending %s statements, %s partners unchanged',
+                     len(partners), len(hashes) - len(partners))
+        chunks = [
+            partners.ids[index:index + self._statement_chunk_size]
+            for index in range(0, len(partners), self._statement_chunk_size)
+        ]
+        max_workers = self._get_statement_max_workers()
+        if max_workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._send_statements_in_cursor, chunk,
+                        items_by_partner, hashes, subject, hash_field)
+                    for chunk in chunks
+                ]
+            for future in futures:
+                future.result()
+            # The fingerprints of the sent statements were committed by the
+            # workers
+            self.env.invalidate_all()
+        else:
+            for chunk in chunks:
+                try:
+                    with self.env.cr.savepoint():
+                        self.browse(chunk)._send_statements(
+                            items_by_partner, hashes, subject, hash_field)
+                except Exception:
+                    _logger.exception('Failed sending statements of %s',
+                                      chunk)
+
+    def _get_statement_max_workers(self):
+        """ Return the number of chunks sent in parallel """
+        return self._statement_max_workers
+
+    def _get_statement_items(self):
+        """ Return the open invoices and bills of the current company by
+            partner, fetched in a single query """
+        self.env['account.move'].flush_model()
+        self.env.cr.execute("""
+            SELECT partner_id, name, invoice_date, invoice_date_due,
+                amount_total_signed AS sub_total,
+                amount_residual_signed AS amount_due,
+                amount_residual AS balance
+            FROM account_move WHERE move_type
+                IN ('out_invoice', 'in_invoice')
+                AND state = 'posted' AND payment_state != 'paid'
+                AND company_id = %s AND partner_id IS NOT NULL
+            GROUP BY partner_id, name, invoice_date, invoice_date_due,
+                amount_total_signed, amount_residual_signed,
+                amount_residual
+            ORDER BY partner_id, name DESC""", (self.env.company.id,))
+        items_by_partner = defaultdict(list)
+        for item in self.env.cr.dictfetchall():
+            items_by_partner[item.pop('partner_id')].append(item)
+        return items_by_partner
+
+    @api.model
+    def _get_statement_hash(self, items):
+        """ Return a fingerprint of the open items of a statement """
+        return hashlib.sha1(repr([
+            sorted(item.items()) for item in items
+        ]).encode()).hexdigest()
+
+    def _send_statements_in_cursor(self, partner_ids, items_by_partner,
+                                   hashes, subject, hash_field):
+        """ Send the statements of the partners on a new cursor, committed
+            on success """
+        with self.pool.cursor() as cr:
+            partners = self.with_env(self.env(cr=cr)).browse(partner_ids)
+            try:
+                partners._send_statements(items_by_partner, hashes, subject,
+                                          hash_field)
+            except Exception:
+                _logger.exception('Failed sending statements of %s',
+                                  partner_ids)
+                cr.rollback()
+
+    def _send_statements(self, items_by_partner, hashes, subject,
+                         hash_field):
+        """ Create the pdf and xlsx statements of the partners and queue
+            them by email """
+        attachment_values = []
+        for rec in self:
+            data = {
+                'customer': rec.display_name,
+                'street': rec.street,
+                'street2': rec.street2,
+                'city': rec.city,
+                'state': rec.state_id.name,
+                'zip': rec.zip,
+                'my_data': items_by_partner[rec.id],
+            }
+            report = self.env['ir.actions.report']._render_qweb_pdf(
+                'statement_report.res_partner_action',
+                self.browse(), data=data)
+            attachment_values.append({
+                'name': 'Statement Report',
+                'type': 'binary',
+                'raw': report[0],
+                'mimetype': 'application/pdf',
+                'res_model': 'res.partner',
+            })
+            attachment_values.append({
+                'name': "Statement Report.xlsx",
+                'type': 'binary',
+                'raw': self._get_statement_xlsx(data),
+            })
+        attachments = self.env['ir.attachment'].sudo().create(
+            attachment_values)
+        self.env['mail.mail'].sudo().create([{
+            'email_to': rec.email,
+            'subject': subject,
+            'body_html': '<p>Dear <strong> Mr/Miss. ' + rec.name +
+                         '</strong> </p> <p> We have attached your '
+                         'payment statement. Please check </p> <p>'
+                         'Best regards, </p><p> ' + self.env.user.name,
+            'attachment_ids': attachments[2 * index:2 * index + 2].ids,
+        } for index, rec in enumerate(self)])
+        for rec in self:
+            rec[hash_field] = hashes[rec.id]
 
-        partner = []
-        invoice = self.env['account.move'].search(
-            [('move_type', 'in', ['out_invoice', 'in_invoice']),
-             ('payment_state', '!=', 'paid'),
-             ('state', '=', 'posted')])
-
-        for inv in invoice:
-            if inv.partner_id not in partner:
-                partner.append(inv.partner_id)
-
-        for rec in partner:
-            if rec.id:
-                main_query = """SELECT name , invoice_date, invoice_date_due,
-                        amount_total_signed AS sub_total,
-                        amount_residual_signed AS amount_due ,
-                        amount_residual AS balance
-                   FROM account_move WHERE move_type
-                        IN ('out_invoice', 'in_invoice')
-                        AND state ='posted'
-                        AND payment_state != 'paid'
-                        AND company_id = '%s' AND partner_id = '%s'
-                   GROUP BY name, invoice_date, invoice_date_due,
-                    amount_total_signed, amount_residual_signed,
-                    amount_residual
-                    ORDER by name DESC""" % (self.env.company.id, rec.id)
-
-                self.env.cr.execute(main_query)
-                main = self.env.cr.dictfetchall()
-                data = {
-                    'customer': rec.display_name,
-                    'street': rec.street,
-                    'street2': rec.street2,
-                    'city': rec.city,
-                    'state': rec.state_id.name,
-                    'zip': rec.zip,
-                    'my_data': main,
-                }
-                report = self.env['ir.actions.report']._render_qweb_pdf(
-                    'statement_report.res_partner_action',
-                    self, data=data)
-                data_record = base64.b64encode(report[0])
-                ir_values = {
-                    'name': 'Statement Report',
-                    'type': 'binary',
-                    'datas': data_record,
-                    'mimetype': 'application/pdf',
-                    'res_model': 'res.partner',
-                }
-                attachment1 = self.env['ir.attachment'].sudo().create(
-                    ir_values)
-                # FOR XLSX
-                output = io.BytesIO()
-                workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-                sheet = workbook.add_worksheet()
-                cell_format = workbook.add_format(
-                    {'font_size': '14px', 'bold': True})
-                txt = workbook.add_format({'font_size': '13px'})
-                head = workbook.add_format(
-                    {'align': 'center', 'bold': True, 'font_size': '22px'})
-                sheet.merge_range('B2:P4', 'Payment Statement Report', head)
-                date_style = workbook.add_format(
-                    {'text_wrap': True, 'align': 'center',
-                     'num_format': 'yyyy-mm-dd'})
-
-                if data['customer']:
-                    sheet.write('B7:D7', 'Customer/Supplier : ', cell_format)
-                    sheet.merge_range('E7:H7', data['customer'], txt)
-                sheet.write('B9:C7', 'Address : ', cell_format)
-                if data['street']:
-                    sheet.merge_range('D9:F9', data['street'], txt)
-                if data['street2']:
-                    sheet.merge_range('D10:F10', data['street2'], txt)
-                if data['city']:
-                    sheet.merge_range('D11:F11', data['city'], txt)
-                if data['state']:
-                    sheet.merge_range('D12:F12', data['state'], txt)
-                if data['zip']:
-                    sheet.merge_range('D13:F13', data['zip'], txt)
-
-                sheet.write('B15', 'Date', cell_format)
-                sheet.write('D15', 'Invoice/Bill Number', cell_format)
-                sheet.write('H15', 'Due Date', cell_format)
-                sheet.write('J15', 'Invoices/Debit', cell_format)
-                sheet.write('M15', 'Amount Due', cell_format)
-                sheet.write('P15', 'Balance Due', cell_format)
-
-                row = 16
-                column = 0
-
-                for record in data['my_data']:
-                    sheet.merge_range(row, column + 1, row, column + 2,
-                                      record['invoice_date'], date_style)
-                    sheet.merge_range(row, column + 3, row, column + 5,
-                                      record['name'], txt)
-                    sheet.merge_range(row, column + 7, row, column + 8,
-                                      record['invoice_date_due'], date_style)
-                    sheet.merge_range(row, column + 9, row, column + 10,
-                                      record['sub_total'], txt)
-                    sheet.merge_range(row, column + 12, row, column + 13,
-                                      record['amount_due'], txt)
-                    sheet.merge_range(row, column + 15, row, column + 16,
-                                      record['balance'], txt)
-                    row = row + 1
-                workbook.close()
-                output.seek(0)
-                xlsx = base64.b64encode(output.read())
-                output.close()
-                ir_values = {
-                    'name': "Statement Report.xlsx",
-                    'type': 'binary',
-                    'datas': xlsx,
-                    'store_fname': xlsx,
-                }
-                attachment2 = self.env['ir.attachment'].sudo().create(
-                    ir_values)
-                email_values = {
-                    'email_to': rec.email,
-                    'subject': 'Monthly Payment Statement Report',
-                    'body_html': '<p>Dear <strong> Mr/Miss. ' + rec.name +
-                                 '</strong> </p> <p> We have attached your '
-                                 'payment statement. '
-                                 'Please check </p> <p>Best regards,'
-                                 ' </p> <p>' + self.env.user.name,
-                    'attachment_ids': [attachment1.id, attachment2.id]
-                }
-                mail = self.env['mail.mail'].sudo().create(email_values)
-                mail.send()
+    @api.model
+    def _get_statement_xlsx(self, data):
+        """ Return the content of the xlsx statement """
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        sheet = workbook.add_worksheet()
+        cell_format = workbook.add_format(
+            {'font_size': '14px', 'bold': True})
+        txt = workbook.add_format({'font_size': '13px'})
+        head = workbook.add_format(
+            {'align': 'center', 'bold': True, 'font_size': '22px'})
+        sheet.merge_range('B2:P4', 'Payment Statement Report', head)
+        date_style = workbook.add_format(
+            {'text_wrap': True, 'align': 'center',
+             'num_format': 'yyyy-mm-dd'})
+
+        if data['customer']:
+            sheet.write('B7:D7', 'Customer/Supplier : ', cell_format)
+            sheet.merge_range('E7:H7', data['customer'], txt)
+        sheet.write('B9:C7', 'Address : ', cell_format)
+        if data['street']:
+            sheet.merge_range('D9:F9', data['street'], txt)
+        if data['street2']:
+            sheet.merge_range('D10:F10', data['street2'], txt)
+        if data['city']:
+            sheet.merge_range('D11:F11', data['city'], txt)
+        if data['state']:
+            sheet.merge_range('D12:F12', data['state'], txt)
+        if data['zip']:
+            sheet.merge_range('D13:F13', data['zip'], txt)
+
+        sheet.write('B15', 'Date', cell_format)
+        sheet.write('D15', 'Invoice/Bill Number', cell_format)
+        sheet.write('H15', 'Due Date', cell_format)
+        sheet.write('J15', 'Invoices/Debit', cell_format)
+        sheet.write('M15', 'Amount Due', cell_format)
+        sheet.write('P15', 'Balance Due', cell_format)
+
+        row = 16
+        column = 0
+
+        for record in data['my_data']:
+            sheet.merge_range(row, column + 1, row, column + 2,
+                              record['invoice_date'], date_style)
+            sheet.merge_range(row, column + 3, row, column + 5,
+                              record['name'], txt)
+            sheet.merge_range(row, column + 7, row, column + 8,
+                              record['invoice_date_due'], date_style)
+            sheet.merge_range(row, column + 9, row, column + 10,
+                              record['sub_total'], txt)
+            sheet.merge_range(row, column + 12, row, column + 13,
+                              record['amount_due'], txt)
+            sheet.merge_range(row, column + 15, row, column + 16,
+                              record['balance'], txt)
+            row = row + 1
+        workbook.close()
+        xlsx = output.getvalue()
+        output.close()
+        return xlsx
 
     def action_vendor_print_pdf(self):
         """ Action for printing vendor pdf report """
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2024-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author:Jumana Haseen (odoo@cybrosys.com)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+from datetime import date
+from unittest.mock import patch
+from odoo import SUPERUSER_ID, api
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+SUBJECT = 'Test Payment Statement Report'
+
+
+@tagged('post_install', '-at_install')
+class TestStatementReport(AccountTestInvoicingCommon):
+    """ Tests for the automatic statement crons """
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        # Send the chunks in the test transaction, unlike worker cursors
+        patcher = patch.object(type(cls.env['res.partner']),
+                               '_statement_max_workers', 1)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        cls.partners = cls.env['res.partner'].create([{
+            'name': 'Statement partner %s' % index,
+            'email': 'statement%s@example.com' % index,
+        } for index in range(3)])
+        cls.invoices = cls.env['account.move']
+        for index, partner in enumerate(cls.partners):
+            cls.invoices += cls.init_invoice(
+                'out_invoice', partner=partner, amounts=[100.0 * (index + 1)],
+                post=True)
+        # Without open items, no statement is sent
+        cls.partner_paid = cls.env['res.partner'].create({
+            'name': 'Statement partner without open items',
+            'email': 'statement.paid@example.com',
+        })
+
+    def _get_statement_mails(self):
+        return self.env['mail.mail'].search([('subject', '=', SUBJECT)])
+
+    def _send_statements(self):
+        self.env['res.partner']._auto_statement_report(
+            SUBJECT, 'weekly_statement_hash')
+
+    def test_auto_statement_report(self):
+        self._send_statements()
+        mails = self._get_statement_mails()
+        self.assertEqual(len(mails), 3)
+        self.assertEqual(sorted(mails.mapped('email_to')),
+                         sorted(self.partners.mapped('email')))
+        for mail in mails:
+            self.assertEqual(len(mail.attachment_ids), 2)
+            self.assertEqual(sorted(mail.attachment_ids.mapped('name')),
+                             ['Statement Report', 'Statement Report.xlsx'])
+        self.assertTrue(all(self.partners.mapped('weekly_statement_hash')))
+        self.assertFalse(self.partner_paid.weekly_statement_hash)
+        # Fingerprints are kept by statement kind and by company
+        self.assertFalse(any(self.partners.mapped('monthly_statement_hash')))
+        other_company = self.company_data_2['company']
+        self.assertFalse(any(self.partners.with_company(
+            other_company).mapped('weekly_statement_hash')))
+
+    def test_auto_statement_report_unchanged(self):
+        self._send_statements()
+        # Unchanged open items are not sent again
+        self._send_statements()
+        self.assertEqual(len(self._get_statement_mails()), 3)
+        # Changing an invoice sends the statement of its partner again
+        invoice = self.invoices[0]
+        invoice.button_draft()
+        invoice.invoice_line_ids.price_unit = 150.0
+        invoice.action_post()
+        self._send_statements()
+        mails = self._get_statement_mails()
+        self.assertEqual(len(mails), 4)
+        self.assertEqual(
+            len(mails.filtered(
+                lambda mail: mail.email_to == self.partners[0].email)), 2)
+
+    def test_auto_statement_report_failed_chunk(self):
+        partner_model = type(self.env['res.partner'])
+        failing_partner = self.partners[1]
+        send_statements = partner_model._send_statements
+
+        def send(records, *args):
+            if failing_partner in records:
+                raise ValueError('Cannot render this statement')
+            return send_statements(records, *args)
+
+        with patch.object(partner_model, '_statement_chunk_size', 1), \
+                patch.object(partner_model, '_send_statements',
+                             autospec=True, side_effect=send), \
+                mute_logger('odoo.addons.statement_report.models.res_partner'):
+            self._send_statements()
+        mails = self._get_statement_mails()
+        partners = self.partners - failing_partner
+        self.assertEqual(sorted(mails.mapped('email_to')),
+                         sorted(partners.mapped('email')))
+        self.assertFalse(failing_partner.weekly_statement_hash)
+        # The failed statement is sent by the next run
+        self._send_statements()
+        self.assertEqual(len(self._get_statement_mails()), 3)
+
+    def test_auto_week_and_month_statement_report(self):
+        partner_model = self.env['res.partner']
+        partner_model.auto_week_statement_report()
+        partner_model.auto_month_statement_report()
+        for subject in ('Weekly Payment Statement Report',
+                        'Monthly Payment Statement Report'):
+            mails = self.env['mail.mail'].search([
+                ('subject', '=', subject),
+                ('email_to', 'in', self.partners.mapped('email')),
+            ])
+            self.assertEqual(len(mails), 3)
+
+    def _unlink_committed(self, partner_ids):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            mails = env['mail.mail'].search([('subject', '=', SUBJECT)])
+            mails.attachment_ids.unlink()
+            mails.unlink()
+            env['res.partner'].browse(partner_ids).unlink()
+
+    def test_auto_statement_report_in_cursors(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            partners = env['res.partner'].create([{
+                'name': 'Committed statement partner %s' % index,
+                'email': 'committed.statement%s@example.com' % index,
+            } for index in range(3)])
+            self.addCleanup(self._unlink_committed, partners.ids)
+            cr.commit()
+            # The open items are given, the committed company may have no
+            # chart of accounts to post invoices with
+            items_by_partner = {partner.id: [{
+                'name': 'INV/%s' % index,
+                'invoice_date': date(2024, 1, 1),
+                'invoice_date_due': date(2024, 1, 31),
+                'sub_total': 100.0 * (index + 1),
+                'amount_due': 100.0 * (index + 1),
+                'balance': 100.0 * (index + 1),
+            }] for index, partner in enumerate(partners)}
+            failing_partner = partners[1]
+            partner_model = type(env['res.partner'])
+            send_statements = partner_model._send_statements
+
+            def send(records, *args):
+                if failing_partner in records:
+                    raise ValueError('Cannot render this statement')
+                return send_statements(records, *args)
+
+            self.assertFalse(any(partners.mapped('weekly_statement_hash')))
+            with patch.object(partner_model, '_statement_chunk_size', 1), \
+                    patch.object(partner_model, '_statement_max_workers', 2), \
+                    patch.object(partner_model, '_get_statement_items',
+                                 return_value=items_by_partner), \
+                    patch.object(partner_model, '_send_statements',
+                                 autospec=True, side_effect=send), \
+                    mute_logger(
+                        'odoo.addons.statement_report.models.res_partner'):
+                env['res.partner']._auto_statement_report(
+                    SUBJECT, 'weekly_statement_hash')
+            # Read the statements committed by the workers in a new
+            # transaction
+            cr.commit()
+            mails = env['mail.mail'].search([('subject', '=', SUBJECT)])
+            sent_partners = partners - failing_partner
+            self.assertEqual(sorted(mails.mapped('email_to')),
+                             sorted(sent_partners.mapped('email')))
+            for mail in mails:
+                self.assertEqual(len(mail.attachment_ids), 2)
+            self.assertTrue(all(sent_partners.mapped('weekly_statement_hash')))
+            self.assertFalse(failing_partner.weekly_statement_hash)
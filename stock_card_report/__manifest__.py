@@ -14,6 +14,7 @@
         "security/ir.model.access.csv",
         "data/paper_format.xml",
         "data/report_data.xml",
+        "data/ir_cron.xml",
         "reports/stock_card_report.xml",
         "wizard/stock_card_report_wizard_view.xml",
     ],
@@ -0,0 +1,145 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Snapshot months are covered up to this month, excluded
+PARAM_COVERED_UNTIL = "stock_card_report.snapshot_covered_until"
+# Date of the last refresh, moves written after it are not in the snapshot
+PARAM_REFRESH_DATE = "stock_card_report.snapshot_refresh_date"
+
+
+class StockCardSnapshot(models.Model):
+    """Quantities moved in and out of each location by product and month,
+    used to compute the opening balances of the stock card report without
+    reading the whole move history."""
+
+    _name = "stock.card.snapshot"
+    _description = "Stock Card Monthly Snapshot"
+    _order = "month, product_id, location_id"
+
+    month = fields.Date(required=True, index=True, readonly=True)
+    product_id = fields.Many2one(
+        comodel_name="product.product", required=True, index=True, readonly=True
+    )
+    location_id = fields.Many2one(
+        comodel_name="stock.location", required=True, index=True, readonly=True
+    )
+    product_in = fields.Float(readonly=True)
+    product_out = fields.Float(readonly=True)
+
+    @api.model
+    def _get_covered_until(self):
+        """Return the first month not covered by the snapshot, or None if the
+        snapshot was never computed."""
+        value = self.env["ir.config_parameter"].sudo().get_param(PARAM_COVERED_UNTIL)
+        return fields.Date.to_date(value) if value else None
+
+    @api.model
+    def _invalidate_from(self, date):
+        """Stop using the snapshot from the month of ``date``, its moves
+        changed: the report reads them until the next refresh recomputes
+        that month."""
+        covered_until = self._get_covered_until()
+        month = fields.Date.to_date(date).replace(day=1)
+        if covered_until and month < covered_until:
+            self.env["ir.config_parameter"].sudo().set_param(
+                PARAM_COVERED_UNTIL, fields.Date.to_string(month)
+            )
+
+    @api.model
+    def _refresh_from(self):
+        """Return the first month to recompute: the month of the oldest done
+        move written since the last refresh."""
+        params = self.env["ir.config_parameter"].sudo()
+        refresh_date = params.get_param(PARAM_REFRESH_DATE)
+        if not refresh_date:
+            return None
+        self.env["stock.move"].flush_model(["state", "date"])
+        self.env.cr.execute(
+            """
+            SELECT min(date) FROM stock_move
+            WHERE state = 'done' AND write_date >= %s
+            """,
+            (refresh_date,),
+        )
+        date_from = self.env.cr.fetchone()[0]
+        covered_until = self._get_covered_until()
+        if not date_from:
+            return covered_until
+        month = date_from.date().replace(day=1)
+        return min(month, covered_until) if covered_until else month
+
+    @api.model
+    def _refresh(self):
+        """Recompute the snapshot of the closed months changed since the last
+        refresh, every closed month the first time."""
+        refresh_date = fields.Datetime.now()
+        month_from = self._refresh_from()
+        month_to = fields.Date.context_today(self).replace(day=1)
+        domain_from = "AND month >= %(month_from)s" if month_from else ""
+        move_from = "AND m.date >= %(month_from)s" if month_from else ""
+        self.env["stock.move"].flush_model(
+            ["state", "date", "product_id", "product_qty", "location_id"]
+        )
+        self.env.cr.execute(
+            f"""
+            DELETE FROM stock_card_snapshot
+            WHERE month < %(month_to)s {domain_from}
+            """,
+            {"month_from": month_from, "month_to": month_to},
+        )
+        self.env.cr.execute(
+            f"""
+            INSERT INTO stock_card_snapshot (
+                month, product_id, location_id, product_in, product_out,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT date_trunc('month', m.date)::date, m.product_id,
+                line.location_id, SUM(line.product_in), SUM(line.product_out),
+                %(uid)s, %(now)s, %(uid)s, %(now)s
+            FROM stock_move m
+            CROSS JOIN LATERAL (
+                VALUES (m.location_dest_id, m.product_qty, 0.0),
+                    (m.location_id, 0.0, m.product_qty)
+            ) AS line(location_id, product_in, product_out)
+            WHERE m.state = 'done' AND m.date < %(month_to)s {move_from}
+            GROUP BY 1, 2, 3
+            """,
+            {
+                "month_from": month_from,
+                "month_to": month_to,
+                "uid": self.env.uid,
+                "now": refresh_date,
+            },
+        )
+        _logger.info(
+            "Stock card snapshot refreshed from %s to %s: %s rows",
+            month_from or "the beginning",
+            month_to,
+            self.env.cr.rowcount,
+        )
+        params = self.env["ir.config_parameter"].sudo()
+        params.set_param(PARAM_COVERED_UNTIL, fields.Date.to_string(month_to))
+        params.set_param(PARAM_REFRESH_DATE, fields.Datetime.to_string(refresh_date))
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def _get_quantities(self, products, locations, month):
+        """Return ``{product_id: quantity}`` moved into the locations minus
+        moved out of them, before ``month``."""
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            SELECT product_id, SUM(product_in - product_out)
+            FROM stock_card_snapshot
+            WHERE month < %s AND product_id IN %s AND location_id IN %s
+            GROUP BY product_id
+            """,
+            (month, tuple(products.ids), tuple(locations.ids)),
+        )
+        return dict(self.env.cr.fetchall())
@@ -0,0 +1,37 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import fields, models
+
+# Fields of the done moves summed up in the snapshot
+SNAPSHOT_FIELDS = {
+    "state",
+    "date",
+    "product_id",
+    "product_uom_qty",
+    "product_uom",
+    "location_id",
+    "location_dest_id",
+}
+
+
+class StockMove(models.Model):
+    _inherit = "stock.move"
+
+    def write(self, vals):
+        if SNAPSHOT_FIELDS.intersection(vals):
+            self._invalidate_stock_card_snapshot(vals.get("date"))
+        return super().write(vals)
+
+    def unlink(self):
+        self._invalidate_stock_card_snapshot()
+        return super().unlink()
+
+    def _invalidate_stock_card_snapshot(self, new_date=None):
+        """Invalidate the snapshot from the oldest month of the done moves
+        about to be cancelled, deleted, re-dated or changed."""
+        dates = self.filtered(lambda move: move.state == "done").mapped("date")
+        if not dates:
+            return
+        if new_date:
+            dates.append(fields.Datetime.to_datetime(new_date))
+        self.env["stock.card.snapshot"]._invalidate_from(min(dates))
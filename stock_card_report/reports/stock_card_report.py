@@ -1,6 +1,8 @@
 # Copyright 2019 Ecosoft Co., Ltd. (http://ecosoft.co.th)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 import pytz
 
 from odoo import api, fields, models
@@ -51,13 +53,18 @@ class StockCardReport(models.TransientModel):
         help="Use compute fields, so there is nothing store in database",
     )
 
+    def _get_locations(self):
+        return self.env["stock.location"].search(
+            [("id", "child_of", [self.location_id.id])]
+        )
+
     def _compute_results(self):
+        """Fetch the moves of the report period, the moves before it are
+        only summed up by _get_initial_balances."""
         self.ensure_one()
         date_from = self.date_from or "0001-01-01"
         self.date_to = self.date_to or fields.Date.context_today(self)
-        locations = self.env["stock.location"].search(
-            [("id", "child_of", [self.location_id.id])]
-        )
+        locations = self._get_locations()
         self._cr.execute(
             """
             SELECT move.date, move.product_id, move.product_qty,
@@ -67,21 +74,22 @@ class StockCardReport(models.TransientModel):
                     then move.product_qty end as product_in,
                 case when move.location_id in %s
                     then move.product_qty end as product_out,
-                case when move.date < %s then True else False end as is_initial,
+                False as is_initial,
                 move.picking_id
             FROM stock_move move
             WHERE (move.location_id in %s or move.location_dest_id in %s)
                 and move.state = 'done' and move.product_id in %s
+                and move.date >= %s
                 and CAST(move.date AS date) <= %s
             ORDER BY move.date, move.reference
         """,
             (
                 tuple(locations.ids),
                 tuple(locations.ids),
-                date_from,
                 tuple(locations.ids),
                 tuple(locations.ids),
                 tuple(self.product_ids.ids),
+                date_from,
                 self.date_to,
             ),
         )
@@ -94,6 +102,55 @@ class StockCardReport(models.TransientModel):
             new_results.append(ReportLine.new(line).id)
         self.results = new_results
 
+    def _get_initial_balances(self, products):
+        """Return ``{product_id: quantity}`` of the products in the location
+        at the start of the report period.
+
+        The quantities are summed up in SQL, from the monthly snapshot when
+        it is maintained, then from the moves after the snapshot.
+        """
+        self.ensure_one()
+        if not self.date_from or not products:
+            return {}
+        locations = self._get_locations()
+        balances = defaultdict(float)
+        moves_from = "0001-01-01"
+        snapshot = self.env["stock.card.snapshot"]
+        covered_until = snapshot._get_covered_until()
+        if covered_until:
+            moves_from = min(self.date_from.replace(day=1), covered_until)
+            quantities = snapshot._get_quantities(products, locations, moves_from)
+            for product_id, quantity in quantities.items():
+                balances[product_id] += float(quantity)
+        self.env["stock.move"].flush_model()
+        self._cr.execute(
+            """
+            SELECT move.product_id,
+                SUM(case when move.location_dest_id in %(locations)s
+                    then move.product_qty else 0 end)
+                - SUM(case when move.location_id in %(locations)s
+                    then move.product_qty else 0 end)
+            FROM stock_move move
+            WHERE (move.location_id in %(locations)s
+                    or move.location_dest_id in %(locations)s)
+                and move.state = 'done' and move.product_id in %(products)s
+                and move.date >= %(moves_from)s and move.date < %(date_from)s
+            GROUP BY move.product_id
+            """,
+            {
+                "locations": tuple(locations.ids),
+                "products": tuple(products.ids),
+                "moves_from": moves_from,
+                "date_from": self.date_from,
+            },
+        )
+        for product_id, quantity in self._cr.fetchall():
+            balances[product_id] += float(quantity)
+        return balances
+
+    def _get_initial_balance(self, product):
+        return self._get_initial_balances(product).get(product.id, 0.0)
+
     def _get_initial(self, product_line):
         product_input_qty = sum(product_line.mapped("product_in"))
         product_output_qty = sum(product_line.mapped("product_out"))
@@ -153,9 +153,7 @@ class ReportStockCardReportXlsx(models.AbstractModel):
             default_format=FORMATS["format_theader_blue_center"],
         )
         ws.freeze_panes(row_pos, 0)
-        balance = objects._get_initial(
-            objects.results.filtered(lambda l: l.product_id == product and l.is_initial)
-        )
+        balance = objects._get_initial_balance(product)
         row_pos = self._write_line(
             ws,
             row_pos,
@@ -280,3 +280,62 @@ class TestStockCardReport(common.TransactionCase):
         wizard.button_export_html()
         wizard.button_export_pdf()
         wizard.button_export_xlsx()
+
+    def test_initial_balance_snapshot(self):
+        self.picking_1.move_ids.date = fields.Datetime.to_datetime("2022-01-15")
+        self.picking_2.move_ids.date = fields.Datetime.to_datetime("2021-12-20")
+        report = self.env["report.stock.card.report"].create(
+            {
+                "date_from": "2022-02-01",
+                "date_to": "2022-02-28",
+                "product_ids": [Command.set([self.product_A.id, self.product_B.id])],
+                "location_id": self.location_1.id,
+            }
+        )
+        report._compute_results()
+        self.assertFalse(report.results)
+        expected = {self.product_A.id: 50.0, self.product_B.id: 100.0}
+        products = self.product_A | self.product_B
+        self.assertEqual(dict(report._get_initial_balances(products)), expected)
+        self.env["stock.card.snapshot"]._refresh()
+        self.assertEqual(
+            self.env["stock.card.snapshot"]._get_covered_until(), date(2022, 2, 1)
+        )
+        self.assertEqual(dict(report._get_initial_balances(products)), expected)
+        self.assertEqual(report._get_initial_balance(self.product_A), 50.0)
+        # A period starting in a covered month reads the moves of that month
+        report.date_from = "2022-01-10"
+        self.assertEqual(report._get_initial_balance(self.product_A), 0.0)
+        self.assertEqual(report._get_initial_balance(self.product_B), 100.0)
+        report.print_report("qweb")
+        report.print_report("xlsx")
+
+    def test_snapshot_invalidation(self):
+        snapshot = self.env["stock.card.snapshot"]
+        self.picking_1.move_ids.date = fields.Datetime.to_datetime("2022-01-15")
+        self.picking_2.move_ids.date = fields.Datetime.to_datetime("2021-12-20")
+        snapshot._refresh()
+        report = self.env["report.stock.card.report"].create(
+            {
+                "date_from": "2022-01-01",
+                "date_to": "2022-02-28",
+                "product_ids": [Command.set([self.product_A.id, self.product_B.id])],
+                "location_id": self.location_1.id,
+            }
+        )
+        self.assertEqual(report._get_initial_balance(self.product_B), 100.0)
+        # Re-dated out of a closed month
+        self.picking_2.move_ids.date = fields.Datetime.to_datetime("2022-01-20")
+        self.assertEqual(snapshot._get_covered_until(), date(2021, 12, 1))
+        self.assertEqual(report._get_initial_balance(self.product_B), 0.0)
+        snapshot._refresh()
+        self.assertEqual(snapshot._get_covered_until(), date(2022, 2, 1))
+        self.assertEqual(report._get_initial_balance(self.product_B), 0.0)
+        # No longer done
+        report.date_from = "2022-02-01"
+        self.assertEqual(report._get_initial_balance(self.product_A), 50.0)
+        self.picking_1.move_ids.write({"state": "cancel"})
+        self.assertEqual(snapshot._get_covered_until(), date(2022, 1, 1))
+        self.assertEqual(report._get_initial_balance(self.product_A), 0.0)
+        snapshot._refresh()
+        self.assertEqual(report._get_initial_balance(self.product_A), 0.0)
@@ -44,19 +44,27 @@ class Base(models.AbstractModel):
     def _tm_notify_owner(self, mode, changes=None):
         """Notify all model that have a one2many linked to the record changed"""
         self.ensure_one()
+        self._tm_notify_owners(mode, {self.id: changes})
+
+    def _tm_notify_owners(self, mode, changes_per_record=None):
+        """Notify the owners of the records of self, changes_per_record
+        being the {record id: changes} of the records updated."""
         data = self.env.cr.precommit.data.setdefault(
             "tracking.manager.data",
             defaultdict(lambda: defaultdict(lambda: defaultdict(list))),
         )
+        # prefetch the display names of the whole recordset
+        display_names = dict(zip(self._ids, self.mapped("display_name")))
         for field_name, owner_field_name in self._tm_get_fields_to_notify():
-            owner = self[field_name]
-            data[owner._name][owner.id][owner_field_name].append(
-                {
-                    "mode": mode,
-                    "record": self.display_name,
-                    "changes": changes,
-                }
-            )
+            for record in self:
+                owner = record[field_name]
+                data[owner._name][owner.id][owner_field_name].append(
+                    {
+                        "mode": mode,
+                        "record": display_names[record.id],
+                        "changes": (changes_per_record or {}).get(record.id),
+                    }
+                )
 
     def _tm_get_field_description(self, field_name):
         return self._fields[field_name].get_description(self.env)["string"]
@@ -90,25 +98,27 @@ class Base(models.AbstractModel):
             # check if record has mail.thread mixin
             if not getattr(self.env[model_name], "message_post_with_source", False):
                 continue
-            for record_id, messages_by_field in model_data.items():
-                # Avoid error if no record is linked (example: child_ids of res.partner)
-                if not record_id:
-                    continue
-                record = self.env[model_name].browse(record_id)
+            # Avoid error if no record is linked (example: child_ids of res.partner)
+            records = self.env[model_name].browse(
+                [record_id for record_id in model_data if record_id]
+            )
+            bodies = {}
+            for record in records:
                 messages = [
                     {
                         "name": record._tm_get_field_description(field_name),
                         "messages": messages,
                     }
-                    for field_name, messages in messages_by_field.items()
+                    for field_name, messages in model_data[record.id].items()
                 ]
                 # We do not use message_post_with_view() because emails would be sent
-                rendered_template = self.env["ir.qweb"]._render(
+                bodies[record.id] = self.env["ir.qweb"]._render(
                     "tracking_manager.track_o2m_m2m_template",
                     {"lines": messages, "object": record},
                     minimal_qcontext=True,
                 )
-                record._message_log(body=rendered_template)
+            if bodies:
+                records._message_log_batch(bodies=bodies)
 
     def _tm_prepare_o2m_tracking(self):
         fnames = self._tm_get_fields_to_track()
@@ -118,38 +128,78 @@ class Base(models.AbstractModel):
         initial_values = self.env.cr.precommit.data.setdefault(
             f"tracking.manager.before.{self._name}", {}
         )
-        for record in self:
+        records = self.browse(
+            list(dict.fromkeys(_id for _id in self._ids if _id not in initial_values))
+        )
+        if not records:
+            return
+        readable_fnames = []
+        for fname in fnames:
+            try:
+                self.check_field_access_rights("read", [fname])
+            except AccessError:
+                # User does not have access to the field (example with groups)
+                continue
+            readable_fnames.append(fname)
+        try:
+            # read all the fields of all the records at once
+            records.fetch(readable_fnames)
+        except AccessError:
+            # some records are not readable, snapshot them one by one
+            pass
+        for record in records:
             values = initial_values.setdefault(record.id, {})
-            if values is not None:
-                for fname in fnames:
-                    try:
-                        values.setdefault(fname, record[fname])
-                    except AccessError:
-                        # User does not have access to the field (example with groups)
-                        continue
+            for fname in readable_fnames:
+                try:
+                    values.setdefault(fname, record[fname])
+                except AccessError:
+                    continue
+
+    def _tm_prefetch_changes(self, initial_values):
+        """Prefetch the display names of the many2one and many2many values
+        of self, before and after the changes."""
+        ids_per_model = defaultdict(set)
+        for record in self:
+            for field_name, before in initial_values[record.id].items():
+                if self._fields[field_name].type in ("many2one", "many2many"):
+                    ids_per_model[before._name].update(before._ids)
+                    ids_per_model[before._name].update(record[field_name]._ids)
+        for model_name, ids in ids_per_model.items():
+            self.env[model_name].browse(ids).mapped("display_name")
 
     def _tm_finalize_o2m_tracking(self):
         initial_values = self.env.cr.precommit.data.pop(
             f"tracking.manager.before.{self._name}", {}
         )
-        for _id, values in initial_values.items():
-            # Always use sudo in case that the record have been modified using sudo
-            record = self.sudo().browse(_id)
-            if not record.exists():
-                # if a record have been modify and then deleted
-                # it's not need to track the change so skip it
-                continue
+        # Always use sudo in case that the record have been modify using sudo
+        # if a record have been modify and then deleted
+        # it's not need to track the change so skip it
+        records = self.sudo().browse(list(initial_values)).exists()
+        fnames = {fname for values in initial_values.values() for fname in values}
+        records.fetch(list(fnames))
+        records._tm_prefetch_changes(initial_values)
+        changes_per_record = {}
+        for record in records:
+            values = {
+                fname: before.with_env(record.env)
+                if isinstance(before, models.BaseModel)
+                else before
+                for fname, before in initial_values[record.id].items()
+            }
             changes = record._tm_get_changes(values)
             if changes:
-                record._tm_notify_owner("update", changes)
+                changes_per_record[record.id] = changes
+        if changes_per_record:
+            records.browse(list(changes_per_record))._tm_notify_owners(
+                "update", changes_per_record
+            )
         data = self.env.cr.precommit.data.pop("tracking.manager.data", {})
         self._tm_post_message(data)
         self.flush_model()
 
     def _tm_track_create_unlink(self, mode):
         self.env.cr.precommit.add(self._tm_finalize_o2m_tracking)
-        for record in self:
-            record._tm_notify_owner(mode)
+        self._tm_notify_owners(mode)
 
     def write(self, vals):
         if self.is_tracked_by_o2m():
@@ -271,3 +271,20 @@ class TestTrackingManager(TransactionCase):
         )
         child.write({"parent_id": False})
         self.assertEqual(len(self.messages), 1)
+
+    def test_o2m_write_multi_owner(self):
+        self.env.ref("base.field_res_partner__child_ids").custom_tracking = True
+        other = self.env["res.partner"].create({"name": "Bar"})
+        children = self.env["res.partner"].create(
+            [
+                {"name": f"child {i}", "parent_id": owner.id}
+                for i, owner in enumerate([self.partner, other] * 2)
+            ]
+        )
+        self.flush_tracking()
+        (self.partner | other).message_ids.unlink()
+        children.write({"email": "child@example.com"})
+        self.assertEqual(len(self.messages), 1)
+        self.assertEqual(self.messages.body.count("child@example.com"), 2)
+        self.assertEqual(len(other.message_ids), 1)
+        self.assertEqual(other.message_ids.body.count("child@example.com"), 2)